@@ -1,56 +1,92 @@
 import os
+import sys
 import requests
 from typing import Dict
 from dotenv import load_dotenv
-import mysql.connector
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from common.carbon_cache import CarbonCache
+from common import db
 
 # .env 파일 로딩
 load_dotenv()
 
+CARBON_API_TIMEOUT_SEC = float(os.getenv("CARBON_API_TIMEOUT_SEC", 5))
+# ElectricityMaps API 주소 (벤치마크 / 테스트에서는 로컬 가짜 서버로 바꿀 수 있다)
+CARBON_API_BASE_URL = os.getenv("CARBON_API_BASE_URL", "https://api.electricitymap.org").rstrip("/")
+
+# 탄소 집약도는 시간 단위로만 바뀌므로 zone별로 캐시해서 프로세스 안에서 공유한다.
+carbon_cache = CarbonCache(
+    ttl_sec=float(os.getenv("CARBON_CACHE_TTL_SEC", 900)),
+    max_stale_sec=float(os.getenv("CARBON_CACHE_MAX_STALE_SEC", 3600))
+)
+# 예보는 한 시간 단위로 갱신되므로 한 시간 캐시한다.
+forecast_cache = CarbonCache(
+    ttl_sec=float(os.getenv("CARBON_FORECAST_CACHE_TTL_SEC", 3600)),
+    max_stale_sec=float(os.getenv("CARBON_FORECAST_CACHE_MAX_STALE_SEC", 6 * 3600))
+)
+# zone / token 정보는 거의 바뀌지 않으므로 DB 조회 결과를 길게 캐시한다.
+zone_token_cache = CarbonCache(
+    ttl_sec=float(os.getenv("ZONE_TOKEN_CACHE_TTL_SEC", 3600)),
+    max_stale_sec=86400
+)
+
 def get_zone_and_token(country_code: str) -> tuple[str, str]:
     """
-    .env에서 국가코드에 따라 zone과 api token을 불러온다.
+    국가코드에 해당하는 zone과 api token을 불러온다. (캐시 사용)
     :param country_code: KR, DE, FR 등
     :return: (zone, token)
     """
+    return zone_token_cache.get(country_code, lambda: _load_zone_and_token(country_code))
+
+def _load_zone_and_token(country_code: str) -> tuple[str, str]:
     zone = os.getenv(f"{country_code}_ZONE")
     token = os.getenv(f"{country_code}_API_TOKEN")
 
-    conn = mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user="root",
-        password=os.getenv("MYSQL_PASSWORD"),
-        database="carbonetes"
-    )
-    try:
-        cursor = conn.cursor()
-        query = """
-        SELECT region, token
-        FROM cluster
-        WHERE region = %s
-        """
-        cursor.execute(query, (country_code,))
-        result = cursor.fetchone()
-
-        if not result:
-            raise ValueError(f"{country_code}에 해당하는 클러스터 정보를 찾을 수 없습니다.")
-
-        region, token = result
-        return region, token
-
-    finally:
-        cursor.close()
-        conn.close()
+    query = """
+    SELECT region, token
+    FROM cluster
+    WHERE region = %s
+    """
+    result = db.fetch_one(query, (country_code,), dictionary=False)
+
+    if not result:
+        raise ValueError(f"{country_code}에 해당하는 클러스터 정보를 찾을 수 없습니다.")
+
+    region, token = result
+    return region, token
 
     
 
 def fetch_latest_carbon_intensity(zone: str, token: str) -> Dict:
-    url = f"https://api.electricitymap.org/v3/carbon-intensity/latest?zone={zone}"
+    url = f"{CARBON_API_BASE_URL}/v3/carbon-intensity/latest?zone={zone}"
     headers = {"auth-token": token}
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, timeout=CARBON_API_TIMEOUT_SEC)
     response.raise_for_status()
     return response.json()
 
+def get_cached_carbon_intensity(zone: str, token: str) -> Dict:
+    """
+    fetch_latest_carbon_intensity의 캐시 버전.
+    TTL 이내에는 API를 호출하지 않고, 만료 직후에는 이전 값을 반환하면서 백그라운드에서 갱신한다.
+    """
+    return carbon_cache.get(zone, lambda: fetch_latest_carbon_intensity(zone, token))
+
+def fetch_carbon_forecast(zone: str, token: str) -> Dict:
+    """
+    zone의 탄소 집약도 예보 (ElectricityMaps forecast API)
+    :return: {"zone": .., "forecast": [{"carbonIntensity": .., "datetime": ..}, ...], ...}
+    """
+    url = f"{CARBON_API_BASE_URL}/v3/carbon-intensity/forecast?zone={zone}"
+    headers = {"auth-token": token}
+    response = requests.get(url, headers=headers, timeout=CARBON_API_TIMEOUT_SEC)
+    response.raise_for_status()
+    return response.json()
+
+def get_cached_carbon_forecast(zone: str, token: str) -> Dict:
+    """fetch_carbon_forecast의 캐시 버전."""
+    return forecast_cache.get(zone, lambda: fetch_carbon_forecast(zone, token))
+
 def calculate_integrated_emission(carbon_intensity: float, minutes: int) -> float:
     hours = minutes / 60.0
     return carbon_intensity * hours  # 단위: gCO2eq
@@ -69,7 +105,7 @@ def get_carbon_info(duration_minutes: int, country_code: str = "KR") -> Dict:
     }
     """
     zone, token = get_zone_and_token(country_code)
-    data = fetch_latest_carbon_intensity(zone, token)
+    data = get_cached_carbon_intensity(zone, token)
     carbon_intensity = data["carbonIntensity"]
     integrated_emission = calculate_integrated_emission(carbon_intensity, duration_minutes)
 
@@ -0,0 +1,159 @@
+################################################
+# 지역(region)별 탄소 집약도 타임라인입니다.
+# 시간 단위 과거 값 + 예보 값을 한 배열로 두고 누적합(prefix sum)을 미리 계산해 두어,
+# 임의 구간 [start, start + duration)의 적분 값(= 배출량, gCO2eq/kWh x 시간)을 O(1)로 구합니다.
+#
+# 데이터 출처(provider)
+# - ElectricityMapsProvider: ElectricityMaps history + forecast API (기본)
+# - CsvProvider: region,datetime,carbon_intensity 열을 가진 로컬 CSV (오프라인 테스트용, CARBON_TIMELINE_CSV)
+################################################
+
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
+import requests
+import logging
+import csv
+import os
+
+try:
+    from carbon_collector.carbon_fetch_model import (
+        get_zone_and_token, get_cached_carbon_intensity, get_cached_carbon_forecast, CARBON_API_TIMEOUT_SEC,
+        CARBON_API_BASE_URL
+    )
+except ImportError:
+    from carbon_fetch_model import (
+        get_zone_and_token, get_cached_carbon_intensity, get_cached_carbon_forecast, CARBON_API_TIMEOUT_SEC,
+        CARBON_API_BASE_URL
+    )
+from common.carbon_cache import CarbonCache     # carbon_fetch_model이 저장소 루트를 sys.path에 추가
+
+
+TIMELINE_STEP_SEC = 3600
+CARBON_TIMELINE_TTL_SEC = float(os.getenv("CARBON_TIMELINE_TTL_SEC", 900))
+CARBON_TIMELINE_CSV = os.getenv("CARBON_TIMELINE_CSV")
+
+
+def _to_epoch(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+@dataclass(frozen=True)
+class CarbonTimeline:
+    """
+    step_sec 간격의 구간별(piecewise-constant) 탄소 집약도.
+    values[i]는 [start_ts + i*step, start_ts + (i+1)*step) 구간의 값이고,
+    prefix[i]는 start_ts부터 i번째 구간 시작까지의 적분 값(집약도 x 시간)이다.
+    범위 밖은 첫 / 마지막 값이 계속된다고 본다.
+    """
+    region: str
+    start_ts: float
+    step_sec: int
+    values: np.ndarray
+    prefix: np.ndarray
+
+    @classmethod
+    def from_points(cls, region, points, step_sec=TIMELINE_STEP_SEC):
+        """
+        (epoch 초, 집약도) 점들로 타임라인을 만든다. 각 구간에는 구간 시작 직전의 점 값을 쓴다.
+        """
+        points = sorted(points)
+        if not points:
+            raise ValueError(f"{region} 탄소 집약도 데이터가 없습니다.")
+        times = np.array([t for t, _ in points], dtype=float)
+        data = np.array([v for _, v in points], dtype=float)
+
+        start_ts = float(times[0] // step_sec * step_sec)
+        n = int((times[-1] - start_ts) // step_sec) + 1
+        idx = np.searchsorted(times, start_ts + np.arange(n) * step_sec, side="right") - 1
+        values = data[np.clip(idx, 0, None)]
+        prefix = np.concatenate([[0.0], np.cumsum(values) * (step_sec / 3600)])
+        return cls(region, start_ts, step_sec, values, prefix)
+
+    @classmethod
+    def constant(cls, region, intensity, at, step_sec=TIMELINE_STEP_SEC):
+        return cls.from_points(region, [(at, intensity)], step_sec)
+
+    def cumulative(self, t):
+        """start_ts부터 t까지의 적분 값 (t는 스칼라 또는 배열)"""
+        t = np.asarray(t, dtype=float)
+        i = np.clip(((t - self.start_ts) // self.step_sec).astype(int), 0, len(self.values) - 1)
+        return self.prefix[i] + self.values[i] * (t - (self.start_ts + i * self.step_sec)) / 3600
+
+    def integrate(self, start, duration_sec):
+        """[start, start + duration_sec) 구간의 배출량 (gCO2eq/kWh x 시간) - O(1), 배열 입력 가능"""
+        start = np.asarray(start, dtype=float)
+        return self.cumulative(start + duration_sec) - self.cumulative(start)
+
+    def mean(self, start, duration_sec):
+        """구간 평균 탄소 집약도 (duration이 0이면 start 시점 값)"""
+        duration_sec = np.asarray(duration_sec, dtype=float)
+        safe = np.where(duration_sec > 0, duration_sec, 1.0)
+        return self.integrate(start, safe) / (safe / 3600)
+
+
+# --- 데이터 출처 ---
+class ElectricityMapsProvider:
+    """ElectricityMaps 최근 24시간 기록 + 예보. 기록 / 예보를 못 받으면 최신 값만으로 만든다."""
+
+    def _history(self, zone, token):
+        url = f"{CARBON_API_BASE_URL}/v3/carbon-intensity/history?zone={zone}"
+        response = requests.get(url, headers={"auth-token": token}, timeout=CARBON_API_TIMEOUT_SEC)
+        response.raise_for_status()
+        return response.json().get("history", [])
+
+    def __call__(self, region):
+        zone, token = get_zone_and_token(region)
+        points = []
+        for name, load in (("history", lambda: self._history(zone, token)),
+                           ("forecast", lambda: get_cached_carbon_forecast(zone, token).get("forecast", []))):
+            try:
+                points += [(_to_epoch(p["datetime"]), p["carbonIntensity"])
+                           for p in load() if p.get("carbonIntensity") is not None]
+            except Exception as e:
+                logging.warning(f"⚠ {region} 탄소 {name} 조회 실패: {e}")
+        latest = get_cached_carbon_intensity(zone, token)
+        points.append((_to_epoch(latest["datetime"]), latest["carbonIntensity"]))
+        return points
+
+
+class CsvProvider:
+    """region,datetime,carbon_intensity 열을 가진 CSV 파일 (datetime은 ISO 8601 또는 epoch 초)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, region):
+        with open(self.path, newline='', encoding='utf-8') as file:
+            return [(_to_epoch(row["datetime"]), float(row["carbon_intensity"]))
+                    for row in csv.DictReader(file) if row["region"] == region]
+
+
+class CarbonTimelineStore:
+    """region별 타임라인 캐시. TTL이 지나면 이전 타임라인을 쓰면서 백그라운드에서 새로 만든다."""
+
+    def __init__(self, provider=None, ttl_sec=CARBON_TIMELINE_TTL_SEC, step_sec=TIMELINE_STEP_SEC):
+        self.provider = provider or (CsvProvider(CARBON_TIMELINE_CSV) if CARBON_TIMELINE_CSV
+                                     else ElectricityMapsProvider())
+        self.step_sec = step_sec
+        self._cache = CarbonCache(ttl_sec=ttl_sec, max_stale_sec=max(ttl_sec, 6 * 3600))
+
+    def timeline(self, region) -> CarbonTimeline:
+        return self._cache.get(region, lambda: CarbonTimeline.from_points(
+            region, self.provider(region), self.step_sec))
+
+    def emission(self, region, start, duration_sec):
+        """region에서 [start, start + duration_sec) 동안 실행할 때의 배출량 (gCO2eq/kWh x 시간)"""
+        return self.timeline(region).integrate(start, duration_sec)
+
+    def invalidate(self, region=None):
+        self._cache.invalidate(region)
+
+
+timeline_store = CarbonTimelineStore()
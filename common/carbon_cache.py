@@ -0,0 +1,89 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class CarbonCache:
+    """
+    zone 단위 TTL 캐시 (stale-while-revalidate).
+    - TTL 이내: 캐시 값을 그대로 반환 (hit)
+    - TTL 초과 ~ TTL + max_stale: 이전 값을 즉시 반환하고 백그라운드에서 갱신 (stale hit)
+    - 그 이후 / 최초: 직접 조회 (miss)
+    같은 key에 대한 동시 조회는 하나의 요청으로 합쳐진다.
+    """
+
+    def __init__(self, ttl_sec: float = 900, max_stale_sec: float = 3600):
+        self.ttl_sec = ttl_sec
+        self.max_stale_sec = max_stale_sec
+        self._entries: Dict[Hashable, tuple] = {}      # key -> (value, fetched_at)
+        self._inflight: Dict[Hashable, Future] = {}    # key -> 진행 중인 조회
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = time.monotonic() - fetched_at
+                if age < self.ttl_sec:
+                    self._stats["hits"] += 1
+                    return value
+                if age < self.ttl_sec + self.max_stale_sec:
+                    self._stats["stale_hits"] += 1
+                    future, is_owner = self._begin_locked(key)
+                    if is_owner:
+                        self._stats["refreshes"] += 1
+                        threading.Thread(target=self._load, args=(key, loader, future), daemon=True).start()
+                    return value
+            self._stats["misses"] += 1
+            future, is_owner = self._begin_locked(key)
+            if not is_owner:
+                self._stats["coalesced"] += 1
+
+        if is_owner:
+            self._load(key, loader, future)
+        try:
+            return future.result()
+        except Exception:
+            # 만료된 값이라도 있으면 조회 실패 시 그 값을 사용
+            if entry is not None:
+                logging.warning(f"⚠ 탄소 집약도 조회 실패, 만료된 캐시 값 사용: {key}")
+                return entry[0]
+            raise
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+    def _begin_locked(self, key):
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        return future, True
+
+    def _load(self, key, loader, future):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                self._inflight.pop(key, None)
+            logging.error(f"❌ 캐시 갱신 실패 ({key}): {e}")
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._inflight.pop(key, None)
+        future.set_result(value)
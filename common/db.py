@@ -0,0 +1,326 @@
+################################################
+# Carbonetes 파이썬 서비스 공용 MySQL 접근 모듈입니다.
+# 프로세스당 하나의 커넥션 풀을 두고, 쿼리는 prepared statement로 실행하며,
+# 연결 오류는 백오프를 두고 재시도하고, 쿼리별 실행 시간을 집계합니다.
+#
+# prepared statement는 풀 커넥션마다 쿼리 문자열별로 캐시해 두므로 같은 쿼리는 서버에서 한 번만 준비됩니다.
+# 재시도는 한 곳에서만 한다: 쿼리를 재시도하면 그 루프가 커넥션 대여도 다시 하고, 아니면 대여만 재시도한다.
+#
+# 서비스별 풀 크기는 DB_POOL_SIZE 환경변수 또는 configure(pool_size=..)로 조정합니다.
+# (커넥션을 동시에 쓰는 스레드 수보다 작으면 풀 고갈 -> 재시도 대기가 생긴다)
+################################################
+
+from mysql.connector import pooling, errors
+from contextlib import contextmanager
+from collections import OrderedDict
+import threading
+import logging
+import time
+import os
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_RETRY = int(os.getenv("DB_MAX_RETRY", 3))
+DB_RETRY_BACKOFF_SEC = float(os.getenv("DB_RETRY_BACKOFF_SEC", 0.1))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+# fetch_chunks가 한 번에 읽는 행 수
+DB_FETCH_CHUNK = int(os.getenv("DB_FETCH_CHUNK", 10000))
+# 커넥션 하나가 캐시해 두는 prepared statement 수 (넘으면 가장 오래 안 쓴 것부터 닫는다)
+DB_STMT_CACHE_SIZE = int(os.getenv("DB_STMT_CACHE_SIZE", 32))
+
+# 재시도해도 되는 오류 (연결 끊김, 풀 고갈 등)
+# 읽기 쿼리와 커넥션 대여만 기본으로 재시도한다. 쓰기는 서버가 커밋한 뒤 연결이 끊겼을 수 있어
+# 다시 실행하면 행이 중복될 수 있으므로, 멱등인 문장만 호출 측에서 retry=True로 재시도한다.
+_RETRYABLE = (errors.OperationalError, errors.InterfaceError, errors.PoolError)
+
+_pool = None
+_pool_settings = {}
+_pool_lock = threading.Lock()
+
+# 쿼리별 실행 시간 통계: {label: {"count", "errors", "total_ms", "max_ms"}}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def db_config_from_env(**overrides) -> dict:
+    config = {
+        "host": os.getenv("MYSQL_HOST", "localhost"),
+        "port": int(os.getenv("MYSQL_PORT", 3306)),
+        "user": os.getenv("MYSQL_USER", "root"),
+        "password": os.getenv("MYSQL_PASSWORD", ""),
+        "database": os.getenv("MYSQL_DATABASE", "carbonetes"),
+    }
+    config.update(overrides)
+    return config
+
+
+def configure(pool_size: int = None, **config):
+    """
+    풀 설정을 바꾼다. 첫 쿼리 전에 호출해야 하며, 이미 풀이 만들어졌으면 다음 풀부터 적용된다.
+    :param pool_size: 서비스별 최대 커넥션 수 (mysql-connector 제한: 1~32)
+    :param config: db_config_from_env()에 덮어쓸 접속 설정
+    """
+    global _pool
+    with _pool_lock:
+        _pool_settings.clear()
+        _pool_settings.update(config)
+        if pool_size is not None:
+            _pool_settings["pool_size"] = pool_size
+        _pool = None
+
+
+def get_pool() -> pooling.MySQLConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = dict(_pool_settings)
+                pool_size = settings.pop("pool_size", DB_POOL_SIZE)
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=f"carbonetes-{os.getpid()}",
+                    pool_size=pool_size,
+                    pool_reset_session=False,
+                    **db_config_from_env(**settings)
+                )
+    return _pool
+
+
+def _get_connection(retry=True):
+    """
+    풀에서 커넥션을 꺼낸다. 풀이 비었거나 연결이 실패하면 백오프 후 재시도.
+    :param retry: False면 한 번만 시도한다. (바깥에서 이미 재시도하는 경우)
+    """
+    for attempt in range(DB_MAX_RETRY + 1):
+        try:
+            return get_pool().get_connection()
+        except _RETRYABLE as err:
+            if not retry or attempt == DB_MAX_RETRY:
+                raise
+            delay = DB_RETRY_BACKOFF_SEC * (2 ** attempt)
+            logging.warning(f"⚠ DB 연결 재시도 ({attempt + 1}/{DB_MAX_RETRY}, {delay:.2f}초 후): {err}")
+            time.sleep(delay)
+
+
+@contextmanager
+def connection(retry=True):
+    """풀 커넥션을 빌려주고, 블록이 끝나면 풀에 반납한다. (retry: 대여 재시도 여부)"""
+    conn = _get_connection(retry)
+    try:
+        yield conn
+    finally:
+        conn.close()  # 풀 커넥션은 close() 시 풀로 반납된다.
+
+
+def _label_of(query: str) -> str:
+    return " ".join(query.split())[:60]
+
+
+def _record(label: str, elapsed_ms: float, failed: bool):
+    with _stats_lock:
+        stat = _stats.setdefault(label, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stat["count"] += 1
+        stat["errors"] += int(failed)
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+    if elapsed_ms >= DB_SLOW_QUERY_MS:
+        logging.warning(f"⚠ 느린 쿼리 ({elapsed_ms:.1f}ms): {label}")
+
+
+def query_stats() -> dict:
+    """쿼리별 실행 횟수 / 오류 수 / 평균·최대 실행 시간(ms)"""
+    with _stats_lock:
+        return {
+            label: dict(stat, avg_ms=stat["total_ms"] / stat["count"] if stat["count"] else 0.0)
+            for label, stat in _stats.items()
+        }
+
+
+def _decode(val):
+    # prepared cursor는 문자열 열을 bytearray로 돌려줄 때가 있다.
+    return val.decode() if isinstance(val, (bytes, bytearray)) else val
+
+
+def _to_dicts(cursor, rows):
+    columns = cursor.column_names
+    return [{col: _decode(val) for col, val in zip(columns, row)} for row in rows]
+
+
+def _to_tuples(rows):
+    return [tuple(_decode(val) for val in row) for row in rows]
+
+
+def _cached_cursor(conn, query):
+    """
+    이 커넥션에서 query를 준비해 둔 prepared cursor를 돌려준다. (없으면 만들어 캐시)
+    캐시는 풀에 반납되어도 남는 실제 커넥션(conn._cnx)에 두고, 재연결로 connection_id가 바뀌면 버린다.
+    MySQLCursorPrepared는 같은 문자열 객체를 다시 실행할 때만 준비를 건너뛰므로, 처음 받은 문자열을 함께 돌려준다.
+    """
+    raw = getattr(conn, "_cnx", conn)
+    cache = getattr(raw, "_carbonetes_stmts", None)
+    if cache is None or cache[0] != raw.connection_id:
+        # 재연결된 커넥션의 옛 statement는 서버에 없으므로 닫지 않고 버린다.
+        cache = (raw.connection_id, OrderedDict())
+        raw._carbonetes_stmts = cache
+    cursors = cache[1]
+    entry = cursors.get(query)
+    if entry is None:
+        entry = cursors[query] = (query, conn.cursor(prepared=True))
+        if len(cursors) > DB_STMT_CACHE_SIZE:
+            _, (_, oldest) = cursors.popitem(last=False)
+            _close_quietly(oldest)
+    else:
+        cursors.move_to_end(query)
+    return entry
+
+
+def _drop_cached_cursor(conn, query):
+    """실행 중 오류가 난 cursor는 상태를 알 수 없으므로 캐시에서 빼고 닫는다."""
+    cache = getattr(getattr(conn, "_cnx", conn), "_carbonetes_stmts", None)
+    entry = cache[1].pop(query, None) if cache else None
+    if entry is not None:
+        _close_quietly(entry[1])
+
+
+def _close_quietly(cursor):
+    try:
+        cursor.close()
+    except Exception as err:
+        logging.warning(f"⚠ prepared statement 닫기 실패: {err}")
+
+
+def _run(query, params, fetch, dictionary, label, prepared, many=False, retry=None):
+    """
+    단일 쿼리 실행 (autocommit 단위).
+    :param retry: 연결 오류 시 쿼리 재시도 여부. None이면 읽기(fetch)만 재시도한다.
+                  (재시도하면 이 루프가 커넥션 대여까지 다시 하므로 대여 자체는 재시도하지 않는다)
+    :param prepared: True면 커넥션별로 캐시한 prepared cursor를 쓴다. (executemany는 일반 cursor)
+    """
+    label = label or _label_of(query)
+    if retry is None:
+        retry = fetch
+    cached = prepared and not many
+    for attempt in range(DB_MAX_RETRY + 1):
+        started = time.perf_counter()
+        failed = False
+        try:
+            with connection(retry=not retry) as conn:
+                if cached:
+                    statement, cursor = _cached_cursor(conn, query)
+                else:
+                    statement, cursor = query, conn.cursor(prepared=prepared)
+                ok = False
+                try:
+                    if many:
+                        cursor.executemany(statement, params)
+                    else:
+                        cursor.execute(statement, params or ())
+                    if fetch:
+                        rows = cursor.fetchall()
+                        ok = True
+                        return _to_dicts(cursor, rows) if dictionary else _to_tuples(rows)
+                    conn.commit()
+                    ok = True
+                    return cursor.rowcount, cursor.lastrowid
+                finally:
+                    if not cached:
+                        cursor.close()
+                    elif not ok:
+                        _drop_cached_cursor(conn, query)
+        except _RETRYABLE as err:
+            failed = True
+            if not retry or attempt == DB_MAX_RETRY:
+                raise
+            delay = DB_RETRY_BACKOFF_SEC * (2 ** attempt)
+            logging.warning(f"⚠ 쿼리 재시도 ({attempt + 1}/{DB_MAX_RETRY}, {delay:.2f}초 후): {err}")
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _record(label, (time.perf_counter() - started) * 1000, failed)
+        time.sleep(delay)
+
+
+def fetch_all(query: str, params=(), dictionary=True, label=None, prepared=True) -> list:
+    return _run(query, params, True, dictionary, label, prepared)
+
+
+def fetch_one(query: str, params=(), dictionary=True, label=None, prepared=True):
+    rows = _run(query, params, True, dictionary, label, prepared)
+    return rows[0] if rows else None
+
+
+def fetch_chunks(query: str, params=(), size=DB_FETCH_CHUNK, label=None, prepared=True):
+    """
+    읽기 쿼리 결과를 size행씩 튜플 리스트로 돌려주는 제너레이터. (전체 결과를 한 번에 메모리에 올리지 않음)
+        for rows in db.fetch_chunks("SELECT ...", (limit,)):
+            ...
+    결과를 나눠 받는 도중에는 재시도하지 않는다. (커넥션 대여만 재시도)
+    중간에 멈추면 남은 행을 버리고 커넥션을 풀에 반납한다.
+    """
+    label = label or _label_of(query)
+    started = time.perf_counter()
+    failed = False
+    try:
+        with connection() as conn:
+            cursor = conn.cursor(prepared=prepared)
+            try:
+                cursor.execute(query, params or ())
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        return
+                    yield _to_tuples(rows)
+            finally:
+                if conn.unread_result:
+                    conn.consume_results()
+                cursor.close()
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _record(label, (time.perf_counter() - started) * 1000, failed)
+
+
+def execute(query: str, params=(), label=None, prepared=True, retry=False) -> int:
+    """
+    INSERT / UPDATE / DELETE를 실행하고 커밋한다. 영향받은 행 수를 반환.
+    retry=True는 다시 실행해도 결과가 같은(멱등) 문장에만 쓴다.
+    """
+    rowcount, _ = _run(query, params, False, False, label, prepared, retry=retry)
+    return rowcount
+
+
+def insert(query: str, params=(), label=None, prepared=True) -> int:
+    """INSERT를 실행하고 커밋한다. AUTO_INCREMENT로 생성된 id를 반환. (중복 행이 생길 수 있어 재시도하지 않음)"""
+    _, lastrowid = _run(query, params, False, False, label, prepared, retry=False)
+    return lastrowid
+
+
+def execute_many(query: str, seq_params, label=None, retry=False) -> int:
+    rowcount, _ = _run(query, seq_params, False, False, label, False, many=True, retry=retry)
+    return rowcount
+
+
+@contextmanager
+def transaction(label="transaction"):
+    """
+    여러 쿼리를 하나의 트랜잭션으로 실행한다. 블록 안에서 예외가 나면 롤백.
+    (도중에 실패한 트랜잭션은 자동 재시도하지 않는다.)
+        with db.transaction() as cursor:
+            cursor.execute(...)
+    """
+    started = time.perf_counter()
+    failed = False
+    with connection() as conn:
+        cursor = conn.cursor(prepared=True)
+        try:
+            conn.start_transaction()
+            yield cursor
+            conn.commit()
+        except Exception:
+            failed = True
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            _record(label, (time.perf_counter() - started) * 1000, failed)
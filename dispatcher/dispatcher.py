@@ -1,20 +1,24 @@
 from kubernetes import client, config
+from kubernetes.client.rest import ApiException
 from flask import Flask, request
+from collections import OrderedDict
 import os
-import mysql.connector
 from datetime import datetime, timedelta
 import threading
+import requests
 import time
+from common import db
 
 app = Flask(__name__)
 
-db_config = {
-    "host": os.getenv("MYSQL_HOST"),
-    "port": int(os.getenv("MYSQL_PORT")),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": "carbonetes"
-}
+# 스케줄러 outbox가 같은 요청을 다시 보내도 작업을 한 번만 만들도록 Idempotency-Key 별 응답을 기억한다.
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+handled_keys = OrderedDict()    # key -> (응답 본문, 상태 코드)
+inflight_keys = set()
+idempotency_lock = threading.Lock()
+
+# 작업 완료를 알릴 스케줄러 주소 (설정된 경우에만 알림) 예: http://localhost:28000
+SCHEDULER_URL = os.getenv("SCHEDULER_URL")
 
 class MLTask():
     def __init__(self, cluster, task_name):
@@ -40,21 +44,22 @@ def deploy_to_cluster(cluster_name, task_name):
     api = get_kube_api_from_config(config_path)
 
     job_manifest = generate_job_manifest(task_name)
-    api.create_namespaced_job(namespace="default", body=job_manifest)
-    print(f"✅ Cluster {cluster_name}에 Job {task_name}-job 생성 완료")
+    try:
+        api.create_namespaced_job(namespace="default", body=job_manifest)
+        print(f"✅ Cluster {cluster_name}에 Job {task_name}-job 생성 완료")
+    except ApiException as e:
+        # 재전송된 요청: 이미 만들어진 Job이면 그대로 진행
+        if e.status != 409:
+            raise
+        print(f"⚠️ Cluster {cluster_name}에 Job {task_name}-job 이미 존재")
 
     # DB 업데이트
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
     query = """
         UPDATE task_info
         SET status = 'running', cluster_name = %s, dispatched_at = %s
         WHERE task_name = %s
     """
-    cursor.execute(query, (cluster_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), task_name,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    db.execute(query, (cluster_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), task_name,), retry=True)
 
 def update_k8s_mltask_status(name, namespace, phase):
     api = get_cr_api_incluster()
@@ -111,9 +116,6 @@ def fetch_terminated_mltasks():
             return []
 
         # 2. DB에서 terminated 상태인 task 조회 (클러스터에 존재하는 것만)
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
-
         format_strings = ','.join(['%s'] * len(cluster_task_names))
         query = f"""
             SELECT task_name
@@ -122,10 +124,7 @@ def fetch_terminated_mltasks():
             AND task_name IN ({format_strings})
         """
 
-        cursor.execute(query, tuple(cluster_task_names))
-        db_results = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        db_results = db.fetch_all(query, tuple(cluster_task_names))
 
         # 3. 결과 정리
         for row in db_results:
@@ -159,6 +158,15 @@ def delete_k8s_mltask(name, namespace):
     except Exception as e:
         print(f"❌ mltask 삭제 실패: {e}")
 
+def notify_scheduler_task_completed():
+    """스케줄러에 작업 완료를 알려 보류 중인 작업을 다시 평가하게 한다."""
+    if not SCHEDULER_URL:
+        return
+    try:
+        requests.post(f"{SCHEDULER_URL}/task-completed", timeout=5)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ 스케줄러 완료 알림 실패: {e}")
+
 def loop_terminated_updater():
     while True:
         try:
@@ -179,6 +187,7 @@ def loop_terminated_updater():
 
                     except Exception as e:
                         print(f"❌ task '{task.get('task_name')}' 처리 중 오류: {e}")
+                notify_scheduler_task_completed()
         except Exception as e:
             print(f"❌ 전체 루프에서 오류 발생: {e}")
 
@@ -241,13 +250,35 @@ def generate_job_manifest(task_name, sample_sec=2):
 
 @app.route("/new-task", methods=["POST"])
 def new_task():
-    task = request.json
-    mlTask = MLTask(task['cluster'], task['task_name'])
-    mlTask.print()
+    key = request.headers.get("Idempotency-Key")
+    if key:
+        with idempotency_lock:
+            if key in handled_keys:
+                print(f"↩️ 이미 처리된 요청: {key}")
+                return handled_keys[key]
+            if key in inflight_keys:
+                return {"status": "in_progress", "message": "같은 요청을 처리 중입니다."}, 409
+            inflight_keys.add(key)
 
-    deploy_to_cluster(mlTask.cluster, mlTask.task_name)
-    update_k8s_mltask_status_running(mlTask.task_name, "default")
-    return {"status": "success", "message": f"{mlTask.task_name} 작업이 생성되었습니다."}, 200
+    try:
+        task = request.json
+        mlTask = MLTask(task['cluster'], task['task_name'])
+        mlTask.print()
+
+        deploy_to_cluster(mlTask.cluster, mlTask.task_name)
+        update_k8s_mltask_status_running(mlTask.task_name, "default")
+        response = {"status": "success", "message": f"{mlTask.task_name} 작업이 생성되었습니다."}, 200
+
+        if key:
+            with idempotency_lock:
+                handled_keys[key] = response
+                while len(handled_keys) > IDEMPOTENCY_CACHE_SIZE:
+                    handled_keys.popitem(last=False)
+        return response
+    finally:
+        if key:
+            with idempotency_lock:
+                inflight_keys.discard(key)
 
 if __name__ == "__main__":
     threading.Thread(target=loop_terminated_updater, daemon=True).start()
@@ -7,12 +7,12 @@ import torch.profiler
 import time
 import os
 from dotenv import load_dotenv
-import mysql.connector
 import ast
 from minio import Minio
 from minio.error import S3Error
 from kubernetes import client, config
 import requests
+from common import db
 
 SCHEDULER_HOST = os.getenv("SCHEDULER_HOST")
 SCHEDULER_PORT= os.getenv("SCHEDULER_PORT")
@@ -178,29 +178,20 @@ if __name__ == "__main__":
     user_module = load_user_module(local_path) 
     
 
-        # DB 연결
-    db_config = {
-        "host": os.getenv("MYSQL_HOST"),
-        "port": int(os.getenv("MYSQL_PORT")),
-        "user": os.getenv("MYSQL_USER"),
-        "password": os.getenv("MYSQL_PASSWORD"),
-        "database": os.getenv("MYSQL_DATABASE")
-    }
+    # DB 연결 (단발성 Job이므로 커넥션 1개)
+    db.configure(pool_size=1)
 
     dataset_size = None
     data_shape = None
     label_count = None
 
 
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
     query = """
     SELECT data_shape, dataset_size, label_count
     FROM task_info
     WHERE task_name = %s
     """
-    cursor.execute(query, (task_name,))
-    result = cursor.fetchone()
+    result = db.fetch_one(query, (task_name,), dictionary=False)
     dataset_size, data_shape, label_count = export_data(result)
     
     # 추출
@@ -239,14 +230,10 @@ if __name__ == "__main__":
 
     estimated_time = standard_time * profile['hyperparameters']['epochs']
 
-    cursor.execute(update_query, (estimated_time, task_url, task_name ))
-    conn.commit()
+    db.execute(update_query, (estimated_time, task_url, task_name ), retry=True)
 
     print(f"✅ DB에 task 업데이트 완료!")
 
     update_k8s_mltask_status(task_name, 'default')
 
-    cursor.close()
-    conn.close()
-
     register_task_to_scheduler(task_name, estimated_time)
@@ -2,10 +2,19 @@ import os
 import requests
 from typing import Dict
 from dotenv import load_dotenv
+from common.carbon_cache import CarbonCache
 
 # .env 파일 로딩
 load_dotenv()
 
+CARBON_API_TIMEOUT_SEC = float(os.getenv("CARBON_API_TIMEOUT_SEC", 5))
+
+# 탄소 집약도는 시간 단위로만 바뀌므로 zone별로 캐시해서 프로세스 안에서 공유한다.
+carbon_cache = CarbonCache(
+    ttl_sec=float(os.getenv("CARBON_CACHE_TTL_SEC", 900)),
+    max_stale_sec=float(os.getenv("CARBON_CACHE_MAX_STALE_SEC", 3600))
+)
+
 def get_zone_and_token(country_code: str) -> tuple[str, str]:
     """
     .env에서 국가코드에 따라 zone과 api token을 불러온다.
@@ -23,10 +32,17 @@ def get_zone_and_token(country_code: str) -> tuple[str, str]:
 def fetch_latest_carbon_intensity(zone: str, token: str) -> Dict:
     url = f"https://api.electricitymap.org/v3/carbon-intensity/latest?zone={zone}"
     headers = {"auth-token": token}
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, timeout=CARBON_API_TIMEOUT_SEC)
     response.raise_for_status()
     return response.json()
 
+def get_cached_carbon_intensity(zone: str, token: str) -> Dict:
+    """
+    fetch_latest_carbon_intensity의 캐시 버전.
+    TTL 이내에는 API를 호출하지 않고, 만료 직후에는 이전 값을 반환하면서 백그라운드에서 갱신한다.
+    """
+    return carbon_cache.get(zone, lambda: fetch_latest_carbon_intensity(zone, token))
+
 def calculate_integrated_emission(carbon_intensity: float, minutes: int) -> float:
     hours = minutes / 60.0
     return carbon_intensity * hours  # 단위: gCO2eq
@@ -45,7 +61,7 @@ def get_carbon_info(duration_minutes: int, country_code: str = "KR") -> Dict:
     }
     """
     zone, token = get_zone_and_token(country_code)
-    data = fetch_latest_carbon_intensity(zone, token)
+    data = get_cached_carbon_intensity(zone, token)
     carbon_intensity = data["carbonIntensity"]
     integrated_emission = calculate_integrated_emission(carbon_intensity, duration_minutes)
 
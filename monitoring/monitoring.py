@@ -3,19 +3,11 @@ import os
 from dotenv import load_dotenv
 from new_collector import get_cpu_usage
 from prometheus_client import start_http_server, Gauge
-import mysql.connector
-from carbon_fetch_model import fetch_latest_carbon_intensity
+from carbon_fetch_model import get_cached_carbon_intensity, carbon_cache
+from common import db
 
 load_dotenv()
 
-db_config = {
-    "host": os.getenv("MYSQL_HOST"),
-    "port": int(os.getenv("MYSQL_PORT")),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": "carbonetes"
-}
-
 PORT = 8801
 INTERVAL_SEC = 10
 TARGET_PORT = 9100  
@@ -23,16 +15,12 @@ TARGET_PORT = 9100
 
 cpu_usage_gauge = Gauge("carbon_cpu_usage_percent", "CPU usage in percent", ["cluster"])
 co2_emission_gauge = Gauge("carbon_emission_g_co2eq", "Carbon emission per interval (gCO2eq)", ["cluster"])
+carbon_cache_lookups_gauge = Gauge("carbon_intensity_cache_lookups", "Carbon intensity cache lookups by result (cumulative)", ["result"])
+carbon_cache_entries_gauge = Gauge("carbon_intensity_cache_entries", "Number of zones held in the carbon intensity cache")
 
 
 def get_cluster_info():
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
-    cursor.execute("SELECT cluster_name, cluster_ip, tdp, region, token FROM cluster")
-    result = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return result  
+    return db.fetch_all("SELECT cluster_name, cluster_ip, tdp, region, token FROM cluster", dictionary=False)
 
 def calculate_emission(cpu_percent: float, tdp: float, ci: float, seconds: int) -> float:
     hours = seconds / 3600.0
@@ -45,7 +33,7 @@ def collect_metrics(clusters):
             endpoint = f"{cluster_ip}:{TARGET_PORT}"
             try:
                 cpu = get_cpu_usage(endpoint)
-                json_data = fetch_latest_carbon_intensity(region, token)
+                json_data = get_cached_carbon_intensity(region, token)
                 co2 = calculate_emission(cpu, tdp, json_data['carbonIntensity'], INTERVAL_SEC)
 
                 cpu_usage_gauge.labels(cluster=cluster_name).set(cpu)
@@ -55,6 +43,11 @@ def collect_metrics(clusters):
 
             except Exception as e:
                 print(f"[ERROR] {cluster_name} ({endpoint}): {e}")
+
+        stats = carbon_cache.stats()
+        carbon_cache_entries_gauge.set(stats.pop("size"))
+        for result, count in stats.items():
+            carbon_cache_lookups_gauge.labels(result=result).set(count)
         time.sleep(INTERVAL_SEC)
 
 
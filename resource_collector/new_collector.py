@@ -15,13 +15,20 @@ MEM_TOTAL_RE = re.compile(r'^node_memory_MemTotal_bytes\s+(?P<total>\d+)', re.MU
 MEM_AVAILABLE_RE = re.compile(r'^node_memory_MemAvailable_bytes\s+(?P<avail>\d+)', re.MULTILINE)
 
 # ─────────────────────────────────────────────────────────────
-# /metrics 에서 CPU 누적 시간 읽어오기
+# /metrics 원문 가져오기 (CPU/메모리를 한 번의 요청으로 파싱할 때 사용)
 # ─────────────────────────────────────────────────────────────
-def fetch_cpu_times(endpoint: str) -> Dict[str, Dict[str, float]]:
-    resp = requests.get(f"http://{endpoint}/metrics", timeout=3)
+def fetch_metrics_text(endpoint: str, timeout: float = 3) -> str:
+    resp = requests.get(f"http://{endpoint}/metrics", timeout=timeout)
     resp.raise_for_status()
-    text = resp.text
+    return resp.text
+
+# ─────────────────────────────────────────────────────────────
+# /metrics 에서 CPU 누적 시간 읽어오기
+# ─────────────────────────────────────────────────────────────
+def fetch_cpu_times(endpoint: str, timeout: float = 3) -> Dict[str, Dict[str, float]]:
+    return parse_cpu_times(fetch_metrics_text(endpoint, timeout))
 
+def parse_cpu_times(text: str) -> Dict[str, Dict[str, float]]:
     cpu_times: Dict[str, Dict[str, float]] = {}
     for m in CPU_LINE_RE.finditer(text):
         cpu = m.group('cpu')
@@ -49,11 +56,10 @@ def compute_cpu_usage(prev: Dict[str, Dict[str, float]], curr: Dict[str, Dict[st
 # ─────────────────────────────────────────────────────────────
 # /metrics 에서 메모리 총량/가용량 읽어오기
 # ─────────────────────────────────────────────────────────────
-def fetch_memory_stats(endpoint: str) -> Tuple[float, float]:
-    resp = requests.get(f"http://{endpoint}/metrics", timeout=3)
-    resp.raise_for_status()
-    text = resp.text
+def fetch_memory_stats(endpoint: str, timeout: float = 3) -> Tuple[float, float]:
+    return parse_memory_stats(fetch_metrics_text(endpoint, timeout))
 
+def parse_memory_stats(text: str) -> Tuple[float, float]:
     total = float(MEM_TOTAL_RE.search(text).group('total')) if MEM_TOTAL_RE.search(text) else 0.0
     avail = float(MEM_AVAILABLE_RE.search(text).group('avail')) if MEM_AVAILABLE_RE.search(text) else 0.0
     return total, avail
@@ -73,30 +79,31 @@ def compute_mem_usage(total: float, avail: float) -> float:
 _last_cpu_snapshots: Dict[str, Dict[str, Dict[str, float]]] = {}
 
 # ─────────────────────────────────────────────────────────────
-def get_cpu_usage(endpoint: str) -> float:
+def get_cpu_usage(endpoint: str, timeout: float = 3) -> float:
     """
     endpoint 예: '211.43.14.15:9100'
     이전 스냅샷과 비교하여 CPU 사용률(%)을 반환.
     최초 호출 시에는 0.0을 반환하고, 다음 호출부터 값을 계산합니다.
     """
-    curr = fetch_cpu_times(endpoint)
+    curr = fetch_cpu_times(endpoint, timeout)
     prev = _last_cpu_snapshots.get(endpoint)
     usage = compute_cpu_usage(prev, curr) if prev else 0.0
     _last_cpu_snapshots[endpoint] = curr
     return usage
 
 # ─────────────────────────────────────────────────────────────
-def get_memory_usage(endpoint: str) -> float:
+def get_memory_usage(endpoint: str, timeout: float = 3) -> float:
     """
     endpoint 예: '211.43.14.15:9100'
     즉시 메모리 사용률(%)을 반환합니다.
     """
-    total, avail = fetch_memory_stats(endpoint)
+    total, avail = fetch_memory_stats(endpoint, timeout)
     return compute_mem_usage(total, avail)
 
 # ─────────────────────────────────────────────────────────────
-def get_resource_usage(endpoint: str) -> Tuple[float, float]:
+def get_resource_usage(endpoint: str, timeout: float = 3) -> Tuple[float, float]:
     """
     튜플 형태로 (cpu_usage, mem_usage) 를 반환합니다.
+    timeout: 각 HTTP 요청의 제한 시간(초)
     """
-    return get_cpu_usage(endpoint), get_memory_usage(endpoint)
+    return get_cpu_usage(endpoint, timeout), get_memory_usage(endpoint, timeout)
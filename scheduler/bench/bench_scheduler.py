@@ -0,0 +1,257 @@
+################################################
+# 스케줄러 실행기(Serving Loop) 처리량 벤치마크입니다.
+# 가짜 node_exporter / ElectricityMaps / Dispatcher 서버와 SQLite DB 대역으로 외부 의존 없이 실행하며,
+# 결과(초당 결정 수, 지연 p50 / p90 / p99, 단계별 평균 시간)를 JSON으로 출력합니다.
+#
+#   python scheduler/bench/bench_scheduler.py --mode process_task --clusters 8 --tasks 2000
+#   python scheduler/bench/bench_scheduler.py --mode batch --clusters 64 --rate 500 --batch-size 16
+#   python scheduler/bench/bench_scheduler.py --mode service --clusters 16 --rate 200 --output result.json
+#
+# mode
+# - process_task: process_task()를 --concurrency개 스레드로 직접 호출
+# - batch: process_batch()를 --batch-size개씩 직접 호출
+# - service: main_scheduler를 띄우고 /schedule로 작업을 넣은 뒤, 가짜 Dispatcher가 받을 때까지를 잰다
+# --rate가 0이면 최대한 빠르게 보내고 지연은 호출 시작부터, 아니면 초당 rate개 도착(open loop)으로 보고
+# 지연은 예정 도착 시각부터 잰다. (밀려서 늦게 시작한 시간까지 포함)
+################################################
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import contextlib
+import argparse
+import tempfile
+import logging
+import json
+import time
+import sys
+import os
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(BENCH_DIR), os.path.dirname(os.path.dirname(BENCH_DIR))]
+
+from fakes import FakeNodeExporter, FakeCarbonApi, FakeDispatcher
+import fake_db
+
+
+REGIONS = ["KR", "JP", "FR", "DE", "US", "SE", "IN", "BR"]
+REGION_INTENSITY = {"KR": 420, "JP": 460, "FR": 60, "DE": 350, "US": 380, "SE": 30, "IN": 630, "BR": 100}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Carbonetes scheduler serving-path benchmark")
+    parser.add_argument("--mode", choices=["process_task", "batch", "service"], default="process_task")
+    parser.add_argument("--clusters", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 도착 작업 수 (0이면 최대 속도)")
+    parser.add_argument("--concurrency", type=int, default=4, help="process_task 호출 스레드 수")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--estimated-time", type=int, default=600, help="작업 예상 시간(초)")
+    parser.add_argument("--cpu-series", default="10,20,30,15", help="가짜 node_exporter CPU 사용률(%%) 시계열")
+    parser.add_argument("--cpu-increment", type=float, default=0.0,
+                        help="배치 1건당 사용률 증가 가정치(%%p) - 0이면 포화로 인한 보류 없이 배치 경로만 잰다")
+    parser.add_argument("--node-latency-ms", type=float, default=1.0)
+    parser.add_argument("--carbon-latency-ms", type=float, default=20.0)
+    parser.add_argument("--dispatcher-latency-ms", type=float, default=5.0)
+    parser.add_argument("--learning-interval", type=int, default=0,
+                        help="service 모드 학습기 호출 주기 (0이면 학습기 호출 안 함)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="service 모드에서 전달 완료를 기다리는 최대 시간")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 표준 출력만)")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+# --- 환경 구성 ---
+def start_fakes(args):
+    cpu_series = [float(v) for v in args.cpu_series.split(",") if v.strip()]
+    exporters = [FakeNodeExporter(np.roll(cpu_series, i).tolist(), latency_ms=args.node_latency_ms).start()
+                 for i in range(args.clusters)]
+    carbon_api = FakeCarbonApi(REGION_INTENSITY, latency_ms=args.carbon_latency_ms).start()
+    dispatcher = FakeDispatcher(latency_ms=args.dispatcher_latency_ms).start()
+    return exporters, carbon_api, dispatcher
+
+
+def configure_env(args, carbon_api, dispatcher):
+    """스케줄러 모듈이 import 시 읽는 환경변수 (import 전에 설정해야 함)"""
+    os.environ.update({
+        "CARBON_API_BASE_URL": carbon_api.url,
+        "DISPATCHER_URL": f"{dispatcher.url}/new-task",
+        "PROJECTED_CPU_INCREMENT_PCT": str(args.cpu_increment),
+        "STATE_REFRESH_INTERVAL_SEC": "1",
+        "STATE_PRIME_INTERVAL_SEC": "0.2",
+        "SCHEDULER_BATCH_SIZE": str(args.batch_size),
+        "LEARNING_INTERVAL": str(args.learning_interval or 10 ** 12),
+    })
+
+
+def task_list(args):
+    return [{"task_name": f"bench-{i:07d}", "estimated_time": args.estimated_time} for i in range(args.tasks)]
+
+
+def arrivals(args, started):
+    """작업별 예정 도착 시각 (rate가 0이면 모두 시작 시각)"""
+    if args.rate <= 0:
+        return np.full(args.tasks, started)
+    return started + np.arange(args.tasks) / args.rate
+
+
+def sleep_until(at):
+    """at까지 기다린 뒤 지연 측정 기준 시각을 반환한다. (open loop면 예정 시각, 아니면 실제 시작 시각)"""
+    delay = at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+        return at
+    return at if _open_loop else time.perf_counter()
+
+
+# --- 모드별 실행 ---
+def run_process_task(args, tp):
+    tasks = task_list(args)
+    started = time.perf_counter()
+    due = arrivals(args, started)
+    latencies = np.zeros(len(tasks))
+    placed = np.zeros(len(tasks), dtype=bool)
+
+    def one(i):
+        since = sleep_until(due[i])
+        placed[i] = tp.process_task(tasks[i]["task_name"], tasks[i]["estimated_time"]) is not None
+        latencies[i] = time.perf_counter() - since
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(len(tasks))))
+    return time.perf_counter() - started, latencies, int(placed.sum())
+
+
+def run_batch(args, tp):
+    tasks = task_list(args)
+    started = time.perf_counter()
+    due = arrivals(args, started)
+    latencies = np.zeros(len(tasks))
+    placed = 0
+    for first in range(0, len(tasks), args.batch_size):
+        last = min(first + args.batch_size, len(tasks))
+        since = sleep_until(due[last - 1])      # 배치의 마지막 작업이 도착하면 처리
+        result = tp.process_batch(tasks[first:last])
+        latencies[first:last] = time.perf_counter() - (due[first:last] if _open_loop else since)
+        placed += sum(1 for _, cluster in result if cluster is not None)
+    return time.perf_counter() - started, latencies, placed
+
+
+def run_service(args, dispatcher):
+    import main_scheduler
+    client = main_scheduler.app.test_client()
+
+    tasks = task_list(args)
+    started = time.perf_counter()
+    offset = time.time() - started      # perf_counter -> time.time (Dispatcher 기록 시각 기준)
+    due = arrivals(args, started)
+    sent = np.zeros(len(tasks))
+    for i, task in enumerate(tasks):
+        sent[i] = sleep_until(due[i])
+        response = client.post('/schedule', json=task)
+        if response.status_code != 200:
+            raise RuntimeError(f"/schedule 실패: {response.status_code} {response.get_data(as_text=True)}")
+    if not dispatcher.wait_for(len(tasks), args.timeout):
+        logging.warning(f"⚠ 시간 초과 - {len(dispatcher.arrivals)}/{len(tasks)}개만 전달됨")
+
+    arrived = [dispatcher.arrivals.get(task["task_name"]) for task in tasks]
+    latencies = np.array([at - offset - sent[i] for i, (at, _) in
+                          ((i, a) for i, a in enumerate(arrived) if a is not None)])
+    finished = max((at for at, _ in filter(None, arrived)), default=time.time()) - offset
+    return finished - started, latencies, len(latencies)
+
+
+# --- 결과 ---
+def stage_means_ms():
+    """metrics.py 히스토그램에서 단계별 평균 시간(ms)"""
+    import metrics
+    means = {}
+    for histogram in (metrics.stage_duration, metrics.decision_latency):
+        for family in histogram.collect():
+            sums, counts = {}, {}
+            for sample in family.samples:
+                key = next(iter(sample.labels.values()), family.name)
+                if sample.name.endswith("_sum"):
+                    sums[key] = sample.value
+                elif sample.name.endswith("_count"):
+                    counts[key] = sample.value
+            for key, count in counts.items():
+                if count:
+                    means[f"{family.name}:{key}"] = round(sums[key] / count * 1000, 3)
+    return means
+
+
+def summarize(args, elapsed, latencies, placed, carbon_api):
+    latencies_ms = np.asarray(latencies) * 1000
+    percentiles = (np.percentile(latencies_ms, [50, 90, 99]) if len(latencies_ms) else [None] * 3)
+    return {
+        "mode": args.mode,
+        "clusters": args.clusters,
+        "tasks": args.tasks,
+        "rate": args.rate,
+        "concurrency": args.concurrency if args.mode == "process_task" else None,
+        "batch_size": args.batch_size if args.mode != "process_task" else None,
+        "placed": placed,
+        "elapsed_sec": round(elapsed, 4),
+        "decisions_per_sec": round(len(latencies_ms) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "p50": _round(percentiles[0]),
+            "p90": _round(percentiles[1]),
+            "p99": _round(percentiles[2]),
+            "max": _round(latencies_ms.max()) if len(latencies_ms) else None,
+            "mean": _round(latencies_ms.mean()) if len(latencies_ms) else None,
+        },
+        "stage_mean_ms": stage_means_ms(),
+        "carbon_api_calls": carbon_api.calls,
+    }
+
+
+def _round(value):
+    return None if value is None else round(float(value), 3)
+
+
+def main(argv=None):
+    global _open_loop
+    args = parse_args(argv)
+    _open_loop = args.rate > 0
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='[%(asctime)s] [%(levelname)s] %(message)s', stream=sys.stderr)
+
+    exporters, carbon_api, dispatcher = start_fakes(args)
+    configure_env(args, carbon_api, dispatcher)
+
+    # 결정 로그 / 큐 / outbox 파일은 임시 디렉터리에 만든다.
+    workdir = tempfile.mkdtemp(prefix="carbonetes-bench-")
+    os.chdir(workdir)
+
+    fake = fake_db.install()
+    fake.seed([(f"bench-{i}", exporter.address, REGIONS[i % len(REGIONS)]) for i, exporter in enumerate(exporters)],
+              tasks=[(task["task_name"], task["estimated_time"]) for task in task_list(args)])
+
+    # 스케줄러의 예약 로그(print)는 결과 JSON과 섞이지 않도록 버린다.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if args.mode == "service":
+            elapsed, latencies, placed = run_service(args, dispatcher)
+        else:
+            import task_processor as tp
+            tp.cluster_state.start()
+            tp.weights_cache.start()
+            # 탄소 타임라인 캐시를 채워 둔다. (첫 결정의 콜드 스타트는 측정에서 제외)
+            tp.probe_clusters(tp.nodes, 0, tp.cluster_state.snapshot(), probe_timeout=30, deadline=30)
+            runner = run_process_task if args.mode == "process_task" else run_batch
+            elapsed, latencies, placed = runner(args, tp)
+
+    result = summarize(args, elapsed, latencies, placed, carbon_api)
+    result["workdir"] = workdir
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output if os.path.isabs(args.output) else os.path.join(_invoked_from, args.output), "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return result
+
+
+_invoked_from = os.getcwd()
+_open_loop = False
+
+if __name__ == "__main__":
+    main()
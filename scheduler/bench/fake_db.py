@@ -0,0 +1,181 @@
+################################################
+# 벤치마크용 로컬 DB 대역입니다.
+# common.db의 함수(fetch_all / fetch_one / execute / insert / execute_many / transaction)를
+# 같은 모양의 SQLite 구현으로 바꿔 끼워, MySQL 없이 cluster / weights / task_info 테이블을 사용합니다.
+# install()은 스케줄러 모듈을 import 하기 전에 호출해야 합니다. (task_processor가 import 시 클러스터를 읽음)
+################################################
+
+from contextlib import contextmanager
+from datetime import datetime
+from common import db
+import threading
+import sqlite3
+import re
+
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cluster (
+        cluster_name TEXT PRIMARY KEY,
+        cluster_ip   TEXT NOT NULL,
+        region       TEXT NOT NULL,
+        token        TEXT NULL
+    );
+    CREATE TABLE IF NOT EXISTS weights (
+        a_w REAL, b_w REAL, c_w REAL, d_w REAL
+    );
+    CREATE TABLE IF NOT EXISTS weights_history (
+        version    INTEGER PRIMARY KEY AUTOINCREMENT,
+        a_w        REAL NOT NULL,
+        b_w        REAL NOT NULL,
+        c_w        REAL NOT NULL,
+        d_w        REAL NOT NULL,
+        fitness    REAL NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS task_info (
+        id               INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_name        TEXT UNIQUE,
+        status           TEXT,
+        cluster_name     TEXT NULL,
+        estimated_time   REAL NULL,
+        carbon_intensity REAL NULL,
+        cpu_m            REAL NULL,
+        memory           REAL NULL,
+        created_at       DATETIME DEFAULT CURRENT_TIMESTAMP,
+        dispatched_at    DATETIME NULL,
+        completed_at     DATETIME NULL
+    );
+"""
+
+# 스케줄러 쿼리에 쓰인 MySQL 문법 -> SQLite
+_REWRITES = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"TIMESTAMPDIFF\(\s*SECOND\s*,", re.IGNORECASE), "TIMESTAMPDIFF('SECOND',"),
+    (re.compile(r"\bNOW\(\)", re.IGNORECASE), "CURRENT_TIMESTAMP"),
+]
+_CREATE_RE = re.compile(r"^\s*CREATE\s+TABLE", re.IGNORECASE)
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+
+def _timestampdiff(unit, start, end):
+    if start is None or end is None:
+        return None
+    seconds = (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+    return int(seconds)
+
+
+def _translate(query):
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+class _Cursor:
+    """db.transaction()이 돌려주는 커서와 같은 execute / fetchone / lastrowid / rowcount"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_translate(query), params or ())
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else tuple(row)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+class SqliteDB:
+    def __init__(self, path=":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("TIMESTAMPDIFF", 3, _timestampdiff)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def _run(self, query, params, fetch, dictionary, many=False):
+        # 스케줄러 모듈의 CREATE TABLE(MySQL 문법)은 위 스키마로 대신한다.
+        if _CREATE_RE.match(query):
+            return [] if fetch else (0, None)
+        query = _translate(query)
+        with self._lock:
+            if many:
+                self._conn.execute("BEGIN")
+                try:
+                    cursor = self._conn.executemany(query, params)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            else:
+                cursor = self._conn.execute(query, params or ())
+            if fetch:
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows] if dictionary else [tuple(row) for row in rows]
+            return cursor.rowcount, cursor.lastrowid
+
+    # --- common.db와 같은 인터페이스 ---
+    def fetch_all(self, query, params=(), dictionary=True, label=None, prepared=True):
+        return self._run(query, params, True, dictionary)
+
+    def fetch_one(self, query, params=(), dictionary=True, label=None, prepared=True):
+        rows = self._run(query, params, True, dictionary)
+        return rows[0] if rows else None
+
+    def fetch_chunks(self, query, params=(), size=10000, label=None, prepared=True):
+        rows = self._run(query, params, True, False)
+        for i in range(0, len(rows), size):
+            yield rows[i:i + size]
+
+    def execute(self, query, params=(), label=None, prepared=True, retry=False):
+        return self._run(query, params, False, False)[0]
+
+    def insert(self, query, params=(), label=None, prepared=True):
+        return self._run(query, params, False, False)[1]
+
+    def execute_many(self, query, seq_params, label=None, retry=False):
+        return self._run(query, seq_params, False, False, many=True)[0]
+
+    @contextmanager
+    def transaction(self, label="transaction"):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield _Cursor(self._conn.cursor())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- 벤치마크 데이터 ---
+    def seed(self, clusters, weights=(1.0, 1.0, 1.0, 1.0), tasks=()):
+        """
+        :param clusters: [(cluster_name, cluster_ip(host:port), region), ...] - token은 region과 같은 값
+        :param tasks: [(task_name, estimated_time), ...] - status='ready'
+        """
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO cluster VALUES (?, ?, ?, ?)",
+                                   [(name, ip, region, region) for name, ip, region in clusters])
+            self._conn.execute("DELETE FROM weights")
+            self._conn.execute("INSERT INTO weights VALUES (?, ?, ?, ?)", weights)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO task_info (task_name, status, estimated_time) VALUES (?, 'ready', ?)",
+                list(tasks))
+
+
+def install(path=":memory:"):
+    """common.db의 쿼리 함수를 SQLite 대역으로 바꾸고 대역 객체를 반환한다."""
+    fake = SqliteDB(path)
+    for name in ("fetch_all", "fetch_one", "fetch_chunks", "execute", "insert", "execute_many", "transaction"):
+        setattr(db, name, getattr(fake, name))
+    return fake
@@ -0,0 +1,190 @@
+################################################
+# 벤치마크용 가짜 외부 서비스입니다. (모두 127.0.0.1의 빈 포트에서 백그라운드 스레드로 동작)
+# - FakeNodeExporter: 클러스터 하나의 node_exporter /metrics. 호출마다 CPU 사용률 시계열의 다음 값을 흉내낸다.
+# - FakeCarbonApi: ElectricityMaps carbon-intensity latest / history / forecast
+# - FakeDispatcher: Dispatcher /new-task. 받은 시각을 작업별로 기록한다.
+################################################
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, parse_qs
+import threading
+import random
+import json
+import math
+import time
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive (실제 서비스처럼 연결 재사용)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay(self):
+        self.server.owner.delay()
+
+
+class _FakeServer:
+    """지연 시간(latency_ms ± jitter_ms)을 두고 응답하는 HTTP 서버 공통 부분"""
+
+    handler = _Handler
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name=f"fake-{type(self).__name__}")
+
+    @property
+    def address(self):
+        host, port = self._server.server_address
+        return f"{host}:{port}"
+
+    @property
+    def url(self):
+        return f"http://{self.address}"
+
+    def delay(self):
+        latency = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --- node_exporter ---
+class _NodeExporterHandler(_Handler):
+    def do_GET(self):
+        if urlparse(self.path).path != "/metrics":
+            return self._reply(404, "not found", "text/plain")
+        self._delay()
+        self._reply(200, self.server.owner.render(), "text/plain; version=0.0.4")
+
+
+class FakeNodeExporter(_FakeServer):
+    """
+    :param cpu_series: 수집될 때마다 차례로 돌려줄 CPU 사용률(%) 리스트 (끝나면 처음부터 반복)
+    :param n_cpus: 흉내낼 CPU 코어 수
+    :param mem_pct: 메모리 사용률(%)
+    """
+
+    handler = _NodeExporterHandler
+
+    def __init__(self, cpu_series=(20.0,), n_cpus=4, mem_pct=40.0, latency_ms=0.0, jitter_ms=0.0):
+        super().__init__(latency_ms, jitter_ms)
+        self.cpu_series = list(cpu_series) or [0.0]
+        self.n_cpus = n_cpus
+        self.mem_pct = mem_pct
+        self._step = 0
+        self._counters = [{"idle": 0.0, "user": 0.0} for _ in range(n_cpus)]
+        self._lock = threading.Lock()
+        self.scrapes = 0
+
+    def render(self):
+        # 호출 한 번 = 가상 1초. 이번 사용률만큼 user, 나머지는 idle 누적 시간을 늘린다.
+        with self._lock:
+            usage = self.cpu_series[self._step % len(self.cpu_series)] / 100
+            self._step += 1
+            self.scrapes += 1
+            for counter in self._counters:
+                counter["user"] += usage
+                counter["idle"] += 1 - usage
+            lines = [f'node_cpu_seconds_total{{cpu="{cpu}",mode="{mode}"}} {value:.6f}'
+                     for cpu, counter in enumerate(self._counters) for mode, value in counter.items()]
+        total = 16 * 1024 ** 3
+        lines.append(f"node_memory_MemTotal_bytes {total}")
+        lines.append(f"node_memory_MemAvailable_bytes {int(total * (1 - self.mem_pct / 100))}")
+        return "\n".join(lines) + "\n"
+
+
+# --- ElectricityMaps ---
+class _CarbonApiHandler(_Handler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        zone = parse_qs(parsed.query).get("zone", ["KR"])[0]
+        owner = self.server.owner
+        self._delay()
+        owner.calls += 1
+        if parsed.path.endswith("/latest"):
+            now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            return self._reply(200, json.dumps(owner.point(zone, now)))
+        if parsed.path.endswith("/history"):
+            return self._reply(200, json.dumps({"zone": zone, "history": owner.series(zone, -24, 0)}))
+        if parsed.path.endswith("/forecast"):
+            return self._reply(200, json.dumps({"zone": zone, "forecast": owner.series(zone, 1, 24)}))
+        self._reply(404, json.dumps({"error": "not found"}))
+
+
+class FakeCarbonApi(_FakeServer):
+    """
+    zone별 탄소 집약도 = base + amplitude * sin(하루 주기). base는 intensities[zone] (없으면 default_intensity).
+    """
+
+    handler = _CarbonApiHandler
+
+    def __init__(self, intensities=None, default_intensity=300.0, amplitude=0.3, latency_ms=0.0, jitter_ms=0.0):
+        super().__init__(latency_ms, jitter_ms)
+        self.intensities = dict(intensities or {})
+        self.default_intensity = default_intensity
+        self.amplitude = amplitude
+        self.calls = 0
+
+    def intensity(self, zone, at):
+        base = self.intensities.get(zone, self.default_intensity)
+        return round(base * (1 + self.amplitude * math.sin(2 * math.pi * at.hour / 24)), 1)
+
+    def point(self, zone, at):
+        return {"zone": zone, "carbonIntensity": self.intensity(zone, at),
+                "datetime": at.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+
+    def series(self, zone, first_hour, last_hour):
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return [self.point(zone, now + timedelta(hours=h)) for h in range(first_hour, last_hour + 1)]
+
+
+# --- Dispatcher ---
+class _DispatcherHandler(_Handler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self._delay()
+        self.server.owner.received(body.get("task_name"), body.get("cluster"))
+        self._reply(200, json.dumps({"status": "ok"}))
+
+
+class FakeDispatcher(_FakeServer):
+    """받은 작업을 {task_name: (받은 시각, cluster)}로 기록한다. wait_for()로 모두 도착할 때까지 기다릴 수 있다."""
+
+    handler = _DispatcherHandler
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0):
+        super().__init__(latency_ms, jitter_ms)
+        self.arrivals = {}
+        self._cond = threading.Condition()
+
+    def received(self, task_name, cluster):
+        with self._cond:
+            self.arrivals.setdefault(task_name, (time.time(), cluster))
+            self._cond.notify_all()
+
+    def wait_for(self, count, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.arrivals) >= count, timeout=timeout)
@@ -0,0 +1,139 @@
+################################################
+# 실행기(Serving Loop)의 클러스터 동시 프로빙(Probing) 단계입니다.
+# 리소스 사용률은 cluster_state의 메모리 스냅샷에서 읽고,
+# 탄소 조회는 모든 클러스터에 대해 한 번에 병렬로 요청합니다.
+# 시간 안에 응답하지 않은 클러스터는 마지막으로 알려진 값으로 대체합니다.
+################################################
+
+from carbon_collector.carbon_timeline import timeline_store
+from cluster_state import STATE_MAX_AGE_SEC
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+import metrics
+import threading
+import logging
+import math
+import time
+import os
+
+
+# 프로브 설정 (환경변수로 조정 가능)
+PROBE_TIMEOUT_SEC = float(os.getenv("PROBE_TIMEOUT_SEC", 3))            # 클러스터 1개 프로브 제한 시간
+DECISION_DEADLINE_SEC = float(os.getenv("DECISION_DEADLINE_SEC", 5))    # 배치 결정 전체 제한 시간
+PROBE_WORKERS = int(os.getenv("PROBE_WORKERS", 16))
+
+_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="probe")
+
+# 마지막으로 알려진 값: {cluster_name: {"carbon_timeline": .., "updated_at": ..}}
+_last_known = {}
+# 아직 끝나지 않은 프로브: {(cluster_name, kind): Future}
+_inflight = {}
+_lock = threading.Lock()
+
+
+def _probe_carbon(node_obj):
+    """region의 탄소 타임라인만 가져온다(캐시 사용). 배출량은 작업 시간에 따라 달라지므로 수집 후 계산한다."""
+    return timeline_store.timeline(node_obj.region)
+
+
+def _submit(node_name, kind, fn, *args):
+    """
+    같은 클러스터에 대한 이전 프로브가 아직 진행 중이면 새로 보내지 않고 그 결과를 기다린다.
+    느린 node_exporter 하나가 워커 스레드를 계속 잡아먹는 것을 막기 위함.
+    """
+    key = (node_name, kind)
+    with _lock:
+        future = _inflight.get(key)
+        is_new = future is None or future.done()
+        if is_new:
+            future = _executor.submit(fn, *args)
+            _inflight[key] = future
+    if is_new:
+        # 제한 시간 이후에 끝난 프로브의 결과도 다음 결정을 위해 남겨둔다.
+        future.add_done_callback(lambda f: _remember(node_name, kind, f))
+    return future
+
+
+def _remember(node_name, field, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    with _lock:
+        entry = _last_known.setdefault(node_name, {})
+        entry[field] = future.result()
+        entry["updated_at"] = time.time()
+
+
+def _recall(node_name, field):
+    with _lock:
+        return _last_known.get(node_name, {}).get(field)
+
+
+def _collect(node_name, kind, future):
+    """완료된 future면 그 결과를, 아니면 마지막으로 알려진 값을 반환. (값, 새 값 여부)"""
+    if future.done():
+        try:
+            return future.result(), True
+        except Exception as e:
+            logging.warning(f"⚠ {node_name} {kind} 프로브 실패: {e}")
+    return _recall(node_name, kind), False
+
+
+def probe_clusters(nodes, estimated_time, snapshot,
+                   probe_timeout=PROBE_TIMEOUT_SEC, deadline=DECISION_DEADLINE_SEC):
+    """
+    리소스 사용률은 스냅샷에서 읽고, 탄소 집약도는 모든 클러스터에 동시에 조회한다.
+    결정 지연은 프로브 합이 아니라 가장 느린 프로브(최대 min(probe_timeout, deadline))를 따른다.
+
+    :param nodes: {cluster_name: Node}
+    :param snapshot: cluster_state.ClusterSnapshot
+    :param estimated_time: 작업 예상 시간(초)
+    :return: [{"node_obj", "usage", "carbon", "carbon_intensity", "timeline", "remaining_time", "available", "stale"}, ...]
+             carbon은 지금부터 estimated_time초 동안의 배출량, carbon_intensity는 그 구간의 평균 집약도
+             (탄소 타임라인이 없으면 둘 다 NaN - scoring.score_clusters가 가장 나쁜 값으로 본다)
+             (nodes 순서 유지, 사용률을 전혀 알 수 없는 클러스터는 available=False)
+    """
+    with metrics.stage_duration.labels('carbon_lookup').time():
+        futures = {node_name: _submit(node_name, "carbon_timeline", _probe_carbon, node_obj)
+                   for node_name, node_obj in nodes.items()}
+        wait(futures.values(), timeout=min(probe_timeout, deadline))
+
+    now = time.time()
+    processed_nodes_data = []
+    for node_name, node_obj in nodes.items():
+        state = snapshot.clusters.get(node_name)
+        usage = state.cpu if state else None
+        usage_fresh = state is not None and state.age(now) <= STATE_MAX_AGE_SEC
+        timeline, carbon_fresh = _collect(node_name, "carbon_timeline", futures[node_name])
+
+        stale = not (usage_fresh and carbon_fresh)
+        if stale:
+            logging.warning(f"⚠ {node_name} 최신 값 없음 - 마지막 값 사용 (usage={usage}, carbon_timeline={timeline is not None})")
+
+        # 조회에 실패한 region을 탄소 0(가장 깨끗한 곳)으로 보지 않는다.
+        carbon = float(timeline.integrate(now, estimated_time)) if timeline is not None else math.nan
+        intensity = float(timeline.mean(now, estimated_time)) if timeline is not None else math.nan
+        processed_nodes_data.append({
+            "node_obj": node_obj,
+            "usage": usage,
+            "carbon": round(carbon, 2),
+            "carbon_intensity": intensity,
+            "timeline": timeline,
+            "remaining_time": node_obj.get_remaining_time(),
+            "available": usage is not None,
+            "stale": stale
+        })
+
+    return processed_nodes_data
+
+
+def emission_matrix(processed_nodes_data, start, estimated_times):
+    """
+    작업 x 클러스터 배출량 행렬 (T, C) - 클러스터마다 [start, start + 작업 시간) 구간 적분.
+    탄소 타임라인이 없는 클러스터의 열은 probe_clusters와 같이 NaN이다.
+    """
+    estimated_times = np.asarray(estimated_times, dtype=float)
+    unknown = np.full(len(estimated_times), np.nan)
+    return np.round(np.column_stack([
+        d["timeline"].integrate(start, estimated_times) if d["timeline"] is not None else unknown
+        for d in processed_nodes_data
+    ]), 2)
@@ -0,0 +1,154 @@
+################################################
+# 스케줄러 프로세스 안에서 동작하는 클러스터 상태 수집기입니다.
+# 고정 주기로 모든 클러스터의 node_exporter를 수집하고, 버전이 붙은 스냅샷을 메모리에 유지합니다.
+# 실행기(process_task)는 네트워크 I/O 없이 최신 스냅샷만 읽습니다.
+################################################
+
+from resource_collector.new_collector import (
+    fetch_metrics_text, parse_cpu_times, parse_memory_stats, compute_cpu_usage, compute_mem_usage
+)
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import metrics
+import threading
+import logging
+import time
+import os
+
+
+STATE_REFRESH_INTERVAL_SEC = float(os.getenv("STATE_REFRESH_INTERVAL_SEC", 5))
+STATE_SCRAPE_TIMEOUT_SEC = float(os.getenv("STATE_SCRAPE_TIMEOUT_SEC", 3))
+STATE_PRIME_INTERVAL_SEC = float(os.getenv("STATE_PRIME_INTERVAL_SEC", 1))
+STATE_MAX_AGE_SEC = float(os.getenv("STATE_MAX_AGE_SEC", STATE_REFRESH_INTERVAL_SEC * 3))
+NODE_EXPORTER_PORT = int(os.getenv("NODE_EXPORTER_PORT", 9100))
+
+
+@dataclass(frozen=True)
+class ClusterState:
+    cluster_name: str
+    cpu: Optional[float]        # CPU 사용률(%) - 기준 스냅샷이 없으면 None
+    mem: Optional[float]        # 메모리 사용률(%)
+    scraped_at: float           # 마지막으로 수집에 성공한 시각 (time.time)
+
+    def age(self, now: float = None) -> float:
+        return (now or time.time()) - self.scraped_at
+
+
+@dataclass(frozen=True)
+class ClusterSnapshot:
+    version: int
+    taken_at: float
+    clusters: Dict[str, ClusterState] = field(default_factory=dict)
+
+
+class ClusterStateService:
+    """
+    node_exporter를 주기적으로 수집하는 백그라운드 스레드.
+    스냅샷은 매 주기마다 새 객체로 교체되므로 읽는 쪽은 잠금 없이 참조만 가져가면 된다.
+    """
+
+    def __init__(self, nodes, interval_sec=STATE_REFRESH_INTERVAL_SEC,
+                 scrape_timeout=STATE_SCRAPE_TIMEOUT_SEC, max_workers=16):
+        self.nodes = nodes
+        self.interval_sec = interval_sec
+        self.scrape_timeout = scrape_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="state")
+        self._cpu_counters = {}     # cluster_name -> 직전 CPU 누적 시간
+        self._inflight = {}         # cluster_name -> 진행 중인 수집
+        self._snapshot = ClusterSnapshot(version=0, taken_at=0.0)
+        self._changed = threading.Condition()
+        self._listeners = []        # 새 스냅샷마다 호출할 콜백
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- 읽기 ---
+    def snapshot(self) -> ClusterSnapshot:
+        return self._snapshot
+
+    def wait_for_update(self, version: int, timeout: float = None) -> ClusterSnapshot:
+        """스냅샷 버전이 version보다 커질 때까지(또는 timeout까지) 기다린다."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._snapshot.version > version, timeout=timeout)
+            return self._snapshot
+
+    def add_listener(self, callback):
+        """새 스냅샷이 만들어질 때마다 callback(snapshot)을 수집 스레드에서 호출한다. (짧게 끝나야 함)"""
+        self._listeners.append(callback)
+
+    # --- 수집 ---
+    def _scrape(self, node_obj):
+        # cluster_ip에 포트가 있으면(host:port) 그대로, 없으면 node_exporter 기본 포트 사용
+        endpoint = node_obj.cluster_ip if ":" in node_obj.cluster_ip else f'{node_obj.cluster_ip}:{NODE_EXPORTER_PORT}'
+        text = fetch_metrics_text(endpoint, self.scrape_timeout)
+        total, avail = parse_memory_stats(text)
+        return parse_cpu_times(text), compute_mem_usage(total, avail)
+
+    @metrics.stage_duration.labels('resource_probe').time()
+    def refresh_once(self) -> ClusterSnapshot:
+        futures = {}
+        for name, node_obj in self.nodes.items():
+            future = self._inflight.get(name)
+            if future is None or future.done():
+                future = self._executor.submit(self._scrape, node_obj)
+                self._inflight[name] = future
+            futures[name] = future
+        wait(futures.values(), timeout=self.scrape_timeout)
+
+        now = time.time()
+        previous = self._snapshot.clusters
+        clusters = {}
+        for name, future in futures.items():
+            state = previous.get(name)
+            if future.done():
+                try:
+                    cpu_times, mem = future.result()
+                    prev_times = self._cpu_counters.get(name)
+                    cpu = compute_cpu_usage(prev_times, cpu_times) if prev_times else None
+                    self._cpu_counters[name] = cpu_times
+                    if cpu is None and state is not None:
+                        cpu = state.cpu
+                    state = ClusterState(name, cpu, mem, now)
+                except Exception as e:
+                    logging.warning(f"⚠ {name} 상태 수집 실패: {e}")
+            else:
+                logging.warning(f"⚠ {name} 상태 수집 시간 초과 - 이전 값 유지")
+            if state is not None:
+                clusters[name] = state
+
+        with self._changed:
+            self._snapshot = ClusterSnapshot(self._snapshot.version + 1, now, clusters)
+            self._changed.notify_all()
+        snapshot = self._snapshot
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logging.error(f"❌ 상태 변경 콜백 오류: {e}")
+        return snapshot
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logging.error(f"❌ 클러스터 상태 갱신 중 오류: {e}")
+
+    def start(self, prime=True):
+        """
+        수집 스레드를 시작한다.
+        prime=True면 CPU 기준값을 잡기 위해 짧은 간격으로 두 번 수집한 뒤 반환하므로
+        첫 결정부터 0.0이 아닌 실제 CPU 사용률을 사용한다.
+        """
+        if self._thread is not None:
+            return
+        if prime:
+            self.refresh_once()
+            time.sleep(STATE_PRIME_INTERVAL_SEC)
+            self.refresh_once()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="cluster-state")
+        self._thread.start()
+        logging.info(f"클러스터 상태 수집 시작 (주기: {self.interval_sec}초, 버전: {self._snapshot.version})")
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,172 @@
+################################################
+# 스케줄러 결정 로그(task_log.csv, cluster.log) 기록기입니다.
+# 실행기는 메모리 버퍼에 레코드만 넣고, 백그라운드 스레드가 모아서 파일에 씁니다.
+# 파일이 크기 / 시간 기준을 넘으면 이름을 바꾸고 gzip으로 압축해 보관합니다.
+# format="parquet"이면 pyarrow가 있을 때 열 단위(Parquet) 파일로 기록합니다.
+################################################
+
+import threading
+import logging
+import atexit
+import shutil
+import glob
+import gzip
+import time
+import csv
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # 선택 의존성 - parquet 형식을 쓸 때만 필요
+    pa = None
+    pq = None
+
+
+LOG_FLUSH_SEC = float(os.getenv("DECISION_LOG_FLUSH_SEC", 1))
+LOG_MAX_BUFFER = int(os.getenv("DECISION_LOG_MAX_BUFFER", 10000))                # 이 개수가 쌓이면 바로 기록
+LOG_MAX_BYTES = int(os.getenv("DECISION_LOG_MAX_BYTES", 50 * 1024 * 1024))      # 0이면 크기 기준 교체 안 함
+LOG_ROTATE_SEC = float(os.getenv("DECISION_LOG_ROTATE_SEC", 24 * 3600))          # 0이면 시간 기준 교체 안 함
+LOG_BACKUP_COUNT = int(os.getenv("DECISION_LOG_BACKUP_COUNT", 14))               # 보관할 압축 파일 수
+
+_PA_TYPES = {"str": "string", "float": "float64", "int": "int64"}
+
+
+class DecisionLogWriter:
+    """
+    :param path: 기록할 파일 경로
+    :param fmt: "csv" (리스트 레코드), "text" (문자열 레코드, 한 줄씩), "parquet" (리스트 레코드, 열 단위)
+    :param columns: [(열 이름, "str" | "float" | "int"), ...] - csv 헤더 / parquet 스키마
+    """
+
+    def __init__(self, path, fmt="csv", columns=None, flush_sec=LOG_FLUSH_SEC, max_buffer=LOG_MAX_BUFFER,
+                 max_bytes=LOG_MAX_BYTES, rotate_sec=LOG_ROTATE_SEC, backup_count=LOG_BACKUP_COUNT):
+        if fmt == "parquet" and pa is None:
+            logging.warning("⚠ pyarrow가 없어 parquet 대신 csv로 기록합니다.")
+            fmt = "csv"
+            path = os.path.splitext(path)[0] + ".csv"
+        self.path = path
+        self.fmt = fmt
+        self.columns = columns or []
+        self.flush_sec = flush_sec
+        self.max_buffer = max_buffer
+        self.max_bytes = max_bytes
+        self.rotate_sec = rotate_sec
+        self.backup_count = backup_count
+
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()        # 파일 기록 / 교체는 한 번에 하나만
+        self._opened_at = time.time()
+        self._parquet = None                    # 열려 있는 pq.ParquetWriter
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=f"log-{os.path.basename(path)}")
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- 기록 요청 (실행기 스레드) ---
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        with self._cond:
+            self._buffer.extend(records)
+            if len(self._buffer) >= self.max_buffer:
+                self._cond.notify()
+
+    # --- 백그라운드 기록 ---
+    def _loop(self):
+        while not self._closed:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._buffer) >= self.max_buffer or self._closed,
+                                    timeout=self.flush_sec)
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"❌ {self.path} 기록 중 오류: {e}")
+
+    def flush(self):
+        with self._cond:
+            records, self._buffer = self._buffer, []
+        with self._io_lock:
+            if self._should_rotate():
+                self._rotate()
+            if records:
+                if self.fmt == "parquet":
+                    self._write_parquet(records)
+                else:
+                    self._write_text(records)
+
+    def _write_text(self, records):
+        is_new = not os.path.exists(self.path)
+        with open(self.path, mode='a', newline='', encoding='utf-8') as file:
+            if self.fmt == "text":
+                file.writelines(records)
+                return
+            writer = csv.writer(file)
+            if is_new and self.columns:
+                writer.writerow([name for name, _ in self.columns])
+            writer.writerows(records)
+
+    def _write_parquet(self, records):
+        schema = pa.schema([(name, _PA_TYPES[kind]) for name, kind in self.columns])
+        if self._parquet is None:
+            if os.path.exists(self.path):
+                self._rotate()  # 이전 실행에서 남은 파일은 이어 쓸 수 없으므로 보관 처리
+            self._opened_at = time.time()
+            self._parquet = pq.ParquetWriter(self.path, schema)
+        # csv 레코드의 "-", 상태 문구 등 형식에 맞지 않는 값은 null로 기록
+        columns = list(zip(*records))
+        arrays = [pa.array([_coerce(v, kind) for v in values], type=_PA_TYPES[kind])
+                  for (_, kind), values in zip(self.columns, columns)]
+        self._parquet.write_table(pa.Table.from_arrays(arrays, schema=schema))   # flush 한 번 = row group 하나
+
+    # --- 파일 교체 ---
+    def _should_rotate(self):
+        if not os.path.exists(self.path):
+            self._opened_at = time.time()
+            return False
+        if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+            return True
+        return bool(self.rotate_sec) and time.time() - self._opened_at >= self.rotate_sec
+
+    def _rotate(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        root, ext = os.path.splitext(self.path)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        rotated, seq = f"{root}.{stamp}{ext}", 1
+        while os.path.exists(rotated + ".gz"):
+            rotated, seq = f"{root}.{stamp}-{seq}{ext}", seq + 1
+        os.replace(self.path, rotated)
+        with open(rotated, 'rb') as src, gzip.open(rotated + ".gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        self._opened_at = time.time()
+        logging.info(f"로그 파일 교체: {self.path} -> {rotated}.gz")
+
+        backups = sorted(glob.glob(f"{root}.*{ext}.gz"), key=os.path.getmtime)
+        for old in backups[:max(0, len(backups) - self.backup_count)]:
+            os.remove(old)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        with self._cond:
+            self._cond.notify()
+        self.flush()
+        with self._io_lock:
+            if self._parquet is not None:
+                self._parquet.close()
+                self._parquet = None
+
+
+def _coerce(value, kind):
+    if value is None or kind == "str":
+        return None if value is None else str(value)
+    try:
+        return float(value) if kind == "float" else int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,113 @@
+################################################
+# 배치 보류(Deferred Placement) 단계입니다.
+# 모든 클러스터가 포화 상태라 배치하지 못한 작업을 잠시 보관하고,
+# 다음 중 하나가 일어나면 작업 큐로 돌려보내 다시 평가하게 합니다.
+#   - 새 클러스터 상태 스냅샷에 여유 있는 클러스터가 보임
+#   - 작업 완료 알림(notify) 또는 예약된 작업의 예상 종료 시각 도달
+#   - 작업별 백오프 시간 경과 (DEFER_BACKOFF_SEC부터 두 배씩, 최대 DEFER_BACKOFF_MAX_SEC)
+# 보류 중에도 실행기 스레드는 큐의 다른 작업을 계속 처리합니다.
+################################################
+
+from datetime import datetime
+import metrics
+import threading
+import logging
+import time
+import os
+
+
+DEFER_BACKOFF_SEC = float(os.getenv("DEFER_BACKOFF_SEC", 5))
+DEFER_BACKOFF_MAX_SEC = float(os.getenv("DEFER_BACKOFF_MAX_SEC", 60))
+
+
+class DeferredPlacement:
+    """
+    :param requeue: 보류가 풀린 작업 리스트를 받아 작업 큐에 다시 넣는 함수
+    :param has_headroom: 스냅샷을 받아 배치 가능한 클러스터가 있으면 True를 반환하는 함수
+    :param nodes: {cluster_name: Node} - 예약된 작업의 예상 종료 시각을 깨울 시점으로 사용
+    """
+
+    def __init__(self, requeue, has_headroom, nodes,
+                 backoff_sec=DEFER_BACKOFF_SEC, backoff_max_sec=DEFER_BACKOFF_MAX_SEC):
+        self.requeue = requeue
+        self.has_headroom = has_headroom
+        self.nodes = nodes
+        self.backoff_sec = backoff_sec
+        self.backoff_max_sec = backoff_max_sec
+        self._parked = []               # [(다시 시도할 시각, task)]
+        self._wake_all = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def park(self, tasks, reason="모든 노드가 미배치 상태입니다."):
+        """배치하지 못한 작업을 보류한다. 보류될 때마다 해당 작업의 백오프가 두 배로 늘어난다."""
+        now = time.time()
+        with self._cond:
+            for task in tasks:
+                attempts = task.get("deferred", 0) + 1
+                task["deferred"] = attempts
+                delay = min(self.backoff_max_sec, self.backoff_sec * (2 ** (attempts - 1)))
+                self._parked.append((now + delay, task))
+                metrics.deferred_tasks.inc()
+                logging.warning(f"⚠ {reason} {task.get('task_name')} 보류 "
+                                f"({attempts}회째, 최대 {delay:.0f}초 후 재시도)")
+            self._cond.notify()
+
+    def size(self):
+        return len(self._parked)
+
+    # --- 깨우기 ---
+    def notify(self):
+        """작업 완료 등으로 자리가 생겼을 수 있을 때 호출하면 보류된 작업을 모두 다시 평가한다."""
+        with self._cond:
+            self._wake_all = True
+            self._cond.notify()
+
+    def on_snapshot(self, snapshot):
+        """ClusterStateService 리스너 - 여유 있는 클러스터가 보이면 보류된 작업을 모두 깨운다."""
+        if self._parked and self.has_headroom(snapshot):
+            self.notify()
+
+    def _next_completion(self):
+        """예약된 작업 중 가장 먼저 끝날 것으로 예상되는 시각 (time.time 기준)"""
+        now = datetime.now()
+        finishes = [node_obj.expected_finish_at for node_obj in self.nodes.values()
+                    if node_obj.expected_finish_at is not None and node_obj.expected_finish_at > now]
+        return min(finishes).timestamp() if finishes else None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                completion = None
+                while True:
+                    now = time.time()
+                    if self._parked and (self._wake_all or (completion is not None and completion <= now)):
+                        due, self._parked = [task for _, task in self._parked], []
+                        break
+                    due = [task for at, task in self._parked if at <= now]
+                    if due:
+                        self._parked = [(at, task) for at, task in self._parked if at > now]
+                        break
+                    if not self._parked:
+                        self._wake_all = False
+                        self._cond.wait()
+                        continue
+                    completion = self._next_completion()
+                    wake_at = min(at for at, _ in self._parked)
+                    if completion is not None:
+                        wake_at = min(wake_at, completion)
+                    self._cond.wait(max(0.0, wake_at - now))
+                self._wake_all = False
+
+            logging.info(f"보류된 작업 {len(due)}개 다시 평가")
+            try:
+                self.requeue(due)
+            except Exception as e:
+                logging.error(f"❌ 보류 작업 재등록 중 오류: {e}")
+                self.park(due)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="deferred-placement")
+        self._thread.start()
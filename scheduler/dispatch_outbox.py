@@ -0,0 +1,186 @@
+################################################
+# 스케줄러 -> Dispatcher 전달 단계 (outbox).
+# 배치가 결정된 작업을 SQLite 파일에 먼저 기록하고, 별도 전달 스레드가 Dispatcher에 보냅니다.
+# 실행기는 Dispatcher 응답을 기다리지 않으며, 실패한 전달은 백오프 후 다시 보냅니다.
+# 요청마다 Idempotency-Key 헤더를 붙여, 재전송되어도 Dispatcher가 작업을 두 번 만들지 않게 합니다.
+################################################
+
+import metrics
+import threading
+import requests
+import sqlite3
+import logging
+import heapq
+import time
+import uuid
+import os
+
+
+DISPATCHER_URL = os.getenv("DISPATCHER_URL", 'http://localhost:5000/new-task')
+DISPATCH_OUTBOX_PATH = os.getenv("DISPATCH_OUTBOX_PATH", "dispatch_outbox.db")
+DISPATCH_CONCURRENCY = int(os.getenv("DISPATCH_CONCURRENCY", 4))          # 동시에 보내는 최대 요청 수
+DISPATCH_TIMEOUT_SEC = float(os.getenv("DISPATCH_TIMEOUT_SEC", 10))
+DISPATCH_MAX_ATTEMPTS = int(os.getenv("DISPATCH_MAX_ATTEMPTS", 10))
+DISPATCH_BACKOFF_SEC = float(os.getenv("DISPATCH_BACKOFF_SEC", 1))
+DISPATCH_BACKOFF_MAX_SEC = float(os.getenv("DISPATCH_BACKOFF_MAX_SEC", 60))
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS dispatch_outbox (
+        idempotency_key TEXT PRIMARY KEY,
+        task_name       TEXT NOT NULL,
+        cluster         TEXT NOT NULL,
+        attempts        INTEGER NOT NULL DEFAULT 0,
+        status          TEXT NOT NULL DEFAULT 'pending',   -- pending | failed
+        last_error      TEXT NULL,
+        created_at      REAL NOT NULL
+    )
+"""
+
+# 다시 보내 볼 만한 응답 코드 (그 외 4xx는 다시 보내도 같은 결과)
+_RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+class DispatchOutbox:
+    """
+    add_many()로 기록된 배치 결과를 DISPATCH_CONCURRENCY개의 전달 스레드가 Dispatcher에 보낸다.
+    전달에 성공하면 기록을 지우고, DISPATCH_MAX_ATTEMPTS번 실패하면 status='failed'로 남긴다.
+    재시작하면 pending 상태의 기록을 다시 보낸다.
+    """
+
+    def __init__(self, path=DISPATCH_OUTBOX_PATH, url=DISPATCHER_URL, concurrency=DISPATCH_CONCURRENCY):
+        self.url = url
+        self.concurrency = concurrency
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # keep-alive 세션 하나를 전달 스레드가 같이 쓴다.
+        self._http = requests.Session()
+        self._http.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        self._http.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+        self._due = []                  # [(보낼 시각, 순번, entry)] - 힙
+        self._seq = 0
+        self._has_due = threading.Condition()
+        self._threads = []
+
+    # --- 기록 ---
+    def add_many(self, placements):
+        """
+        배치 결과를 한 트랜잭션으로 기록하고 전달 대기열에 넣는다.
+        :param placements: [(task_name, cluster), ...]
+        :return: 발급한 idempotency key 리스트
+        """
+        now = time.time()
+        entries = [{"idempotency_key": uuid.uuid4().hex, "task_name": task_name, "cluster": cluster, "attempts": 0}
+                   for task_name, cluster in placements]
+        with self._db_lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO dispatch_outbox (idempotency_key, task_name, cluster, created_at) VALUES (?, ?, ?, ?)",
+                    [(e["idempotency_key"], e["task_name"], e["cluster"], now) for e in entries])
+        for entry in entries:
+            self._schedule(entry, now)
+        return [e["idempotency_key"] for e in entries]
+
+    def _replay(self):
+        with self._db_lock:
+            rows = self._conn.execute("""
+                SELECT idempotency_key, task_name, cluster, attempts
+                  FROM dispatch_outbox
+                 WHERE status = 'pending'
+                 ORDER BY created_at
+            """).fetchall()
+        now = time.time()
+        for key, task_name, cluster, attempts in rows:
+            self._schedule({"idempotency_key": key, "task_name": task_name, "cluster": cluster, "attempts": attempts}, now)
+        if rows:
+            logging.info(f"전달 대기열 복구: 전달되지 않은 배치 결과 {len(rows)}개 다시 전송")
+
+    def _schedule(self, entry, at):
+        with self._has_due:
+            heapq.heappush(self._due, (at, self._seq, entry))
+            self._seq += 1
+            self._has_due.notify()
+
+    def pending_size(self):
+        return len(self._due)
+
+    # --- 전달 ---
+    def _next_due(self):
+        with self._has_due:
+            while True:
+                if self._due:
+                    wait_sec = self._due[0][0] - time.time()
+                    if wait_sec <= 0:
+                        return heapq.heappop(self._due)[2]
+                    self._has_due.wait(wait_sec)
+                else:
+                    self._has_due.wait()
+
+    def _send(self, entry):
+        """한 번 보낸다. (성공 여부, 다시 보낼지 여부, 오류 메시지)"""
+        data = {
+            'cluster': entry["cluster"],
+            'task_name': entry["task_name"]
+        }
+        try:
+            with metrics.stage_duration.labels('dispatch_post').time():
+                response = self._http.post(self.url, json=data, timeout=DISPATCH_TIMEOUT_SEC,
+                                           headers={'Idempotency-Key': entry["idempotency_key"]})
+        except requests.exceptions.RequestException as e:
+            return False, True, str(e)
+        logging.info(f'Status Code: {response.status_code}')
+        if response.ok:
+            logging.info(f'Response Body: {response.text}')
+            return True, False, None
+        retry = response.status_code >= 500 or response.status_code in _RETRYABLE_STATUS
+        return False, retry, f"{response.status_code} {response.text[:200]}"
+
+    def _deliver(self, entry):
+        ok, retry, error = self._send(entry)
+        entry["attempts"] += 1
+        if ok:
+            logging.info(f'Success Dispatching: {entry["task_name"]} -> {entry["cluster"]}')
+            with self._db_lock:
+                with self._conn:
+                    self._conn.execute("DELETE FROM dispatch_outbox WHERE idempotency_key = ?",
+                                       (entry["idempotency_key"],))
+            return
+
+        give_up = not retry or entry["attempts"] >= DISPATCH_MAX_ATTEMPTS
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE dispatch_outbox SET attempts = ?, status = ?, last_error = ? WHERE idempotency_key = ?",
+                    (entry["attempts"], 'failed' if give_up else 'pending', error, entry["idempotency_key"]))
+        if give_up:
+            metrics.dispatch_failures.inc()
+            logging.error(f'❌ Dispatch Failed: {entry["task_name"]} ({entry["attempts"]}회 시도): {error}')
+            return
+
+        metrics.dispatch_retries.inc()
+        delay = min(DISPATCH_BACKOFF_MAX_SEC, DISPATCH_BACKOFF_SEC * (2 ** (entry["attempts"] - 1)))
+        logging.warning(f'⚠ {entry["task_name"]} 전달 실패 ({entry["attempts"]}/{DISPATCH_MAX_ATTEMPTS}, '
+                        f'{delay:.1f}초 후 재시도): {error}')
+        self._schedule(entry, time.time() + delay)
+
+    def _loop(self):
+        while True:
+            entry = self._next_due()
+            try:
+                self._deliver(entry)
+            except Exception as e:
+                logging.error(f"❌ 전달 처리 중 오류: {e}")
+                self._schedule(entry, time.time() + DISPATCH_BACKOFF_MAX_SEC)
+
+    def start(self):
+        if self._threads:
+            return
+        self._replay()
+        self._threads = [threading.Thread(target=self._loop, daemon=True, name=f"dispatch-{i}")
+                         for i in range(self.concurrency)]
+        for thread in self._threads:
+            thread.start()
+        logging.info(f"전달 스레드 {self.concurrency}개 시작 ({self.url})")
@@ -1,39 +1,26 @@
-import mysql.connector
 import os
+import sys
 from dotenv import load_dotenv
 import random
 import copy
 
-load_dotenv()
-
-# DB 접속 정보를 딕셔너리로 관리
-db_config = {
-    "host": os.getenv("MYSQL_HOST", "localhost"),
-    "port": int(os.getenv("MYSQL_PORT", 3306)),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD", ""),
-    "database": "carbonetes",
-    "charset": "utf8"  # 문자 인코딩 설정 추가
-}
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from weights_store import load_latest_weights
+from common import db
 
-def connect_db():
-    """
-    db_config 딕셔너리를 사용하여 데이터베이스에 연결합니다.
-    """
-    # **db_config는 딕셔너리의 모든 항목을 키워드 인자로 풀어줍니다.
-    return mysql.connector.connect(**db_config)
+load_dotenv()
 
 # -------------------------------------------
-# 최근 가중치 로드 (변경 없음)
+# 최근 가중치 로드 (weights_history 최신 버전)
 # -------------------------------------------
 def get_current_weight():
-    conn = connect_db()
-    # 결과를 딕셔너리 형태로 받기 위해 cursor 생성 시 dictionary=True 옵션을 사용합니다.
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM weights LIMIT 1;")  # 가장 최근 1개
-    result = cursor.fetchone()
-    conn.close()
-    return result
+    latest = load_latest_weights()
+    if latest is None:
+        # 발행된 버전이 아직 없으면 기존 weights 테이블 사용
+        return db.fetch_one("SELECT a_w, b_w, c_w, d_w FROM weights LIMIT 1")
+    version, weights = latest
+    return weights
 
 # -------------------------------------------
 # 돌연변이 (변경 없음)
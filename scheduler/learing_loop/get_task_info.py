@@ -1,6 +1,10 @@
-import mysql.connector
+import os
+import sys
 from mysql.connector import Error
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import db
+
 # 키(Key) 변환을 위한 매핑 규칙 정의
 _KEY_MAPPING = {
     'id': 'task_id',
@@ -16,25 +20,20 @@ _KEY_MAPPING = {
     'queue_delay': 'queue_delay'
 }
 
-def get_processed_tasks(db_config: dict) -> list:
+def get_processed_tasks(limit: int = 10) -> list:
     """
-    데이터베이스에서 최신 태스크 10개를 가져와 계산 및 키 변환 후 리스트로 반환합니다.
+    데이터베이스에서 최신 태스크를 가져와 계산 및 키 변환 후 리스트로 반환합니다.
 
     Args:
-        db_config (dict): 데이터베이스 연결 설정 딕셔너리
+        limit (int): 가져올 최신 태스크 수
 
     Returns:
         list: 최종 처리된 태스크 데이터 (딕셔너리 리스트).
               오류 발생 시 빈 리스트를 반환합니다.
     """
     original_data = []
-    connection = None
-    cursor = None
-    
-    try:
-        connection = mysql.connector.connect(**db_config)
-        cursor = connection.cursor(dictionary=True)
 
+    try:
         query = """
         SELECT
             id, task_name, dispatched_at, estimated_time, completed_at,
@@ -43,24 +42,19 @@ def get_processed_tasks(db_config: dict) -> list:
             TIMESTAMPDIFF(SECOND, dispatched_at, completed_at) AS actual_runtime
         FROM
             task_info
+        WHERE
+            dispatched_at IS NOT NULL
         ORDER BY
             created_at DESC
-        LIMIT 10;
+        LIMIT %s;
         """
-        cursor.execute(query)
-        original_data = cursor.fetchall()
+        original_data = db.fetch_all(query, (int(limit),))
 
     except Error as e:
         # 실제 운영 환경에서는 print 대신 로깅(logging) 라이브러리를 사용하는 것이 좋습니다.
         print(f"❌ 데이터베이스 처리 중 오류 발생: {e}")
         return [] # 오류가 발생하면 빈 리스트를 반환
 
-    finally:
-        if cursor:
-            cursor.close()
-        if connection and connection.is_connected():
-            connection.close()
-
     # --- 키 변환 로직 ---
     transformed_data = []
     for row in original_data:
@@ -70,4 +64,36 @@ def get_processed_tasks(db_config: dict) -> list:
                 new_row[new_key] = row[original_key]
         transformed_data.append(new_row)
         
-    return transformed_data
\ No newline at end of file
+    return transformed_data
+
+def get_processed_task_chunks(limit: int = 10, size: int = None):
+    """
+    get_processed_tasks()와 같은 태스크를 dict 없이 튜플 묶음으로 나눠 돌려주는 제너레이터입니다.
+    행의 열 순서는 sim_bridge.TRACE_COLUMNS와 같습니다. (sim_bridge.trace_from_chunks로 바로 넘김)
+
+    Args:
+        limit (int): 가져올 최신 태스크 수
+        size (int): 한 묶음의 행 수 (기본 db.DB_FETCH_CHUNK)
+
+    Yields:
+        list: (task_id, task_name, dispatched_at, actual_runtime, estimated_runtime,
+               avg_cpu_usage, carbon_intensity, cluster_name) 튜플 리스트.
+              오류가 발생하면 그때까지 읽은 묶음만 돌려주고 멈춥니다.
+    """
+    query = """
+    SELECT
+        id, task_name, dispatched_at,
+        TIMESTAMPDIFF(SECOND, dispatched_at, completed_at) AS actual_runtime,
+        estimated_time, cpu_m, carbon_intensity, cluster_name
+    FROM
+        task_info
+    WHERE
+        dispatched_at IS NOT NULL
+    ORDER BY
+        created_at DESC
+    LIMIT %s;
+    """
+    try:
+        yield from db.fetch_chunks(query, (int(limit),), size=size or db.DB_FETCH_CHUNK)
+    except Error as e:
+        print(f"❌ 데이터베이스 처리 중 오류 발생: {e}")
@@ -3,59 +3,68 @@
 ################################################
 
 import os
+import sys
 import logging
 import random 
 import copy 
-import mysql.connector
 from mysql.connector import Error
 
 
 # Module import 
-from get_task_info import get_processed_tasks # [2] 로그 수집
+from get_task_info import get_processed_task_chunks # [2] 로그 수집
 from generate import generate_candidates      # [3] 초기 개체군 형성
-from sim_bridge import run_simulation_as_dicts_from_modules # [4] 시뮬레이션(재실행 가상화)
+from sim_bridge import run_simulation_as_dicts_from_modules, trace_from_chunks # [4] 시뮬레이션(재실행 가상화)
 from calculate_fitness import calculate_and_get_best_result
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from weights_store import publish_weights           # [7] 정책 저장(버전 발행)
+from profiling import span, traced
 
-# DB Configuration
-db_config = {
-    "host": os.getenv("MYSQL_HOST"),
-    "port": int(os.getenv("MYSQL_PORT")),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": "carbonetes"
-}
+# 시뮬레이션에 쓸 최근 작업 로그 수 (이벤트 기반 재실행은 수십만 건도 수 초 안에 끝난다)
+LEARNING_HISTORY_LIMIT = int(os.getenv("LEARNING_HISTORY_LIMIT", 100000))
 
 
 # 함수 도입 부
+@traced("learning_loop")
 def learning_loop(task_name, estimated_time): 
     logging.info("[학습기]학습을 시작합니다.")
     
     # [2] 로그 수집
-    task_data = get_processed_tasks(db_config)
+    with span("collect"):
+        # 커서에서 묶음 단위로 읽어 바로 열 단위 Trace로 채운다. (행마다 dict를 만들지 않음)
+        task_data = trace_from_chunks(get_processed_task_chunks(LEARNING_HISTORY_LIMIT))
      
     # [3] 초기 개체군 형성
-    candidates_weight = generate_candidates(n=5, include_current=True)# n 가중치 후보 갯수
+    with span("generate"):
+        candidates_weight = generate_candidates(n=5, include_current=True)# n 가중치 후보 갯수
 
     # [4] 시뮬레이션(재실행 가상화)
-    sim_result = run_simulation_as_dicts_from_modules(task_data, candidates_weight)
+    with span("simulate"):
+        sim_result = run_simulation_as_dicts_from_modules(task_data, candidates_weight)
 
     # [5] 성능지표 계산(Fitness)
-    best_result = calculate_and_get_best_result(sim_result, 1.00, 0.05)
+    with span("fitness"):
+        best_result = calculate_and_get_best_result(sim_result, 1.00, 0.05)
     # simulation_results, alpha, gamma, use_p95_latency=True
 
     # [7] 정책 저장
-    save_best_weights_to_db(best_result)
-    logging.info(f'Learning Loop: Success Weight Save')
+    with span("publish"):
+        version = save_best_weights_to_db(best_result)
+    logging.info(f'Learning Loop: Success Weight Save (version: {version})')
+    return version
 
 
 def save_best_weights_to_db(best_result: dict):
     """
-    가장 좋은 가중치 조합 하나를 DB에 저장합니다.
-    기존 테이블 데이터를 모두 지우고 새로운 최적의 가중치만 추가합니다.
+    가장 좋은 가중치 조합 하나를 새 버전으로 DB에 발행합니다.
+    테이블을 비우지 않고 weights_history에 행을 추가하므로 읽는 쪽은 항상 완전한 가중치를 봅니다.
 
     Args:
         best_result (dict): 'weights'와 'custom_fitness' 키를 포함한 딕셔너리.
+
+    Returns:
+        int: 발행된 가중치 버전 (실패 시 None)
     """
     if not best_result:
         print("저장할 최적의 결과가 없습니다.")
@@ -65,39 +74,12 @@ def save_best_weights_to_db(best_result: dict):
     print(f"DB에 저장할 최적 가중치: {best_weights}")
     print(f"(근거 Fitness 점수: {best_result['custom_fitness']})")
 
-    connection = None
     try:
-        db_config = {
-            "host": os.getenv("MYSQL_HOST", "localhost"),
-            "port": int(os.getenv("MYSQL_PORT", 3306)),
-            "user": "root",
-            "password": os.getenv("MYSQL_PASSWORD"),
-            "database": "carbonetes"
-        }
-        
-        connection = mysql.connector.connect(**db_config)
-        cursor = connection.cursor()
-
-        # 테이블을 비워서 항상 최신 값만 유지
-        cursor.execute("TRUNCATE TABLE weights")
-        print("'weights' 테이블의 기존 데이터를 삭제했습니다.")
-
-        # 새로운 최적 가중치 INSERT
-        sql = "UPDATE weights SET a_w = %s, b_w = %s, c_w = %s, d_w = %s"
-        values = (best_weights['a'], best_weights['b'], best_weights['c'], best_weights['d'])
-        cursor.execute(sql, values)
-        
-        connection.commit()
-        
-        print("성공적으로 최적 가중치를 'weights' 테이블에 저장했습니다.")
+        version = publish_weights(
+            (best_weights['a'], best_weights['b'], best_weights['c'], best_weights['d']),
+            fitness=best_result['custom_fitness'])
+        print(f"성공적으로 최적 가중치를 버전 {version}으로 발행했습니다.")
+        return version
 
     except Error as e:
         print(f"DB 작업 중 오류 발생: {e}")
-        if connection and connection.is_connected():
-            connection.rollback()
-
-    finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
-            # print("MySQL 연결이 닫혔습니다.")
\ No newline at end of file
@@ -1,15 +1,17 @@
 # sim.py
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Union
 from statistics import quantiles
 from datetime import datetime
+import numpy as np
 import random
+import heapq
 
 # ==============================
 # ======= Public Models ========
 # ==============================
 
-@dataclass
+@dataclass(slots=True)
 class HistTask:
     job_id: str
     arrival_ts: datetime
@@ -22,11 +24,11 @@ class HistTask:
     data_size_gb: float = 0.0
     sla_deadline_sec: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class WeightVector:
     a: float; b: float; c: float; d: float
 
-@dataclass
+@dataclass(slots=True)
 class SimCluster:
     # cpu_usage_input: 외부에서 온 '원시값' (m 또는 %)
     name: str
@@ -45,6 +47,95 @@ class SimMetrics:
     mean_latency: float
     assignments: List[Tuple[str, str]] = field(default_factory=list)
 
+# 작업 로그의 열 단위(columnar) 표현. 작업 하나가 36바이트라 수백만 건도 메모리에 부담 없이 올린다.
+# (HistTask는 객체 하나에 수백 바이트)
+TRACE_DTYPE = np.dtype([
+    ("arrival", "f8"),        # 도착 시각 (epoch 초)
+    ("exec_sec", "i4"),
+    ("avg_cpu", "f8"),        # HistTask.avg_cpu와 같은 입력 단위
+    ("carbon", "f8"),         # 0.0이면 클러스터 carbon 사용
+    ("cluster", "i4"),        # cluster_names 인덱스
+    ("sla_deadline", "i4"),   # 0이면 SLA 없음
+])
+
+class Trace:
+    """
+    재실행용 작업 로그. 행은 도착 시각 순(같으면 입력 순)으로 정렬되어 있다.
+    - cluster_names: 입력에서 처음 나온 순서의 배치 클러스터 이름 (없으면 'default')
+    - cluster_carbon: 클러스터별 작업 carbon_intensity 평균(>0인 값만, 입력 순으로 더함) - 값이 없으면 NaN
+    - job_ids: 배치 기록(assignments)에 쓸 작업 ID (keep_job_ids=False로 만들면 None)
+    """
+    __slots__ = ("data", "cluster_names", "cluster_carbon", "job_ids")
+
+    def __init__(self, data: np.ndarray, cluster_names: List[str], cluster_carbon: np.ndarray,
+                 job_ids: Optional[np.ndarray] = None):
+        self.data = data
+        self.cluster_names = cluster_names
+        self.cluster_carbon = cluster_carbon
+        self.job_ids = job_ids
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @classmethod
+    def from_columns(cls, arrival, exec_sec, avg_cpu, carbon, clusters: List[str], sla_deadline=None,
+                     job_ids: Optional[List[str]] = None) -> "Trace":
+        """입력 순서의 열(리스트 / 배열)로 만든다. clusters는 행별 배치 클러스터 이름."""
+        index: Dict[str, int] = {}
+        codes = np.fromiter((index.setdefault(name or "default", len(index)) for name in clusters),
+                            dtype=np.int32, count=len(clusters))
+        data = np.empty(len(codes), dtype=TRACE_DTYPE)
+        data["arrival"] = arrival
+        data["exec_sec"] = exec_sec
+        data["avg_cpu"] = avg_cpu
+        data["carbon"] = carbon
+        data["cluster"] = codes
+        data["sla_deadline"] = 0 if sla_deadline is None else sla_deadline
+        return cls.from_data(data, list(index), job_ids)
+
+    @classmethod
+    def from_data(cls, data: np.ndarray, cluster_names: List[str], job_ids=None) -> "Trace":
+        """입력 순서로 채운 TRACE_DTYPE 배열로 만든다. (data["cluster"]는 cluster_names 인덱스)"""
+        # clusters_from_tasks와 같은 평균: 입력 순서대로 더한다. (np.add.at은 인덱스 순서대로 누적)
+        codes = data["cluster"]
+        positive = data["carbon"] > 0
+        sums = np.zeros(len(cluster_names)); counts = np.zeros(len(cluster_names), dtype=np.int64)
+        np.add.at(sums, codes[positive], data["carbon"][positive])
+        np.add.at(counts, codes[positive], 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cluster_carbon = np.where(counts > 0, sums / counts, np.nan)
+
+        order = np.argsort(data["arrival"], kind="stable")
+        ids = None if job_ids is None else np.asarray(job_ids, dtype=object)[order]
+        return cls(data[order], list(cluster_names), cluster_carbon, ids)
+
+    @classmethod
+    def from_histtasks(cls, tasks: List[HistTask], keep_job_ids: bool = True) -> "Trace":
+        return cls.from_columns(
+            [t.arrival_ts.timestamp() for t in tasks], [t.exec_sec for t in tasks], [t.avg_cpu for t in tasks],
+            [t.carbon_intensity for t in tasks], [t.placed_cluster for t in tasks],
+            [t.sla_deadline_sec or 0 for t in tasks], [t.job_id for t in tasks] if keep_job_ids else None)
+
+    def to_histtasks(self) -> List[HistTask]:
+        names = self.cluster_names
+        ids = self.job_ids if self.job_ids is not None else range(len(self.data))
+        return [HistTask(str(job_id), datetime.fromtimestamp(arrival), exec_sec, avg_cpu, carbon, names[cluster],
+                         sla_deadline_sec=sla or None)
+                for job_id, (arrival, exec_sec, avg_cpu, carbon, cluster, sla) in zip(ids, self.data.tolist())]
+
+    # --- 파일 ---
+    def save(self, path: str):
+        """NumPy .npz로 저장한다. (job_ids가 있으면 같이 저장)"""
+        extra = {} if self.job_ids is None else {"job_ids": self.job_ids.astype(str)}
+        np.savez_compressed(path, data=self.data, cluster_names=np.array(self.cluster_names, dtype=str),
+                            cluster_carbon=self.cluster_carbon, **extra)
+
+    @classmethod
+    def load(cls, path: str) -> "Trace":
+        with np.load(path, allow_pickle=False) as f:
+            job_ids = f["job_ids"].astype(object) if "job_ids" in f.files else None
+            return cls(f["data"].astype(TRACE_DTYPE), f["cluster_names"].tolist(), f["cluster_carbon"], job_ids)
+
 # ==============================
 # ========= Config =============
 # ==============================
@@ -83,6 +174,19 @@ class SimulatorConfig:
     default_cluster_carbon: float = 150.0  # 작업 로그에 탄소가 전혀 없을 때 사용
     seed: Optional[int] = None
 
+    # 재실행 방식
+    #   'events': 작업 완료까지 모델링하는 이벤트 기반 재실행(simulate_events) - 작업이 끝나면 CPU / ETA를 돌려준다
+    #   'static': 예전 방식(simulate) - 배치된 작업이 끝나지 않고 CPU / ETA가 계속 쌓인다
+    # 기본값은 'static': events는 후보마다 파이썬 루프로 따로 재실행하므로, 개체군 전체를 한 번에 계산하는
+    # simulate_population보다 학습 한 번이 훨씬 느리다. (events도 개체군 벡터화가 되면 기본값을 바꾼다)
+    engine: str = "static"
+    # engine='static'일 때 True면 개체군 전체를 한 번에 재실행(simulate_population), False면 후보별 simulate
+    vectorized: bool = True
+    # False면 작업별 배치 결과(SimMetrics.assignments)를 남기지 않는다. (작업 수만큼의 튜플을 만들지 않음)
+    record_assignments: bool = True
+    # simulate_events가 열을 파이썬 값으로 바꿔 처리하는 묶음 크기
+    chunk_size: int = 65536
+
 # ==============================
 # ===== Helper Functions =======
 # ==============================
@@ -93,14 +197,30 @@ def _normalize(val: float, lo: float, hi: float) -> float:
     val = max(lo, min(hi, val))
     return (val - lo) / (hi - lo)
 
+def _normalize_array(val: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    # _normalize의 배열 버전 (같은 연산 순서)
+    if hi <= lo:
+        return val
+    return (np.clip(val, lo, hi) - lo) / (hi - lo)
+
+def _exclusive_quantile(sorted_vals: np.ndarray, i: int, n: int = 100) -> float:
+    # statistics.quantiles(data, n=n)[i-1]과 같은 계산 (method='exclusive', 정렬된 배열에서 한 점만)
+    ld = len(sorted_vals); m = ld + 1
+    j = i * m // n
+    j = 1 if j < 1 else ld-1 if j > ld-1 else j
+    delta = i*m - j*n
+    return (float(sorted_vals[j - 1]) * (n - delta) + float(sorted_vals[j]) * delta) / n
+
 def _cpu_penalty(usage_pct: float) -> float:
     return 10 ** (4.0 * (usage_pct / 100.0))
 
-def _active_nodes_if_assign(usages_pct: List[float], target_idx: int) -> int:
+def _is_active(usage_pct: float) -> bool:
+    return usage_pct >= 8.5
+
+def _active_delta_if_assign(usage_pct: float) -> int:
     # 간이 모델: 해당 클러스터에 작업을 넣는다고 가정하면 +30%p 상승
-    tmp = list(usages_pct)
-    tmp[target_idx] = min(100.0, tmp[target_idx] + 30.0)
-    return sum(1 for u in tmp if u >= 8.5)
+    # 배치 시 동작 노드 수 = 현재 동작 노드 수 + 이 값
+    return int(_is_active(min(100.0, usage_pct + 30.0))) - int(_is_active(usage_pct))
 
 def _m_to_percent(v_m: float, capacity_m: float) -> float:
     if not capacity_m or capacity_m <= 0: return 0.0
@@ -112,6 +232,18 @@ def _to_percent_auto(v: float, capacity_m: float) -> float:
     if 0.0 <= v <= 1.0: return v * 100.0               # 0..1 → fraction
     return float(v)                                     # 그 외 → %
 
+def _normalize_cpu_input_array(v: np.ndarray, unit: str, capacity_m: float) -> np.ndarray:
+    # _normalize_cpu_input의 배열 버전 (같은 연산 순서)
+    v = np.asarray(v, dtype=float)
+    if not capacity_m or capacity_m <= 0:
+        as_m = np.zeros_like(v)
+    else:
+        as_m = np.clip((v / float(capacity_m)) * 100.0, 0.0, 100.0)
+    unit = (unit or "m").lower()
+    if unit == "m": return as_m
+    if unit == "pct": return np.clip(v, 0.0, 100.0)
+    return np.where(v > 100.0, as_m, np.where((v >= 0.0) & (v <= 1.0), v * 100.0, v))
+
 def _normalize_cpu_input(v: float, unit: str, capacity_m: float) -> float:
     unit = (unit or "m").lower()
     if unit == "m": return _m_to_percent(v, capacity_m)
@@ -123,6 +255,26 @@ def _normalize_cpu_input(v: float, unit: str, capacity_m: float) -> float:
 # ======== Simulator ===========
 # ==============================
 
+class _ReplayState:
+    """
+    simulate() 한 번 동안의 클러스터별 점수 캐시.
+    작업마다 바뀌는 건 배치된 클러스터 하나뿐이므로, 그 클러스터 몫만 _apply_assignment에서 다시 계산한다.
+    """
+    __slots__ = ("active_count", "active_delta", "norm_penalty")
+
+    def __init__(self, sim: "Simulator", clusters: List[SimCluster]):
+        self.active_count = sum(1 for c in clusters if _is_active(c.cpu_usage_pct))
+        self.active_delta = [0] * len(clusters)
+        self.norm_penalty = [0.0] * len(clusters)
+        for idx, c in enumerate(clusters):
+            self.refresh(sim, idx, c.cpu_usage_pct, was_active=None)
+
+    def refresh(self, sim: "Simulator", idx: int, usage_pct: float, was_active: Optional[bool]):
+        if was_active is not None:
+            self.active_count += int(_is_active(usage_pct)) - int(was_active)
+        self.active_delta[idx] = _active_delta_if_assign(usage_pct)
+        self.norm_penalty[idx] = _normalize(_cpu_penalty(usage_pct), *sim.cfg.ranges["penalty"])
+
 class Simulator:
     def __init__(self, config: SimulatorConfig):
         self.cfg = config
@@ -177,36 +329,57 @@ class Simulator:
             clusters.append(c)
         return clusters
 
-    def _score_cluster(self, clusters: List[SimCluster], idx: int, task: HistTask, w: WeightVector) -> float:
+    def clusters_from_trace(self, trace: Trace) -> List[SimCluster]:
+        """clusters_from_tasks의 Trace 버전 (같은 순서 / 같은 carbon)"""
+        clusters: List[SimCluster] = []
+        for name, carbon in zip(trace.cluster_names or ["default"], trace.cluster_carbon.tolist() or [float("nan")]):
+            c = SimCluster(name, self.cfg.default_region, 0.0, 0,
+                           self.cfg.default_cluster_carbon if carbon != carbon else carbon)
+            c.cpu_usage_pct = _normalize_cpu_input(c.cpu_usage_input, self.cfg.cluster_cpu_unit, self.cfg.capacity_m)
+            clusters.append(c)
+        return clusters
+
+    def _score_cluster(self, clusters: List[SimCluster], idx: int, task: HistTask, w: WeightVector,
+                       state: _ReplayState) -> float:
+        # 동작 노드 수 / 패널티는 state 캐시에서 읽는다. (클러스터당 O(1))
         c = clusters[idx]
-        usages_pct = [x.cpu_usage_pct for x in clusters]
-        active_nodes = _active_nodes_if_assign(usages_pct, idx)
-        penalty      = _cpu_penalty(c.cpu_usage_pct)
+        active_nodes = state.active_count + state.active_delta[idx]
         workspan     = c.eta_sec + task.exec_sec
         carbon_val   = task.carbon_intensity if task.carbon_intensity > 0.0 else c.carbon
 
         r = self.cfg.ranges
         nw = _normalize(active_nodes, *r["work_nodes"])
-        np = _normalize(penalty,      *r["penalty"])
+        npn = state.norm_penalty[idx]
         ns = _normalize(workspan,     *r["workspan"])
         nc = _normalize(carbon_val,   *r["carbon"])
-        return w.a*nw + w.b*np + w.c*ns + w.d*nc
+        return w.a*nw + w.b*npn + w.c*ns + w.d*nc
 
-    def _apply_assignment(self, clusters: List[SimCluster], idx: int, task: HistTask):
+    def _assign_increment_pct(self, task: HistTask) -> float:
         inc_pct = _normalize_cpu_input(task.avg_cpu, self.cfg.task_avg_cpu_unit, self.cfg.capacity_m)
         if inc_pct <= 0.0:
             inc_pct = self.cfg.cpu_increment_on_assign_pct
+        return inc_pct
+
+    def _apply_assignment(self, clusters: List[SimCluster], idx: int, task: HistTask,
+                          state: Optional[_ReplayState] = None):
+        inc_pct = self._assign_increment_pct(task)
+        was_active = _is_active(clusters[idx].cpu_usage_pct)
         clusters[idx].eta_sec += task.exec_sec
         clusters[idx].cpu_usage_pct = min(100.0, clusters[idx].cpu_usage_pct + inc_pct)
+        if state is not None:
+            state.refresh(self, idx, clusters[idx].cpu_usage_pct, was_active)
 
     def simulate(self, tasks: List[HistTask], clusters: List[SimCluster], w: WeightVector) -> SimMetrics:
         tasks_sorted = sorted(tasks, key=lambda t: t.arrival_ts)
         total_carbon = 0.0; sla_miss = 0
         latencies: List[float] = []; assigns: List[Tuple[str, str]] = []
+        state = _ReplayState(self, clusters)
+        indices = range(len(clusters))
 
         for task in tasks_sorted:
-            scores = sorted((self._score_cluster(clusters, i, task, w), i) for i in range(len(clusters)))
-            chosen_idx = scores[0][1]; chosen = clusters[chosen_idx]
+            # 최소 점수 클러스터 (같으면 앞 인덱스 - 예전 sorted((score, i))[0]과 같은 선택)
+            scores = [self._score_cluster(clusters, i, task, w, state) for i in indices]
+            chosen_idx = min(indices, key=scores.__getitem__); chosen = clusters[chosen_idx]
 
             latency = chosen.eta_sec; latencies.append(latency)
             carbon_val = task.carbon_intensity if task.carbon_intensity > 0.0 else chosen.carbon
@@ -214,36 +387,231 @@ class Simulator:
             if task.sla_deadline_sec and (latency + task.exec_sec) > task.sla_deadline_sec:
                 sla_miss += 1
 
-            self._apply_assignment(clusters, chosen_idx, task)
-            assigns.append((task.job_id, chosen.name))
-
-        if len(latencies) >= 2:
+            self._apply_assignment(clusters, chosen_idx, task, state)
+            if self.cfg.record_assignments:
+                assigns.append((task.job_id, chosen.name))
+
+        return self._metrics(total_carbon, sla_miss, latencies, assigns)
+
+    def _metrics(self, total_carbon: float, sla_miss: int, latencies: Union[List[float], np.ndarray],
+                 assigns: List[Tuple[str, str]], latency_sum: Optional[float] = None,
+                 presorted: bool = False) -> SimMetrics:
+        # latencies가 배열이면 파이썬 리스트로 바꾸지 않고 같은 값을 계산한다. (latency_sum: 순서대로 더한 합)
+        # presorted: latencies가 이미 오름차순 정렬된 배열
+        if isinstance(latencies, np.ndarray):
+            if len(latencies) >= 2:
+                sorted_lat = latencies if presorted else np.sort(latencies)
+                p95 = _exclusive_quantile(sorted_lat, int(self.cfg.pctl_for_latency*100))
+            else:
+                p95 = float(latencies[0]) if len(latencies) else 0.0
+            mean_lat = latency_sum/len(latencies) if len(latencies) else 0.0
+        elif len(latencies) >= 2:
             qtiles = quantiles(latencies, n=100); p95 = qtiles[int(self.cfg.pctl_for_latency*100)-1]
+            mean_lat = sum(latencies)/len(latencies)
         else:
             p95 = latencies[0] if latencies else 0.0
-        mean_lat = sum(latencies)/len(latencies) if latencies else 0.0
+            mean_lat = sum(latencies)/len(latencies) if latencies else 0.0
 
         fitness = (self.cfg.alpha*total_carbon + self.cfg.beta*float(sla_miss) +
                    self.cfg.gamma*float(p95) + self.cfg.zeta*float(mean_lat))
         return SimMetrics(fitness, total_carbon, sla_miss, p95, mean_lat, assigns)
 
+    # --- 이벤트 기반 재실행 (작업 완료 반영) ---
+    def simulate_events(self, tasks: Union[Trace, List[HistTask]], clusters: List[SimCluster],
+                        w: WeightVector) -> SimMetrics:
+        """
+        도착 / 완료 이벤트 순서대로 재실행한다. 시간은 첫 도착 시각부터의 초.
+        - 클러스터는 배치된 작업을 차례로 실행한다. busy_until = 마지막 배치 작업이 끝나는 시각
+          ETA(대기 시간) = max(0, busy_until - 현재), 지연 = 배치 시점의 ETA, 완료 = 시작 + exec_sec
+        - 배치하면 CPU 사용률이 오르고(simulate와 같은 증가치), 완료 이벤트에서 실제로 올린 만큼 돌려준다.
+        - 완료 이벤트는 (완료 시각, 클러스터) 힙에 두고, 다음 도착 시각까지 끝난 것을 먼저 처리한다.
+          (도착은 이미 시간순이므로 힙에 넣지 않고 그대로 병합) 작업당 O(C + log N)
+        - 점수 식과 선택 규칙은 simulate와 같다. clusters는 시작 상태로만 읽고 바꾸지 않는다.
+        - 작업 로그는 Trace 열을 chunk_size개씩 파이썬 값으로 바꿔 읽는다. (HistTask 리스트면 Trace로 바꿔서)
+        """
+        trace = tasks if isinstance(tasks, Trace) else Trace.from_histtasks(tasks, self.cfg.record_assignments)
+        data = trace.data
+        r = self.cfg.ranges
+        indices = range(len(clusters))
+        usage = [c.cpu_usage_pct for c in clusters]
+        busy_until = [float(c.eta_sec) for c in clusters]
+        base_carbon = [c.carbon for c in clusters]
+        state = _ReplayState(self, clusters)
+        active_delta, norm_penalty = state.active_delta, state.norm_penalty
+        # 동작 노드 수(0..C) / 클러스터 탄소는 정규화 값을 미리 계산
+        norm_work = [_normalize(k, *r["work_nodes"]) for k in range(len(clusters) + 1)]
+        norm_carbon = [_normalize(c, *r["carbon"]) for c in base_carbon]
+        span_lo, span_hi = r["workspan"]
+        span_width = span_hi - span_lo
+        wa, wb, wc, wd = w.a, w.b, w.c, w.d
+        completions: List[Tuple[float, int, float]] = []   # (완료 시각, 클러스터, 돌려줄 CPU %p)
+
+        total_carbon = 0.0; sla_miss = 0; latency_sum = 0.0
+        latencies = np.empty(len(data))
+        chosen_all = np.empty(len(data), dtype=np.int32) if self.cfg.record_assignments else None
+        t0 = float(data["arrival"][0]) if len(data) else 0.0
+        increments = _normalize_cpu_input_array(data["avg_cpu"], self.cfg.task_avg_cpu_unit, self.cfg.capacity_m)
+        increments[increments <= 0.0] = self.cfg.cpu_increment_on_assign_pct
+
+        for first in range(0, len(data), self.cfg.chunk_size):
+            rows = data[first:first + self.cfg.chunk_size]
+            last = first + len(rows)
+            chunk_latency: List[float] = []; chunk_chosen: List[int] = []
+            for now, exec_sec, carbon, sla, inc_pct in zip((rows["arrival"] - t0).tolist(), rows["exec_sec"].tolist(),
+                                                          rows["carbon"].tolist(), rows["sla_deadline"].tolist(),
+                                                          increments[first:last].tolist()):
+                while completions and completions[0][0] <= now:
+                    _, idx, released = heapq.heappop(completions)
+                    was_active = _is_active(usage[idx])
+                    usage[idx] = max(0.0, usage[idx] - released)
+                    state.refresh(self, idx, usage[idx], was_active)
+
+                task_carbon = carbon if carbon > 0.0 else None
+                nc_task = _normalize(task_carbon, *r["carbon"]) if task_carbon is not None else None
+                count = state.active_count
+
+                # 점수 계산을 풀어 쓴 내부 루프 (작업 수 x 클러스터 수만큼 돈다)
+                chosen_idx = -1; best = 0.0
+                for i in indices:
+                    span = busy_until[i] - now
+                    span = (span if span > 0.0 else 0.0) + exec_sec
+                    if span_width > 0:
+                        span = ((span if span < span_hi else span_hi) - span_lo) / span_width if span > span_lo else 0.0
+                    nc = nc_task if nc_task is not None else norm_carbon[i]
+                    score = wa*norm_work[count + active_delta[i]] + wb*norm_penalty[i] + wc*span + wd*nc
+                    if chosen_idx < 0 or score < best:
+                        chosen_idx = i; best = score
+
+                latency = max(0.0, busy_until[chosen_idx] - now); chunk_latency.append(latency)
+                latency_sum += latency
+                carbon_val = task_carbon if task_carbon is not None else base_carbon[chosen_idx]
+                total_carbon += carbon_val * exec_sec
+                if sla and (latency + exec_sec) > sla:
+                    sla_miss += 1
+
+                finish = now + latency + exec_sec
+                busy_until[chosen_idx] = finish
+                was_active = _is_active(usage[chosen_idx])
+                before = usage[chosen_idx]
+                usage[chosen_idx] = min(100.0, before + inc_pct)
+                state.refresh(self, chosen_idx, usage[chosen_idx], was_active)
+                heapq.heappush(completions, (finish, chosen_idx, usage[chosen_idx] - before))
+                chunk_chosen.append(chosen_idx)
+
+            latencies[first:last] = chunk_latency
+            if chosen_all is not None:
+                chosen_all[first:last] = chunk_chosen
+
+        assigns: List[Tuple[str, str]] = []
+        if chosen_all is not None:
+            names = [c.name for c in clusters]
+            ids = trace.job_ids.tolist() if trace.job_ids is not None else [str(k) for k in range(len(data))]
+            assigns = [(job_id, names[i]) for job_id, i in zip(ids, chosen_all.tolist())]
+        return self._metrics(total_carbon, sla_miss, latencies, assigns, latency_sum)
+
+    # --- 개체군 전체를 한 번에 재실행 ---
+    def simulate_population(self, tasks: List[HistTask], clusters: List[SimCluster],
+                            weights_population: List[WeightVector]) -> List[SimMetrics]:
+        """
+        모든 후보 가중치를 작업 로그 한 번 순회로 동시에 평가한다. 결과는 후보별 simulate()와 같다.
+        클러스터 상태는 (후보 P x 클러스터 C) 배열로 두고, 작업마다 P x C 점수를 한 번에 계산해 후보별 argmin을 고른다.
+        - 부동소수 연산 순서는 _score_cluster / _apply_assignment와 같게 두어 결과가 비트 단위로 같다.
+        - 패널티(10**x)는 NumPy 벡터 거듭제곱이 플랫폼에 따라 1ulp 다를 수 있어, 값이 바뀐 칸만 파이썬 float 연산으로 갱신한다.
+        - clusters는 시작 상태로만 읽고 바꾸지 않는다.
+        """
+        r = self.cfg.ranges
+        n_pop, n_cl = len(weights_population), len(clusters)
+        rows = np.arange(n_pop)
+        tasks_sorted = sorted(tasks, key=lambda t: t.arrival_ts)
+        names = [c.name for c in clusters]
+
+        W = np.array([[w.a, w.b, w.c, w.d] for w in weights_population], dtype=float).reshape(n_pop, 4, 1)
+        usage = np.tile(np.array([c.cpu_usage_pct for c in clusters], dtype=float), (n_pop, 1))
+        eta = np.tile(np.array([c.eta_sec for c in clusters], dtype=np.int64), (n_pop, 1))
+        penalty = np.tile(np.array([_cpu_penalty(c.cpu_usage_pct) for c in clusters], dtype=float), (n_pop, 1))
+        base_carbon = np.array([c.carbon for c in clusters], dtype=float)
+
+        total_carbon = np.zeros(n_pop); sla_miss = np.zeros(n_pop, dtype=np.int64)
+        latencies = np.zeros((len(tasks_sorted), n_pop), dtype=np.int64)
+        chosen_idx = (np.zeros((len(tasks_sorted), n_pop), dtype=np.intp)
+                      if self.cfg.record_assignments else None)
+
+        for k, task in enumerate(tasks_sorted):
+            # 이 클러스터에 배치한다고 가정할 때의 동작 노드 수: 전체 수에서 자기 몫만 +30%p 값으로 바꿔 센다.
+            active = _is_active(usage)
+            active_nodes = (active.sum(axis=1, keepdims=True) - active
+                            + _is_active(np.minimum(100.0, usage + 30.0)))
+            workspan = eta + task.exec_sec
+            carbon_val = np.full(n_cl, task.carbon_intensity) if task.carbon_intensity > 0.0 else base_carbon
+
+            nw = _normalize_array(active_nodes, *r["work_nodes"])
+            npn = _normalize_array(penalty,     *r["penalty"])
+            ns = _normalize_array(workspan,     *r["workspan"])
+            nc = _normalize_array(carbon_val,   *r["carbon"])
+            scores = W[:, 0]*nw + W[:, 1]*npn + W[:, 2]*ns + W[:, 3]*nc
+
+            # sorted((score, i))[0]과 같은 선택: 최소 점수, 같으면 앞 인덱스
+            chosen = scores.argmin(axis=1)
+            latency = eta[rows, chosen]
+            latencies[k] = latency
+            if chosen_idx is not None:
+                chosen_idx[k] = chosen
+            total_carbon += carbon_val[chosen] * task.exec_sec
+            if task.sla_deadline_sec:
+                sla_miss += (latency + task.exec_sec) > task.sla_deadline_sec
+
+            eta[rows, chosen] += task.exec_sec
+            new_usage = np.minimum(100.0, usage[rows, chosen] + self._assign_increment_pct(task))
+            usage[rows, chosen] = new_usage
+            penalty[rows, chosen] = [_cpu_penalty(u) for u in new_usage.tolist()]
+
+        # 후보별 p95 / 평균은 열 단위로 한 번에 정렬 / 합산해 계산한다. (정수 지연이므로 합은 순서와 무관하게 같다)
+        latency_sums = latencies.sum(axis=0).tolist()
+        latencies.sort(axis=0)
+        job_ids = [t.job_id for t in tasks_sorted]
+        results = []
+        for p in range(n_pop):
+            assigns = ([(job_id, names[i]) for job_id, i in zip(job_ids, chosen_idx[:, p].tolist())]
+                       if chosen_idx is not None else [])
+            results.append(self._metrics(float(total_carbon[p]), int(sla_miss[p]), latencies[:, p], assigns,
+                                         latency_sums[p], presorted=True))
+        return results
+
+    def evaluate(self, tasks: Union[Trace, List[HistTask]], base: List[SimCluster],
+                 weights_population: List[WeightVector]) -> List[SimMetrics]:
+        """후보별 지표 (입력 순서 그대로). 재실행 방식은 cfg.engine / cfg.vectorized를 따른다."""
+        if self.cfg.engine == "events":
+            if not isinstance(tasks, Trace):
+                tasks = Trace.from_histtasks(tasks, self.cfg.record_assignments)
+            return [self.simulate_events(tasks, base, w) for w in weights_population]
+        if isinstance(tasks, Trace):
+            tasks = tasks.to_histtasks()
+        if self.cfg.vectorized:
+            return self.simulate_population(tasks, base, weights_population)
+        results = []
+        for w in weights_population:
+            # 각 후보는 같은 시작 상태에서 평가
+            cloned = [SimCluster(c.name, c.region, c.cpu_usage_input, c.eta_sec, c.carbon, c.cpu_usage_pct) for c in base]
+            results.append(self.simulate(tasks, cloned, w))
+        return results
+
+    def base_clusters(self, tasks: Union[Trace, List[HistTask]],
+                      base_clusters_spec: Optional[List[Tuple[str, str, float, int, float]]]) -> List[SimCluster]:
+        # clusters_spec이 없으면 로그에서 자동 생성
+        if base_clusters_spec and len(base_clusters_spec) > 0:
+            return self.bootstrap_clusters(base_clusters_spec)
+        if isinstance(tasks, Trace):
+            return self.clusters_from_trace(tasks)
+        return self.clusters_from_tasks(tasks)  # ★ 로그만으로 초기 클러스터 구성
+
     # --- 변경: clusters_spec이 None이면 로그에서 자동 생성 ---
     def evaluate_population(self,
-                            tasks: List[HistTask],
+                            tasks: Union[Trace, List[HistTask]],
                             base_clusters_spec: Optional[List[Tuple[str, str, float, int, float]]],
                             weights_population: List[WeightVector]):
         self.ensure_population(weights_population)
+        base = self.base_clusters(tasks, base_clusters_spec)
 
-        if base_clusters_spec and len(base_clusters_spec) > 0:
-            base = self.bootstrap_clusters(base_clusters_spec)
-        else:
-            base = self.clusters_from_tasks(tasks)  # ★ 로그만으로 초기 클러스터 구성
-
-        results = []
-        for w in weights_population:
-            # 각 후보는 같은 시작 상태에서 평가
-            cloned = [SimCluster(c.name, c.region, c.cpu_usage_input, c.eta_sec, c.carbon, c.cpu_usage_pct) for c in base]
-            metrics = self.simulate(tasks, cloned, w)
-            results.append((w, metrics))
+        results = list(zip(weights_population, self.evaluate(tasks, base, weights_population)))
         results.sort(key=lambda x: x[1].fitness)
         return results
@@ -1,7 +1,20 @@
 # sim_bridge.py
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from sim import Simulator, SimulatorConfig, HistTask, WeightVector
+from itertools import islice
+from sim import Simulator, SimulatorConfig, HistTask, WeightVector, SimMetrics, Trace, TRACE_DTYPE
+import numpy as np
+import multiprocessing
+import logging
+import json
+import csv
+import os
+
+# 병렬 평가 프로세스 수 (1이면 현재 프로세스에서 평가)
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", os.cpu_count() or 1))
+# 후보가 이보다 적으면 프로세스를 띄우는 비용이 더 커서 현재 프로세스에서 평가
+SIM_PARALLEL_MIN_POP = int(os.getenv("SIM_PARALLEL_MIN_POP", 64))
 
 # ---------- 1) 로그(dict) → HistTask ----------
 def to_histtasks(rows: List[Dict]) -> List[HistTask]:
@@ -11,22 +24,16 @@ def to_histtasks(rows: List[Dict]) -> List[HistTask]:
     기대 키(예시):
       task_id, task_name, dispatched_at, estimated_runtime, actual_runtime,
       avg_cpu_usage (m), avg_mem_usage, cluster_name, carbon_intensity, completion_at, queue_delay
+    dispatched_at이 없는 행(아직 배치되지 않은 작업)은 도착 시각을 알 수 없으므로 건너뛴다.
     """
     tasks: List[HistTask] = []
     for r in rows:
-        dispatched = r.get("dispatched_at")
-        if isinstance(dispatched, str):
-            dispatched = datetime.fromisoformat(dispatched.replace("Z", ""))
-        elif dispatched is None:
-            dispatched = datetime.utcnow()
-
-        exec_sec = int(r.get("actual_runtime") or r.get("estimated_runtime") or 60)
-        avg_cpu_m = float(r.get("avg_cpu_usage") or 0.0)
-        carbon = float(r.get("carbon_intensity") or 0.0)
-        cluster = r.get("cluster_name") or ""  # 없으면 'default'로 취급됨(sim.py 내부)
-
+        parsed = _parse_row(r)
+        if parsed is None:
+            continue
+        job_id, dispatched, exec_sec, avg_cpu_m, carbon, cluster = parsed
         tasks.append(HistTask(
-            job_id=str(r.get("task_id") or r.get("task_name")),
+            job_id=job_id,
             arrival_ts=dispatched,
             exec_sec=exec_sec,
             avg_cpu=avg_cpu_m,              # m 단위 → sim.py에서 % 자동 변환
@@ -35,6 +42,99 @@ def to_histtasks(rows: List[Dict]) -> List[HistTask]:
         ))
     return tasks
 
+def _parse_row(r: Dict) -> Optional[Tuple[str, datetime, int, float, float, str]]:
+    """dispatched_at이 없으면 None (재실행할 수 없는 행)"""
+    return _parse_values(*(r.get(k) for k in TRACE_COLUMNS))
+
+def _parse_values(task_id, task_name, dispatched, actual_runtime, estimated_runtime, avg_cpu, carbon, cluster):
+    if dispatched is None or dispatched == "":
+        return None
+    if isinstance(dispatched, str):
+        dispatched = datetime.fromisoformat(dispatched.replace("Z", ""))
+
+    exec_sec = int(actual_runtime or estimated_runtime or 60)
+    avg_cpu_m = float(avg_cpu or 0.0)
+    carbon = float(carbon or 0.0)
+    cluster = cluster or ""  # 없으면 'default'로 취급됨(sim.py 내부)
+    return str(task_id or task_name), dispatched, exec_sec, avg_cpu_m, carbon, cluster
+
+# ---------- 1-1) 로그 / 파일 → Trace (열 단위) ----------
+# trace_from_chunks가 받는 행(튜플)의 열 순서. (get_processed_tasks()와 같은 키)
+TRACE_COLUMNS = ("task_id", "task_name", "dispatched_at", "actual_runtime", "estimated_runtime",
+                 "avg_cpu_usage", "carbon_intensity", "cluster_name")
+# 파일 / dict 리스트를 Trace로 바꿀 때 한 번에 변환하는 행 수
+TRACE_CHUNK_ROWS = int(os.getenv("TRACE_CHUNK_ROWS", 10000))
+
+def trace_from_chunks(chunks: Iterable[List[tuple]], keep_job_ids: bool = False) -> Trace:
+    """
+    TRACE_COLUMNS 순서의 튜플 묶음(예: db.fetch_chunks)을 받아 묶음마다 TRACE_DTYPE 배열을 채워 sim.Trace를 만든다.
+    행마다 dict나 HistTask를 만들지 않고, 파이썬 값은 한 묶음 분량만 메모리에 둔다.
+    dispatched_at이 없는 행은 건너뛴다. keep_job_ids=False면 작업 ID를 버린다. (배치 기록을 남길 때만 필요)
+    """
+    index: Dict[str, int] = {}
+    parts, job_ids = [], []
+    for chunk in chunks:
+        values = []
+        for row in chunk:
+            parsed = _parse_values(*row)
+            if parsed is None:
+                continue
+            job_id, dispatched, sec, cpu_m, ci, cluster = parsed
+            values.append((dispatched.timestamp(), sec, cpu_m, ci,
+                           index.setdefault(cluster or "default", len(index)), 0))
+            if keep_job_ids:
+                job_ids.append(job_id)
+        parts.append(np.array(values, dtype=TRACE_DTYPE))
+    data = np.concatenate(parts) if parts else np.empty(0, dtype=TRACE_DTYPE)
+    return Trace.from_data(data, list(index), job_ids if keep_job_ids else None)
+
+def _chunked(rows: Iterable, size: int = None) -> Iterator[list]:
+    it = iter(rows)
+    size = size or TRACE_CHUNK_ROWS
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def to_trace(rows: List[Dict], keep_job_ids: bool = False) -> Trace:
+    """to_histtasks와 같은 변환으로 sim.Trace를 만든다. (작업마다 객체를 만들지 않음, dispatched_at이 없는 행은 건너뜀)"""
+    return trace_from_chunks(_chunked(tuple(r.get(k) for k in TRACE_COLUMNS) for r in rows), keep_job_ids)
+
+def load_trace(path: str, keep_job_ids: bool = False) -> Trace:
+    """
+    파일에서 작업 로그를 읽는다. (.csv / .jsonl은 TRACE_CHUNK_ROWS행씩 읽어 변환)
+    - .npz: Trace.save()로 저장한 파일
+    - .csv / .jsonl: get_processed_tasks()와 같은 키의 행 (빈 칸은 값 없음)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npz":
+        return Trace.load(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            rows = _csv_rows(csv.reader(f))
+        elif ext in (".jsonl", ".ndjson"):
+            rows = (tuple(r.get(k) for k in TRACE_COLUMNS)
+                    for r in (json.loads(line) for line in f if line.strip()))
+        else:
+            raise ValueError(f"[sim_bridge] unsupported trace file: {path}")
+        return trace_from_chunks(_chunked(rows), keep_job_ids)
+
+# CSV에서 숫자로 읽을 열
+_CSV_NUMERIC = ("estimated_runtime", "actual_runtime", "avg_cpu_usage", "avg_mem_usage", "carbon_intensity")
+
+def _csv_rows(reader) -> Iterator[tuple]:
+    header = next(reader, [])
+    columns = [(header.index(k) if k in header else None, k in _CSV_NUMERIC) for k in TRACE_COLUMNS]
+    for row in reader:
+        if not row:
+            continue
+        values = []
+        for i, numeric in columns:
+            v = row[i] if i is not None and i < len(row) else ""
+            values.append(None if v == "" else float(v) if numeric else v)
+        yield tuple(values)
+
 # ---------- 2) 가중치(dict) → WeightVector ----------
 def to_weightvectors(candidate_rows: List[Dict]) -> List[WeightVector]:
     """
@@ -53,10 +153,12 @@ def to_weightvectors(candidate_rows: List[Dict]) -> List[WeightVector]:
 
 # ---------- 3) 시뮬레이션 실행 ----------
 def run_simulation_as_dicts_from_modules(
-    task_rows: List[Dict],
+    task_rows,
     weight_rows: List[Dict],
     cfg: Optional[SimulatorConfig] = None,
     clusters_spec: Optional[list] = None,
+    workers: Optional[int] = None,
+    record_assignments: bool = False,
 ) -> List[Dict]:
     """
     - get_task_info.get_processed_tasks() 결과와
@@ -64,19 +166,31 @@ def run_simulation_as_dicts_from_modules(
       sim.py 시뮬레이션을 수행하고
       결과를 dict 리스트로 반환한다.
     - clusters_spec이 None이면 로그로부터 자동 생성(sim.py의 clusters_from_tasks 사용)
+    - workers(기본 SIM_WORKERS)가 2 이상이면 후보를 여러 프로세스에서 나눠 평가한다. (이때 assignments는 빈 리스트)
+      static + vectorized 방식은 후보가 SIM_PARALLEL_MIN_POP개 이상일 때만 나눈다.
+    - 작업 로그는 열 단위 Trace로 바꿔 재실행한다. (task_rows가 이미 Trace면 그대로 사용)
+      record_assignments=False(기본)면 assignments는 빈 리스트.
     """
     cfg = cfg or SimulatorConfig(
         capacity_m=4000.0,
         cluster_cpu_unit="m",
         task_avg_cpu_unit="m",
-        alpha=1.0, beta=100.0, gamma=0.1, zeta=0.0
+        alpha=1.0, beta=100.0, gamma=0.1, zeta=0.0,
+        record_assignments=record_assignments,
     )
 
-    tasks = to_histtasks(task_rows)
+    tasks = task_rows if isinstance(task_rows, Trace) else to_trace(task_rows, keep_job_ids=cfg.record_assignments)
     weight_vecs = to_weightvectors(weight_rows)
 
     sim = Simulator(cfg)
-    results = sim.evaluate_population(tasks, clusters_spec, weight_vecs)
+    if workers is None:
+        workers = SIM_WORKERS
+    # 한 번에 재실행하는 static 방식이 아니면 후보마다 재실행하므로 후보가 둘만 돼도 나눠 평가한다.
+    min_pop = SIM_PARALLEL_MIN_POP if cfg.engine == "static" and cfg.vectorized else 2
+    if workers > 1 and len(weight_vecs) >= min_pop:
+        results = evaluate_population_parallel(sim, tasks, clusters_spec, weight_vecs, workers)
+    else:
+        results = sim.evaluate_population(tasks, clusters_spec, weight_vecs)
 
     out: List[Dict] = []
     for w, m in results:
@@ -90,3 +204,45 @@ def run_simulation_as_dicts_from_modules(
             "assignments": m.assignments,  # 필요 없으면 제거 가능
         })
     return out
+
+# ---------- 4) 병렬 평가 ----------
+# 작업 로그와 시작 클러스터 상태는 fork 시점에 자식 프로세스로 그대로 물려준다. (직렬화 없음)
+# 프로세스 사이에는 가중치 4개짜리 튜플과 지표 튜플만 오간다.
+_shared: Optional[Tuple[Simulator, Trace, list]] = None
+
+def _evaluate_chunk(weights: List[Tuple[float, float, float, float]]) -> List[Tuple[float, float, int, float, float]]:
+    sim, tasks, base = _shared
+    metrics = sim.evaluate(tasks, base, [WeightVector(*w) for w in weights])
+    return [(m.fitness, m.total_carbon, m.sla_miss, m.p95_latency, m.mean_latency) for m in metrics]
+
+def evaluate_population_parallel(sim: Simulator, tasks: Trace, clusters_spec: Optional[list],
+                                 weights_population: List[WeightVector], workers: int):
+    """
+    Simulator.evaluate_population과 같은 [(w, SimMetrics), ...](fitness 오름차순)를 반환한다.
+    후보를 workers개 묶음으로 나눠 프로세스마다 Simulator.evaluate로 평가한다.
+    fork를 쓸 수 없는 플랫폼이면 현재 프로세스에서 평가한다.
+    """
+    global _shared
+    sim.ensure_population(weights_population)
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        logging.warning("⚠ fork를 지원하지 않아 현재 프로세스에서 시뮬레이션합니다.")
+        return sim.evaluate_population(tasks, clusters_spec, weights_population)
+
+    base = sim.base_clusters(tasks, clusters_spec)
+    workers = min(workers, len(weights_population))
+    size = -(-len(weights_population) // workers)
+    chunks = [[(w.a, w.b, w.c, w.d) for w in weights_population[i:i + size]]
+              for i in range(0, len(weights_population), size)]
+
+    _shared = (sim, tasks, base)
+    try:
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as pool:
+            rows = [row for chunk in pool.map(_evaluate_chunk, chunks) for row in chunk]
+    finally:
+        _shared = None
+
+    results = [(w, SimMetrics(*row)) for w, row in zip(weights_population, rows)]
+    results.sort(key=lambda x: x[1].fitness)
+    return results
@@ -0,0 +1,194 @@
+################################################
+# sim.py 재실행 경로 검증 (pytest)
+# 무작위 작업 로그로 벡터화 / static 엔진 / 열 단위 Trace 경로가
+# 후보별 기준 구현(Simulator.simulate)과 같은 지표를 내는지 확인합니다.
+################################################
+
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from sim import Simulator, SimulatorConfig, HistTask, WeightVector, SimCluster, Trace
+import sim_bridge
+
+SEEDS = range(6)
+
+
+def _history(seed, n=None, n_clusters=None, sla=True):
+    """도착 시각이 겹치는 작업, 탄소 0(클러스터 평균 사용), SLA 유무, 이름 없는 클러스터를 섞은 로그"""
+    rnd = random.Random(seed)
+    n = n or rnd.randint(1, 300)
+    n_clusters = n_clusters or rnd.randint(1, 6)
+    t0 = datetime(2025, 1, 1)
+    return [HistTask(f"t{i}", t0 + timedelta(seconds=rnd.randint(0, 3600)), rnd.choice([1, 30, 60, 600, 3600]),
+                     rnd.choice([0.0, 100.0, 250.0, 800.0, 5000.0]), rnd.choice([0.0, 0.0, 120.5, 430.0]),
+                     rnd.choice([""] + [f"c{k}" for k in range(n_clusters)]),
+                     sla_deadline_sec=rnd.choice([None, 600, 4000]) if sla else None)
+            for i in range(n)]
+
+
+def _population(seed, size=12):
+    rnd = random.Random(seed + 1000)
+    return [WeightVector(*(rnd.choice([0.0, 0.5, 1.0, rnd.random()]) for _ in range(4))) for _ in range(size)]
+
+
+def _clone(clusters):
+    return [SimCluster(c.name, c.region, c.cpu_usage_input, c.eta_sec, c.carbon, c.cpu_usage_pct) for c in clusters]
+
+
+def _reference(tasks, weights, **cfg):
+    """후보마다 같은 시작 상태에서 simulate()를 따로 돌린 결과 (fitness 오름차순)"""
+    sim = Simulator(SimulatorConfig(engine="static", vectorized=False, **cfg))
+    base = sim.clusters_from_tasks(tasks)
+    results = [(w, sim.simulate(tasks, _clone(base), w)) for w in weights]
+    results.sort(key=lambda x: x[1].fitness)
+    return results
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_simulate_population_matches_simulate(seed):
+    tasks, weights = _history(seed), _population(seed)
+    sim = Simulator(SimulatorConfig(engine="static"))
+    base = sim.clusters_from_tasks(tasks)
+
+    expected = [sim.simulate(tasks, _clone(base), w) for w in weights]
+    assert sim.simulate_population(tasks, base, weights) == expected
+    # 시작 상태는 바뀌지 않는다
+    assert base == sim.clusters_from_tasks(tasks)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_static_engine_matches_reference(seed, vectorized):
+    tasks, weights = _history(seed), _population(seed)
+    sim = Simulator(SimulatorConfig(engine="static", vectorized=vectorized))
+
+    assert sim.evaluate_population(tasks, None, weights) == _reference(tasks, weights)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_static_engine_on_trace_matches_reference(seed):
+    tasks, weights = _history(seed), _population(seed)
+    trace = Trace.from_histtasks(tasks)
+    sim = Simulator(SimulatorConfig(engine="static"))
+
+    assert [(c.name, c.carbon) for c in sim.clusters_from_trace(trace)] == \
+           [(c.name, c.carbon) for c in sim.clusters_from_tasks(tasks)]
+    assert sim.evaluate_population(trace, None, weights) == _reference(tasks, weights)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_static_engine_without_assignments(seed):
+    tasks, weights = _history(seed), _population(seed)
+    sim = Simulator(SimulatorConfig(engine="static", record_assignments=False))
+
+    got = sim.evaluate_population(Trace.from_histtasks(tasks, keep_job_ids=False), None, weights)
+    expected = _reference(tasks, weights, record_assignments=False)
+    assert got == expected
+    assert all(m.assignments == [] for _, m in got)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_events_engine_trace_matches_histtasks(seed):
+    tasks, weights = _history(seed), _population(seed, size=4)
+    trace = Trace.from_histtasks(tasks)
+
+    sim = Simulator(SimulatorConfig())
+    base = sim.clusters_from_tasks(tasks)
+    expected = [sim.simulate_events(tasks, base, w) for w in weights]
+    # 묶음 경계가 작업 사이에 오도록 작은 chunk_size도 확인
+    for chunk_size in (1, 7, 65536):
+        chunked = Simulator(SimulatorConfig(chunk_size=chunk_size))
+        assert [chunked.simulate_events(trace, chunked.clusters_from_trace(trace), w) for w in weights] == expected
+
+
+def test_events_engine_releases_finished_tasks():
+    # 긴 작업 두 개 사이에 짧은 작업 하나가 끝나면, 세 번째 작업은 비워진 클러스터로 돌아가야 한다.
+    cfg = dict(cluster_cpu_unit="pct", task_avg_cpu_unit="pct", record_assignments=True)
+    t0 = datetime(2025, 1, 1)
+    tasks = [HistTask("long-1", t0, 3600, 40.0, 0.0, "a"),
+             HistTask("short", t0 + timedelta(seconds=1), 60, 55.0, 0.0, "b"),
+             HistTask("long-2", t0 + timedelta(seconds=300), 3600, 10.0, 0.0, "a")]
+    spec = [("a", "KR", 0.0, 0, 100.0), ("b", "KR", 0.0, 0, 100.0)]
+
+    def run(engine, weights):
+        sim = Simulator(SimulatorConfig(engine=engine, **cfg))
+        return sim.evaluate(tasks, sim.bootstrap_clusters(spec), [weights])[0]
+
+    # CPU: 짧은 작업이 끝나면 b의 사용률(55%)을 돌려받아 a(40%)보다 낮다
+    penalty_only = WeightVector(0.0, 1.0, 0.0, 0.0)
+    assert [c for _, c in run("events", penalty_only).assignments] == ["a", "b", "b"]
+    assert [c for _, c in run("static", penalty_only).assignments] == ["a", "b", "a"]
+
+    # ETA: 짧은 작업이 끝난 b는 대기 없이 바로 시작한다
+    workspan_only = WeightVector(0.0, 0.0, 1.0, 0.0)
+    events, static = run("events", workspan_only), run("static", workspan_only)
+    assert [c for _, c in events.assignments] == ["a", "b", "b"]
+    assert events.mean_latency == 0.0
+    assert static.mean_latency == 20.0         # static은 끝난 작업의 60초가 b에 남는다
+
+
+def _rows(tasks):
+    return [{"task_id": t.job_id, "dispatched_at": t.arrival_ts, "actual_runtime": t.exec_sec,
+             "avg_cpu_usage": t.avg_cpu, "carbon_intensity": t.carbon_intensity, "cluster_name": t.placed_cluster}
+            for t in tasks]
+
+
+def _assert_same_trace(a, b):
+    assert np.array_equal(a.data, b.data)
+    assert a.cluster_names == b.cluster_names
+    assert np.array_equal(a.cluster_carbon, b.cluster_carbon, equal_nan=True)
+    assert list(a.job_ids) == list(b.job_ids)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bridge_trace_matches_histtasks(seed, tmp_path, monkeypatch):
+    tasks = _history(seed)
+    rows = _rows(tasks)
+    # 배치되지 않은 작업(dispatched_at 없음)은 건너뛴다
+    rows.insert(len(rows) // 2, {"task_id": "undispatched", "dispatched_at": None, "cluster_name": "c0"})
+
+    expected = Trace.from_histtasks(sim_bridge.to_histtasks(rows))
+    # 여러 묶음에 걸쳐 채워지도록 묶음 크기를 줄인다
+    monkeypatch.setattr(sim_bridge, "TRACE_CHUNK_ROWS", 13)
+    _assert_same_trace(sim_bridge.to_trace(rows, keep_job_ids=True), expected)
+
+    path = tmp_path / "trace.npz"
+    expected.save(str(path))
+    _assert_same_trace(sim_bridge.load_trace(str(path)), expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bridge_static_simulation_matches_reference(seed):
+    # 작업 로그(dict)에는 SLA 열이 없다
+    tasks, weights = _history(seed, sla=False), _population(seed)
+    cfg = SimulatorConfig(capacity_m=4000.0, engine="static", record_assignments=True)
+    candidates = [{"a_w": w.a, "b_w": w.b, "c_w": w.c, "d_w": w.d} for w in weights]
+
+    got = sim_bridge.run_simulation_as_dicts_from_modules(_rows(tasks), candidates, cfg=cfg, workers=1)
+    expected = _reference(tasks, weights)
+    assert [(r["fitness"], r["total_carbon"], r["sla_miss"], r["p95_latency"], r["assignments"]) for r in got] == \
+           [(m.fitness, m.total_carbon, m.sla_miss, m.p95_latency, m.assignments) for _, m in expected]
+
+
+@pytest.mark.parametrize("engine", ["static", "events"])
+def test_parallel_evaluation_matches_single_process(engine, monkeypatch):
+    # 나눠 평가하는 경로를 실제로 타도록 후보 수를 SIM_PARALLEL_MIN_POP 이상으로 둔다
+    tasks, weights = _history(3, n=200, sla=False), _population(3, size=sim_bridge.SIM_PARALLEL_MIN_POP)
+    candidates = [{"a_w": w.a, "b_w": w.b, "c_w": w.c, "d_w": w.d} for w in weights]
+    cfg = SimulatorConfig(engine=engine, record_assignments=False)
+
+    parallel_calls = []
+    original = sim_bridge.evaluate_population_parallel
+
+    def spy(*args, **kwargs):
+        parallel_calls.append(args[-1])
+        return original(*args, **kwargs)
+    monkeypatch.setattr(sim_bridge, "evaluate_population_parallel", spy)
+
+    single = sim_bridge.run_simulation_as_dicts_from_modules(_rows(tasks), candidates, cfg=cfg, workers=1)
+    parallel = sim_bridge.run_simulation_as_dicts_from_modules(_rows(tasks), candidates, cfg=cfg, workers=2)
+    assert parallel_calls == [2]
+    assert parallel == single
@@ -0,0 +1,183 @@
+################################################
+# 학습기(Learning Loop) 백그라운드 실행기입니다.
+# 학습기는 별도 파이썬 프로세스(이 파일을 스크립트로 실행)에서 돌므로 실행기(Serving Loop) 스레드는 학습 중에도 계속 배치합니다.
+# 학습 결과는 weights_store.publish_weights()로 새 버전이 원자적으로 발행되고,
+# 끝나면 on_published 콜백(WeightsStore.notify)으로 실행기의 가중치 캐시가 바로 새 버전을 읽습니다.
+#
+# 학습 프로세스는 fork 없이 새 인터프리터로 띄운다. (subprocess = fork + 즉시 exec)
+# 실행기는 이미 여러 스레드(큐 writer, outbox, 상태 수집기, 작업 처리 스레드 등)가 돌고 있어, 그대로 fork하면
+# 다른 스레드가 잡고 있던 락(SQLite writer, DB 풀, logging)이 자식에 잠긴 채 복사되어 멈출 수 있고,
+# multiprocessing의 spawn / forkserver는 __main__(main_scheduler)을 다시 import해 실행기를 한 번 더 띄운다.
+# span 기록이 켜져 있으면 학습 프로세스도 span을 기록해 결과와 함께 돌려주고, 실행기의 /admin/spans에 합친다.
+# (/admin/profile 샘플링 프로파일러는 실행기 프로세스만 보므로 학습 프로세스는 나오지 않는다.)
+#
+# 실행 조건 (이미 실행 중이면 새로 시작하지 않음)
+# - 배치 완료된 작업 LEARNING_INTERVAL개마다 (0이면 사용 안 함)
+# - LEARNING_PERIOD_SEC초마다 (0이면 사용 안 함)
+# - trigger("manual") 직접 호출 (/admin/learn)
+################################################
+
+from datetime import datetime
+import subprocess
+import threading
+import contextlib
+import profiling
+import logging
+import metrics
+import json
+import time
+import sys
+import os
+
+
+LEARNING_INTERVAL = int(os.getenv("LEARNING_INTERVAL", 10))
+LEARNING_PERIOD_SEC = float(os.getenv("LEARNING_PERIOD_SEC", 0))
+# 학습 프로세스가 이 시간 안에 끝나지 않으면 종료시키고 실패로 기록
+LEARNING_TIMEOUT_SEC = float(os.getenv("LEARNING_TIMEOUT_SEC", 1800))
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class LearningRunner:
+    """
+    :param on_published: 학습이 끝나고 새 버전이 발행되면 호출할 함수 (인자: 버전)
+    """
+
+    def __init__(self, on_published, every_n=LEARNING_INTERVAL, period_sec=LEARNING_PERIOD_SEC,
+                 timeout_sec=LEARNING_TIMEOUT_SEC):
+        self.on_published = on_published
+        self.every_n = every_n
+        self.period_sec = period_sec
+        self.timeout_sec = timeout_sec
+        self._running = None            # 실행 중인 학습 스레드
+        self._served = 0
+        self._last_task = (None, 0)     # 학습기에 넘길 가장 최근 작업 (task_name, estimated_time)
+        self._last_run = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # --- 실행 조건 ---
+    def count_served(self, placements):
+        """배치 완료된 작업 수를 더하고, every_n개를 넘길 때마다 학습을 시작한다. placements: [(task, cluster), ...]"""
+        if not placements:
+            return
+        with self._lock:
+            before = self._served
+            self._served += len(placements)
+            task = placements[-1][0]
+            self._last_task = (task.get('task_name'), task.get('estimated_time', 0))
+            due = self.every_n > 0 and self._served // self.every_n > before // self.every_n
+        if due:
+            self.trigger("served")
+
+    def trigger(self, reason="manual") -> bool:
+        """학습을 백그라운드에서 시작한다. 이미 실행 중이면 False."""
+        with self._lock:
+            if self._running is not None and self._running.is_alive():
+                return False
+            self._last_run = {"reason": reason, "started_at": datetime.now().isoformat(timespec="seconds")}
+            self._running = threading.Thread(target=self._run, args=(reason, self._last_task), daemon=True,
+                                             name="learning-run")
+            self._running.start()
+        logging.info(f"Learning Loop: Start Calculation ({reason})")
+        return True
+
+    def _run(self, reason, last_task):
+        task_name, estimated_time = last_task
+        started = time.monotonic()
+        command = [sys.executable, os.path.abspath(__file__), "--task-name", str(task_name or ""),
+                   "--estimated-time", str(estimated_time or 0)]
+        if profiling.spans_enabled():
+            command.append("--spans")
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, text=True, timeout=self.timeout_sec, cwd=_HERE)
+            if result.returncode != 0:
+                raise RuntimeError(f"학습 프로세스 종료 코드 {result.returncode}")
+            output = json.loads(result.stdout.strip().splitlines()[-1])
+            version = output["version"]
+            if output.get("spans"):
+                profiling.merge_stats(output["spans"])
+        except Exception as e:
+            self._finished(reason, started, error=e)
+        else:
+            self._finished(reason, started, version=version)
+
+    def _finished(self, reason, started, version=None, error=None):
+        elapsed = time.monotonic() - started
+        metrics.learning_loop_duration.observe(elapsed)
+        finished_at = datetime.now().isoformat(timespec="seconds")
+        if error is not None:
+            metrics.learning_runs.labels(trigger=reason, result="error").inc()
+            self._last_run.update(finished_at=finished_at, error=str(error))
+            logging.error(f"❌ 학습기 실행 중 오류 ({elapsed:.1f}초): {error}")
+            return
+
+        if version is None:
+            # 학습은 끝났지만 발행된 가중치가 없다 (예: 학습 데이터 없음) - 실행기에 알리지 않는다.
+            metrics.learning_runs.labels(trigger=reason, result="skipped").inc()
+            self._last_run.update(finished_at=finished_at, version=None)
+            logging.warning(f"⚠ Learning Loop: 발행된 가중치 없음 ({elapsed:.1f}초)")
+            return
+
+        metrics.learning_runs.labels(trigger=reason, result="ok").inc()
+        self._last_run.update(finished_at=finished_at, version=version)
+        logging.info(f"Learning Loop: 완료 ({elapsed:.1f}초, 버전: {version})")
+        try:
+            self.on_published(version)
+        except Exception as e:
+            logging.error(f"❌ 가중치 반영 알림 중 오류: {e}")
+
+    # --- 상태 ---
+    def is_running(self) -> bool:
+        running = self._running
+        return running is not None and running.is_alive()
+
+    def status(self) -> dict:
+        return {"running": self.is_running(), "served": self._served, "every_n": self.every_n,
+                "period_sec": self.period_sec, "last_run": dict(self._last_run)}
+
+    # --- 주기 실행 ---
+    def _loop(self):
+        while True:
+            time.sleep(self.period_sec)
+            try:
+                if not self.trigger("timer"):
+                    logging.info("학습기가 실행 중이라 주기 실행을 건너뜀")
+            except Exception as e:
+                logging.error(f"❌ 학습기 주기 실행 중 오류: {e}")
+
+    def start(self):
+        if self._thread is not None or self.period_sec <= 0:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="learning-timer")
+        self._thread.start()
+
+
+def _main(argv=None):
+    """
+    학습 프로세스 진입점. 표준 출력 마지막 줄에 JSON으로 결과를 쓴다.
+    {"version": 발행된 가중치 버전(없으면 null), "spans": --spans일 때 profiling.export_stats()}
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Carbonetes learning loop (single run)")
+    parser.add_argument("--task-name", default="")
+    parser.add_argument("--estimated-time", type=float, default=0)
+    parser.add_argument("--spans", action="store_true", help="span 기록 후 결과에 포함")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [learning] %(message)s')
+    sys.path[:0] = [os.path.join(_HERE, "learing_loop"), _HERE, os.path.dirname(_HERE)]
+    from main_learning_loop import learning_loop
+    profiling.set_spans_enabled(args.spans)
+
+    # 학습기의 print 출력은 표준 에러로 보내고, 표준 출력에는 결과만 쓴다.
+    with contextlib.redirect_stdout(sys.stderr):
+        version = learning_loop(args.task_name or None, args.estimated_time)
+    output = {"version": version}
+    if args.spans:
+        output["spans"] = profiling.export_stats()
+    print(json.dumps(output))
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,20 +1,43 @@
-from flask import Flask, request, jsonify
-from queue import Queue
+from flask import Flask, Response, request, jsonify
+from prometheus_flask_exporter import PrometheusMetrics
+from queue import Empty
 from threading import Thread
 import time
 import logging
 import sys
-import requests
+import json
+import ipaddress
+import math
+import hmac
 import os
 from datetime import datetime
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from task_processor import process_task
-from scheduler.learing_loop.main_learning_loop import learning_loop
+from task_processor import (
+    process_batch, process_time_shifted, start_reserved, release_reserved, restore_reservations, has_headroom,
+    nodes, cluster_state, weights_cache
+)
+from time_shift import DelayedRelease
+from task_queue import DurableQueue
+from dispatch_outbox import DispatchOutbox
+from decision_log import DecisionLogWriter
+from deferred_placement import DeferredPlacement
+import metrics
+import profiling
+from learning_runner import LearningRunner
+from common import db
 
 app = Flask(__name__)
-data_queue = Queue()
+# /metrics 노출 (HTTP 요청 지표 + metrics.py의 스케줄러 지표)
+prometheus = PrometheusMetrics(app)
+data_queue = DurableQueue()   # 재시작 시 처리되지 않은 작업을 다시 불러온다.
+outbox = DispatchOutbox()     # 배치 결과를 Dispatcher에 비동기로 전달
+cluster_log = DecisionLogWriter("cluster.log", fmt="text")
+# 모든 클러스터가 포화일 때 작업을 보류했다가, 상태가 바뀌면 큐로 돌려보낸다.
+deferred = DeferredPlacement(data_queue.requeue, has_headroom, nodes)
+# 학습기는 별도 프로세스에서 실행하고, 새 가중치 버전이 발행되면 가중치 캐시를 바로 갱신한다.
+learning = LearningRunner(lambda version: weights_cache.notify())
 
 # -----------------------
 #  Logging 설정
@@ -29,66 +52,197 @@ logging.basicConfig(
 
 #########################################################################
 
+# 배치 스케줄링 설정: 최대 SCHEDULER_BATCH_SIZE개 또는 첫 작업 이후 SCHEDULER_BATCH_WAIT_MS까지 모아서 한 번에 배치
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", 16))
+SCHEDULER_BATCH_WAIT_MS = float(os.getenv("SCHEDULER_BATCH_WAIT_MS", 50))
+# 실행기 스레드 수 (탄소 조회 / Dispatcher 요청처럼 I/O 대기가 길수록 늘리면 처리량이 올라간다)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 4))
+# DB 커넥션 풀: 실행기 스레드마다 하나 + DB를 쓰는 백그라운드 스레드(가중치 캐시) + 여유 하나(기동 시 복구, 관리 요청)
+# DB_POOL_SIZE를 직접 주면 그 값을 쓴다. (mysql-connector 풀 최대 32)
+DB_BACKGROUND_CONNECTIONS = 2
+if "DB_POOL_SIZE" not in os.environ:
+    db.configure(pool_size=min(32, SCHEDULER_WORKERS + DB_BACKGROUND_CONNECTIONS))
+
+
+def drain_batch(queue, max_size=SCHEDULER_BATCH_SIZE, wait_ms=SCHEDULER_BATCH_WAIT_MS):
+    """첫 작업이 들어올 때까지 기다린 뒤, max_size개가 차거나 wait_ms가 지날 때까지 더 꺼낸다."""
+    batch = [queue.get()]
+    deadline = time.monotonic() + wait_ms / 1000
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(queue.get(timeout=remaining))
+        except Empty:
+            break
+    return batch
+
+
+def publish_placements(placements):
+    """
+    배치가 확정된 작업을 기록하고 outbox에 넘긴 뒤 큐에서 지운다. placements: [(task, cluster), ...]
+    예외가 나면 outbox에 넘어가지 않은 것이므로, 호출한 쪽에서 예약을 되돌리고 작업을 다시 처리해야 한다.
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cluster_log.write_many(f"[{timestamp}] {task.get('task_name')} -> {cluster}\n" for task, cluster in placements)
+
+    now = time.time()
+    for task, cluster in placements:
+        logging.info(f"Success Schduling: 배치 클러스터 :{cluster} TaskID : {task.get('task_name')}")
+        metrics.cluster_selected.labels(cluster=cluster).inc()
+        if "enqueued_at" in task:
+            metrics.placement_wait.observe(now - task["enqueued_at"])
+
+    # Dispatcher 전달은 outbox가 맡는다. outbox에 기록된 작업만 큐에서 지운다.
+    # (보류된 작업은 큐에 남아 있으므로 재시작 시에도 다시 처리된다.)
+    if placements:
+        outbox.add_many([(task.get('task_name'), cluster) for task, cluster in placements])
+        # outbox에 기록된 뒤에는 전달이 보장되므로, 큐 삭제가 실패해도 작업을 되돌리지 않는다. (재시작 시 중복 전달될 수 있음)
+        try:
+            data_queue.ack([task for task, _ in placements])
+        except Exception as e:
+            logging.error(f"❌ 전달된 작업을 큐에서 지우는 중 오류: {e}")
+
+
+def recover_unpublished(tasks, reserved):
+    """
+    처리 중 오류로 전달하지 못한 작업을 되돌린다.
+    :param tasks: 다시 처리할 작업 (백오프를 두고 보류했다가 큐로 돌려보낸다)
+    :param reserved: 예약까지 했지만 전달하지 못한 [(task, cluster), ...] - 예약을 해제한다.
+    """
+    release_reserved(reserved)
+    if tasks:
+        deferred.park(tasks, reason="처리 중 오류로 전달하지 못했습니다.")
+
+
+def release_delayed(placements):
+    """시작 시각이 된 시간 이동 작업을 예약하고 Dispatcher로 넘긴다."""
+    reserved = []
+    try:
+        for task, cluster in placements:
+            start_reserved(task, cluster)
+            reserved.append((task, cluster))
+        publish_placements(placements)
+    except Exception as e:
+        logging.error(f"❌ 예약 작업 전달 중 오류: {e}")
+        recover_unpublished([task for task, _ in placements], reserved)
+
+
+# 시간 이동으로 미래에 시작하기로 한 작업을 시작 시각까지 보관
+delayed = DelayedRelease(release_delayed)
+
+
 # 큐에서 뽑아 데이터 처리
 def process_queue():
     while True:
         try:
-            served_count = 0 # 학습기를 위한 카운트 
-
-            task = data_queue.get()
-            task_name = task.get('task_name')
-            estimated_time = task.get('estimated_time', 0)
-            # 스케줄러 실행기(Serving Loop) 호출
-            cluster = process_task(task_name, estimated_time)
-
-            # 스케줄러 학습기(Learning Loop) 호출 및 관리 
-            served_count += 1
-            if served_count % 10 == 0:
-                learning_loop(task_name, estimated_time)
-                logging.info(f'Learning Loop: Start Calculation')
-
-
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open('cluster.log', 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] {task_name} -> {cluster}\n")
-            
-            # Dispatcher 에 값 전달
-            logging.basicConfig(
-                level=logging.INFO,
-                format='%(asctime)s [%(levelname)s] %(message)s',
-                handlers=[logging.StreamHandler()]
-            )
-
-            url = 'http://localhost:5000/new-task'
-
-            if cluster == None: 
-                logging.error(f'Schdule Failed: 배치 클러스터 : {cluster}')
-            else: 
-                logging.info(f'Success Schduling: 배치 클러스터 :{cluster} TaskID : {task_name}')
-            data = {
-                'cluster': cluster,
-                'task_name': task_name
-            }
+            batch = drain_batch(data_queue)
+        except Exception as e:
+            logging.error(e)
+            continue
 
-            try:
-                response = requests.post(url, json=data)
-                logging.info(f'Status Code: {response.status_code}')
-                logging.info(f'Response Body: {response.json()}')
-            except requests.exceptions.RequestException as e:
-                logging.error(f'Request failed: {e}')
+        # 전달(outbox) / 보류 / 시간 이동 보관 중 하나로 넘어간 작업의 id - 나머지는 finally에서 되돌린다.
+        settled = set()
+        placements = []
+        try:
+            # 시작 기한이 있는 작업은 탄소 예보에 맞춰 시작 시각까지 정한다.
+            shifted = [task for task in batch if task.get('start_deadline')]
+            immediate = [task for task in batch if not task.get('start_deadline')]
 
-                data_queue.task_done()
-            except Exception as e:
-                logging.error(f"[Thread Error] 큐 처리 중 오류 발생: {e}")
+            # 스케줄러 실행기(Serving Loop) 호출 - 한 번의 스냅샷으로 배치 전체를 배치
+            placements = process_batch(immediate) if immediate else []
+            for task in shifted:
+                # 작업 하나의 오류(탄소 예보 없음 등)로 배치 전체가 멈추지 않도록 작업마다 처리
+                try:
+                    plan = process_time_shifted(task)
+                except Exception as e:
+                    logging.error(f"❌ 시간 이동 배치 중 오류 ({task.get('task_name')}): {e}")
+                    continue
+                if plan is None:
+                    placements.append((task, None))
+                elif plan[1] <= time.time():
+                    placements.append((task, plan[0]))
+                else:
+                    delayed.hold(task, plan[0], plan[1])
+                    settled.add(id(task))
+
+            # 이번 배치에서 자리가 없던 작업은 보류했다가 클러스터 상태가 바뀌면 다시 평가
+            deferred_tasks = [task for task, cluster in placements if cluster is None]
+            if deferred_tasks:
+                deferred.park(deferred_tasks)
+                settled.update(id(task) for task in deferred_tasks)
+            placements = [(task, cluster) for task, cluster in placements if cluster is not None]
+
+            publish_placements(placements)
+            settled.update(id(task) for task, _ in placements)
+
+            # 스케줄러 학습기(Learning Loop)는 별도 프로세스에서 실행 (실행 중이면 건너뜀)
+            learning.count_served(placements)
         except Exception as e:
-            logging.error(e)
+            logging.error(f"[Thread Error] 큐 처리 중 오류 발생: {e}")
+        finally:
+            # 전달하지 못한 작업은 예약을 해제하고 다시 처리한다. (큐에 처리 중으로 남아 버려지지 않도록)
+            unsettled = [task for task in batch if id(task) not in settled]
+            if unsettled:
+                try:
+                    recover_unpublished(unsettled, [(task, cluster) for task, cluster in placements
+                                                    if cluster is not None and id(task) not in settled])
+                except Exception as e:
+                    logging.error(f"❌ 전달하지 못한 작업 복구 중 오류: {e}")
+            for _ in batch:
+                data_queue.task_done()
 
 
 #########################################################################
 
+# 단계별 대기 작업 수는 /metrics 수집 시점에 읽는다.
+metrics.queue_depth.labels(state='ready').set_function(data_queue.qsize)
+metrics.queue_depth.labels(state='inflight').set_function(data_queue.inflight_size)
+metrics.queue_depth.labels(state='deferred').set_function(deferred.size)
+metrics.queue_depth.labels(state='delayed').set_function(delayed.size)
+metrics.queue_depth.labels(state='outbox').set_function(outbox.pending_size)
+
+# 재시작 전 예약 상태 복구 (실행 중 작업이 있는 클러스터를 비어 있다고 보지 않도록 실행기보다 먼저)
+restore_reservations()
+
+# 클러스터 상태 수집기 시작 (첫 스냅샷 준비 후 반환) / 가중치 캐시 시작
+cluster_state.add_listener(deferred.on_snapshot)
+cluster_state.start()
+weights_cache.start()
+outbox.start()
+learning.start()
+deferred.start()
+delayed.start()
+
 # 작업 처리 스레드 시작
-worker = Thread(target=process_queue, daemon=True)
-worker.start()
+workers = [Thread(target=process_queue, daemon=True, name=f"scheduler-worker-{i}") for i in range(SCHEDULER_WORKERS)]
+for worker in workers:
+    worker.start()
+logging.info(f"실행기 스레드 {SCHEDULER_WORKERS}개 시작")
+
+def parse_task(data):
+    """요청 본문 하나를 작업 dict로 변환한다. 잘못된 값이면 ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("작업은 JSON 객체여야 합니다.")
+    if 'task_name' not in data or 'estimated_time' not in data:
+        raise ValueError("task_name과 estimated_time이 필요합니다.")
+    try:
+        estimated_time = int(data['estimated_time']) # 초 단위 정수값 사용 
+    except (TypeError, ValueError):
+        raise ValueError("estimated_time은 정수여야 합니다.")
+    task = {
+        "task_name": data['task_name'],
+        "estimated_time": estimated_time
+    }
+    # 선택: 지금부터 몇 초 안에 시작하면 되는지 - 있으면 탄소가 낮은 시간대로 미뤄서 배치할 수 있다.
+    if data.get('start_deadline_sec') is not None:
+        try:
+            task["start_deadline"] = time.time() + int(data['start_deadline_sec'])
+        except (TypeError, ValueError):
+            raise ValueError("start_deadline_sec은 정수여야 합니다.")
+    return task
+
 
 # Enqueue End Point
 @app.route('/schedule', methods=['POST'])
@@ -99,15 +253,13 @@ def enqueue():
 
     data = request.get_json()
 
-    if 'task_name' not in data or 'estimated_time' not in data:
-        logging.warning("enqueue 요청에 필요한 키가 없음")
-        return jsonify({"error": "task_name과 estimated_time이 필요합니다."}), 400
+    try:
+        task = parse_task(data)
+    except ValueError as e:
+        logging.warning(f"enqueue 요청이 잘못됨: {e}")
+        return jsonify({"error": str(e)}), 400
 
     try:
-        task = {
-            "task_name": data['task_name'],
-            "estimated_time": int(data['estimated_time']) # 초 단위 정수값 사용 
-        }
         data_queue.put(task)
         logging.info(f"작업 등록됨: {task}")
         return jsonify({"status": "작업이 큐에 등록되었습니다.", "task": task}), 200
@@ -115,12 +267,152 @@ def enqueue():
         logging.error(f"enqueue 처리 중 오류: {e}")
         return jsonify({"error": "요청 처리 중 오류 발생"}), 500
 
+
+def read_bulk_items():
+    """
+    일괄 등록 요청 본문을 항목 리스트로 읽는다.
+    - application/json: 작업 객체의 JSON 배열
+    - application/x-ndjson: 한 줄에 작업 객체 하나 (스트리밍 본문을 줄 단위로 읽음)
+    잘못된 JSON 줄은 ValueError 객체로 남겨 항목별 결과에 포함한다.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(ValueError("JSON 형식이 아닌 줄입니다."))
+        return items
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("JSON 배열 또는 NDJSON 본문이어야 합니다.")
+    return data
+
+
+# 일괄 Enqueue End Point - 전체를 한 번에 검증한 뒤, 모두 유효할 때만 한 트랜잭션으로 등록
+@app.route('/schedule/bulk', methods=['POST'])
+def enqueue_bulk():
+    try:
+        items = read_bulk_items()
+    except ValueError as e:
+        logging.warning(f"일괄 enqueue 요청이 잘못됨: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    tasks, results = [], []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, ValueError):
+                raise item
+            task = parse_task(item)
+            tasks.append(task)
+            results.append({"index": index, "status": "valid", "task": task})
+        except ValueError as e:
+            results.append({"index": index, "status": "rejected", "error": str(e)})
+
+    if not items:
+        return jsonify({"error": "등록할 작업이 없습니다."}), 400
+
+    rejected = len(items) - len(tasks)
+    if rejected:
+        logging.warning(f"일괄 enqueue 거부 - {len(items)}개 중 {rejected}개 오류")
+        return jsonify({"error": "잘못된 항목이 있어 아무 작업도 등록하지 않았습니다.",
+                        "accepted": 0, "rejected": rejected, "results": results}), 400
+
+    try:
+        data_queue.put_many(tasks)
+    except Exception as e:
+        logging.error(f"일괄 enqueue 처리 중 오류: {e}")
+        return jsonify({"error": "요청 처리 중 오류 발생"}), 500
+
+    for result in results:
+        result["status"] = "queued"
+    logging.info(f"작업 {len(tasks)}개 일괄 등록됨")
+    return jsonify({"status": "작업이 큐에 등록되었습니다.", "accepted": len(tasks), "rejected": 0,
+                    "results": results}), 200
+
+# 작업 완료 알림 - 보류된 작업을 바로 다시 평가한다.
+@app.route('/task-completed', methods=['POST'])
+def task_completed():
+    deferred.notify()
+    return jsonify({"status": "ok", "deferred": deferred.size()}), 200
+
 # Queue 크기 확인
 @app.route('/queue_size', methods=['GET'])
 def queue_size():
-    size = data_queue.qsize()
-    logging.info(f"큐 크기 확인 요청 - 현재 큐 크기: {size}")
-    return jsonify({"queue_size": size}), 200
+    # 모니터링에서 자주 호출하므로 로그는 남기지 않는다. (추이는 /metrics의 scheduler_queue_depth)
+    return jsonify({"queue_size": data_queue.qsize()}), 200
+
+
+# -----------------------
+#  관리용 프로파일링 / 학습 (ADMIN_TOKEN이 설정되어 있으면 X-Admin-Token 헤더 필요,
+#  설정되어 있지 않으면 같은 호스트(loopback)에서 온 요청만 허용)
+# -----------------------
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def is_admin():
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+    try:
+        return ipaddress.ip_address(request.remote_addr or "").is_loopback
+    except ValueError:
+        return False
+
+
+# 단계별 span 기록 켜기/끄기 및 경로별 누적 시간 조회
+@app.route('/admin/spans', methods=['GET', 'POST'])
+def admin_spans():
+    if not is_admin():
+        return jsonify({"error": "권한이 없습니다."}), 403
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        profiling.set_spans_enabled(data.get("enabled", True), reset=bool(data.get("reset", False)))
+        logging.info(f"프로파일링 span 기록: {'켜짐' if profiling.spans_enabled() else '꺼짐'}")
+    return jsonify({"enabled": profiling.spans_enabled(), "spans": profiling.span_stats()}), 200
+
+
+# 학습기 즉시 실행 (POST) / 상태 조회 (GET)
+@app.route('/admin/learn', methods=['GET', 'POST'])
+def admin_learn():
+    if not is_admin():
+        return jsonify({"error": "권한이 없습니다."}), 403
+    if request.method == 'GET':
+        return jsonify(learning.status()), 200
+    if not learning.trigger("manual"):
+        return jsonify({"error": "학습기가 이미 실행 중입니다.", **learning.status()}), 409
+    return jsonify({"status": "학습을 시작했습니다.", **learning.status()}), 202
+
+
+# N초 동안 샘플링 프로파일 후 collapsed-stack 파일 반환 (flamegraph.pl / speedscope 입력)
+@app.route('/admin/profile', methods=['GET'])
+def admin_profile():
+    if not is_admin():
+        return jsonify({"error": "권한이 없습니다."}), 403
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval_ms = float(request.args.get("interval_ms", profiling.PROFILE_INTERVAL_MS))
+    except ValueError:
+        return jsonify({"error": "seconds와 interval_ms는 숫자여야 합니다."}), 400
+    if not math.isfinite(seconds) or seconds <= 0:
+        return jsonify({"error": "seconds는 0보다 커야 합니다."}), 400
+    if not math.isfinite(interval_ms) or interval_ms <= 0:
+        return jsonify({"error": "interval_ms는 0보다 커야 합니다."}), 400
+    # 요청 스레드를 오래 붙잡지 않도록 PROFILE_MAX_SEC를 넘으면 줄인다.
+    seconds = min(seconds, profiling.PROFILE_MAX_SEC)
+
+    logging.info(f"샘플링 프로파일 시작 ({seconds}초, {interval_ms}ms 간격)")
+    try:
+        collapsed = profiling.sample_profile(seconds, interval_ms, include_idle=request.args.get("idle") == "1")
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+
+    filename = f"scheduler-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return Response(collapsed, mimetype="text/plain",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
 
 if __name__ == '__main__':
     logging.info("Flask 앱 시작됨 (0.0.0.0:28000)")
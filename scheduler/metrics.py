@@ -0,0 +1,49 @@
+################################################
+# 스케줄러 Prometheus 지표 정의입니다.
+# 지표는 prometheus_client 기본 레지스트리에 등록되며, main_scheduler의 /metrics로 노출됩니다.
+# (이름 규칙: scheduler_ 접두사, 단위는 _seconds, 카운터는 _total)
+################################################
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# 배치 결정은 ms 단위, 큐 대기 / 학습기는 초~분 단위라 버킷을 따로 둔다.
+_LATENCY_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+_WAIT_BUCKETS = (.01, .05, .1, .5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+_LEARNING_BUCKETS = (.1, .5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# --- 지연 시간 ---
+decision_latency = Histogram(
+    'scheduler_decision_latency_seconds',
+    'End-to-end placement decision latency per batch (snapshot, carbon lookup, scoring, DB update)',
+    ['path'], buckets=_LATENCY_BUCKETS)       # path: batch | time_shift
+stage_duration = Histogram(
+    'scheduler_stage_duration_seconds',
+    'Duration of each scheduling stage',
+    ['stage'], buckets=_LATENCY_BUCKETS)      # stage: resource_probe | carbon_lookup | scoring | db_update | dispatch_post
+learning_loop_duration = Histogram(
+    'scheduler_learning_loop_duration_seconds', 'Learning loop run duration', buckets=_LEARNING_BUCKETS)
+learning_runs = Counter(
+    'scheduler_learning_runs_total', 'Learning loop runs by trigger and result',
+    ['trigger', 'result'])                    # trigger: served | timer | manual, result: ok | error
+span_duration = Histogram(
+    'scheduler_span_duration_seconds', 'Profiling span durations (only while spans are enabled)',
+    ['span'], buckets=_LATENCY_BUCKETS)       # span: 중첩 경로 (예: process_batch/reserve/scoring)
+
+# --- 큐 ---
+queue_depth = Gauge(
+    'scheduler_queue_depth', 'Number of tasks in each scheduler stage',
+    ['state'])                                # state: ready | inflight | deferred | delayed | outbox
+queue_wait = Histogram(
+    'scheduler_queue_wait_seconds', 'Time from enqueue until a worker takes the task', buckets=_WAIT_BUCKETS)
+placement_wait = Histogram(
+    'scheduler_placement_wait_seconds', 'Time from enqueue until the task is handed to the dispatch outbox',
+    buckets=_WAIT_BUCKETS)
+
+# --- 배치 결과 / 재시도 ---
+cluster_selected = Counter('scheduler_cluster_selected_total', 'Tasks placed on each cluster', ['cluster'])
+reservation_conflicts = Counter(
+    'scheduler_reservation_conflicts_total', 'Reservation compare-and-swap conflicts that forced a re-score')
+deferred_tasks = Counter('scheduler_deferred_total', 'Tasks parked because no cluster had headroom')
+dispatch_retries = Counter('scheduler_dispatch_retries_total', 'Dispatcher deliveries scheduled for retry')
+dispatch_failures = Counter('scheduler_dispatch_failures_total', 'Dispatcher deliveries given up after retries')
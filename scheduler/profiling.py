@@ -0,0 +1,178 @@
+################################################
+# 스케줄러 프로파일링 도구입니다. 서비스를 재시작하지 않고 켜고 끌 수 있습니다.
+#
+# 1) 단계별 타이밍 span
+#    with span("scoring"): ... / @traced("process_batch")
+#    꺼져 있으면 아무것도 하지 않는 컨텍스트를 돌려주므로 실행 경로 비용이 거의 없습니다.
+#    켜져 있으면 스레드별로 중첩된 경로(예: process_batch/reserve/scoring)마다 시간을 모아
+#    /admin/spans와 scheduler_span_duration_seconds 지표로 보여줍니다.
+#    다른 프로세스(학습 프로세스)의 span은 export_stats() / merge_stats()로 넘겨받아 합칩니다.
+#
+# 2) 샘플링 프로파일러
+#    sample_profile(seconds)는 일정 간격으로 모든 스레드의 호출 스택을 떠서
+#    flamegraph.pl / speedscope에서 바로 읽을 수 있는 collapsed-stack 텍스트로 반환합니다.
+#    ("스레드;파일:함수;파일:함수 샘플수" 한 줄씩)
+#    현재 프로세스의 스레드만 보이므로 별도 프로세스로 도는 학습기는 샘플에 나오지 않습니다.
+################################################
+
+from collections import Counter
+import contextlib
+import functools
+import threading
+import metrics
+import math
+import time
+import sys
+import os
+
+
+PROFILE_SPANS = os.getenv("PROFILE_SPANS", "0") == "1"                  # 시작할 때 span 기록 여부
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))        # 샘플링 간격
+PROFILE_MAX_SEC = float(os.getenv("PROFILE_MAX_SEC", 120))               # 한 번에 샘플링할 수 있는 최대 시간
+
+# 스택 맨 위가 이 함수들이면 대기 중인 스레드로 보고 기본적으로 제외한다.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("socketserver.py", "serve_forever"), ("thread.py", "_worker"),
+}
+
+_enabled = PROFILE_SPANS
+_local = threading.local()
+_stats = {}                     # {경로: [횟수, 합계(초), 최대(초)]}
+_stats_lock = threading.Lock()
+_profile_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+
+# --- 타이밍 span ---
+def set_spans_enabled(enabled: bool, reset: bool = False):
+    global _enabled
+    _enabled = bool(enabled)
+    if reset:
+        with _stats_lock:
+            _stats.clear()
+
+
+def spans_enabled() -> bool:
+    return _enabled
+
+
+class _Span:
+    __slots__ = ("name", "path", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.path = "/".join(stack)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        _local.stack.pop()
+        with _stats_lock:
+            entry = _stats.get(self.path)
+            if entry is None:
+                _stats[self.path] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+        metrics.span_duration.labels(span=self.path).observe(elapsed)
+        return False
+
+
+def span(name):
+    """span 기록이 켜져 있을 때만 name 구간의 시간을 잰다."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def traced(name=None):
+    """함수 전체를 span으로 감싸는 데코레이터. 켜짐 여부는 호출할 때마다 확인한다."""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def span_stats():
+    """경로별 {count, total_sec, mean_ms, max_ms} (합계 시간이 큰 순)"""
+    with _stats_lock:
+        items = [(path, list(entry)) for path, entry in _stats.items()]
+    items.sort(key=lambda item: item[1][1], reverse=True)
+    return [{"span": path, "count": count, "total_sec": round(total, 6),
+             "mean_ms": round(total / count * 1000, 3), "max_ms": round(peak * 1000, 3)}
+            for path, (count, total, peak) in items]
+
+
+def export_stats():
+    """다른 프로세스로 넘기기 위한 원본 누적값 {경로: [횟수, 합계(초), 최대(초)]}"""
+    with _stats_lock:
+        return {path: list(entry) for path, entry in _stats.items()}
+
+
+def merge_stats(stats):
+    """export_stats()로 받은 누적값을 합친다. (지표 히스토그램에는 구간별 값이 없으므로 /admin/spans에만 반영)"""
+    with _stats_lock:
+        for path, (count, total, peak) in stats.items():
+            entry = _stats.get(path)
+            if entry is None:
+                _stats[path] = [int(count), float(total), float(peak)]
+            else:
+                entry[0] += int(count)
+                entry[1] += float(total)
+                entry[2] = max(entry[2], float(peak))
+
+
+# --- 샘플링 프로파일러 ---
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_profile(seconds, interval_ms=PROFILE_INTERVAL_MS, include_idle=False):
+    """
+    seconds 동안 interval_ms마다 모든 스레드의 스택을 샘플링해 collapsed-stack 텍스트를 반환한다.
+    이미 다른 프로파일이 진행 중이면 RuntimeError.
+    """
+    seconds, interval_ms = float(seconds), float(interval_ms)
+    if not (math.isfinite(seconds) and seconds > 0 and math.isfinite(interval_ms) and interval_ms > 0):
+        raise ValueError("seconds와 interval_ms는 0보다 큰 유한한 값이어야 합니다.")
+    seconds = min(seconds, PROFILE_MAX_SEC)
+    interval = max(0.001, interval_ms / 1000)
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("이미 프로파일링이 진행 중입니다.")
+    try:
+        me = threading.get_ident()
+        counts = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+                if not include_idle and leaf in _IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}").replace(";", "_"))
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
@@ -0,0 +1,131 @@
+################################################
+# 클러스터 예약 상태(Node.expected_finish_at) 저장소입니다.
+# 예약이 바뀔 때마다 메모리에 표시만 해 두고, 백그라운드 스레드가 클러스터별 최신 값 한 행씩을
+# SQLite 파일에 모아서 씁니다. (예약 경로에서는 파일 I/O가 일어나지 않음)
+#
+# 재시작 시 restore()가 두 출처로 예약 상태를 되살립니다.
+#   - task_info의 실행 중(status='running') 작업: 쿼리 한 번으로 클러스터별 예상 종료 시각 계산
+#   - 이 파일에 남은 예약: 아직 Dispatcher에 전달되지 않아 task_info에 없는 예약까지 포함
+################################################
+
+from datetime import datetime, timedelta
+from common import db
+import mysql.connector
+import threading
+import sqlite3
+import logging
+import time
+import os
+
+
+RESERVATION_STORE_PATH = os.getenv("RESERVATION_STORE_PATH", "node_reservations.db")
+RESERVATION_FLUSH_MS = float(os.getenv("RESERVATION_FLUSH_MS", 200))
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS node_reservation (
+        cluster_name       TEXT PRIMARY KEY,
+        expected_finish_at REAL NULL,       -- epoch 초
+        updated_at         REAL NOT NULL
+    )
+"""
+
+_RUNNING_TASKS_QUERY = """
+    SELECT cluster_name, dispatched_at, estimated_time
+      FROM task_info
+     WHERE status = 'running'
+       AND cluster_name IS NOT NULL
+       AND dispatched_at IS NOT NULL
+     ORDER BY cluster_name, dispatched_at
+"""
+
+
+def running_finish_times(rows):
+    """
+    실행 중 작업 행으로 클러스터별 예상 종료 시각을 계산한다.
+    Node.try_reserve()와 같이 작업이 차례로 이어서 실행된다고 보고, 전달 시각 순으로 누적한다.
+    :param rows: [{"cluster_name", "dispatched_at"(datetime), "estimated_time"(초)}, ...] - 클러스터 / 전달 시각 순
+    :return: {cluster_name: datetime}
+    """
+    finishes = {}
+    for row in rows:
+        name = row["cluster_name"]
+        start = max(finishes.get(name, row["dispatched_at"]), row["dispatched_at"])
+        finishes[name] = start + timedelta(seconds=float(row["estimated_time"] or 0))
+    return finishes
+
+
+class ReservationStore:
+    """
+    record()는 클러스터별 최신 값만 덮어쓰고 바로 반환하며, 파일 기록은 RESERVATION_FLUSH_MS마다 한 트랜잭션으로 한다.
+    예약 상태는 task_info로도 복구되므로 마지막 flush 이후 몇 ms의 기록은 잃어도 된다. (synchronous=NORMAL)
+    """
+
+    def __init__(self, path=RESERVATION_STORE_PATH, flush_ms=RESERVATION_FLUSH_MS):
+        self.flush_ms = flush_ms
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._dirty = {}                # {cluster_name: epoch 초 또는 None}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def record(self, cluster_name, expected_finish_at):
+        with self._cond:
+            self._dirty[cluster_name] = expected_finish_at.timestamp() if expected_finish_at else None
+            self._cond.notify()
+
+    def load(self):
+        """파일에 남은 예약 {cluster_name: datetime}"""
+        rows = self._conn.execute(
+            "SELECT cluster_name, expected_finish_at FROM node_reservation WHERE expected_finish_at IS NOT NULL"
+        ).fetchall()
+        return {name: datetime.fromtimestamp(finish_at) for name, finish_at in rows}
+
+    def restore(self, nodes):
+        """
+        재시작 직후(실행기 스레드 시작 전)에 호출한다. task_info의 실행 중 작업과 파일에 남은 예약 중
+        더 늦게 끝나는 쪽을 각 클러스터의 예약 상태로 쓴다.
+        :return: 예약 상태가 복구된 클러스터 수
+        """
+        try:
+            running = running_finish_times(db.fetch_all(_RUNNING_TASKS_QUERY, label="restore_reservations"))
+        except mysql.connector.Error as err:
+            logging.warning(f"⚠ 실행 중 작업 조회 실패 - 저장된 예약 상태만 사용합니다: {err}")
+            running = {}
+        saved = self.load()
+
+        now = datetime.now()
+        restored = 0
+        for name, node_obj in nodes.items():
+            finishes = [at for at in (running.get(name), saved.get(name)) if at is not None and at > now]
+            if finishes:
+                node_obj.restore(max(finishes))
+                restored += 1
+        logging.info(f"클러스터 예약 상태 복구: {restored}/{len(nodes)}개 "
+                     f"(실행 중 작업 {len(running)}개 클러스터, 저장된 예약 {len(saved)}개)")
+        return restored
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty)
+            time.sleep(self.flush_ms / 1000)    # 짧은 시간 동안 들어온 예약은 한 번에 기록
+            with self._cond:
+                dirty, self._dirty = self._dirty, {}
+            now = datetime.now().timestamp()
+            try:
+                with self._conn:
+                    self._conn.executemany("""
+                        INSERT INTO node_reservation (cluster_name, expected_finish_at, updated_at) VALUES (?, ?, ?)
+                        ON CONFLICT(cluster_name) DO UPDATE
+                           SET expected_finish_at = excluded.expected_finish_at, updated_at = excluded.updated_at
+                    """, [(name, finish_at, now) for name, finish_at in dirty.items()])
+            except sqlite3.Error as e:
+                logging.error(f"❌ 예약 상태 기록 중 오류: {e}")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="reservation-store")
+        self._thread.start()
@@ -0,0 +1,87 @@
+################################################
+# 실행기(Serving Loop)의 클러스터 점수 계산 커널입니다.
+# 클러스터별 사용률 / 남은 시간 / 탄소 배출량을 배열로 받아 모든 클러스터의 점수를 한 번에 계산합니다.
+# 마지막 축이 클러스터 축이며, 앞쪽 축을 작업 축으로 두면 작업 배치 전체도 같은 함수로 계산됩니다.
+################################################
+
+import numpy as np
+
+
+# 정규화 기준값
+ACTIVE_NODE_MIN, ACTIVE_NODE_MAX = 1.0, 3.0
+PENALTY_MIN, PENALTY_MAX = 1.0, 246.15
+WORKSPAN_MIN, WORKSPAN_MAX = 1.0, 486.43
+# 배출량(집약도 x 시간) 기준. 예전 값(0.4, 3524.4)은 작업 시간(초)을 분으로 넣어 60배 커진 값 기준이었으므로
+# 같은 정규화 결과가 나오도록 60으로 나눈 값을 쓴다.
+CARBON_MIN, CARBON_MAX = 0.4 / 60, 3524.4 / 60
+
+USAGE_LIMIT_PCT = 60        # 이 사용률을 넘는 클러스터에는 배치하지 않는다.
+ACTIVE_USAGE_PCT = 8.5      # 이 사용률 이상이면 동작 중인 클러스터로 본다.
+ASSIGNED_USAGE_PCT = 50     # 작업을 배치했다고 가정할 때의 사용률
+
+
+def normalize(x, min_val, max_val):
+    return (x - min_val) / (max_val - min_val + 1e-9)  # 안정성 확보용 epsilon
+
+
+def score_clusters(usage, remaining, carbon, estimated_time, weights, usage_limit=USAGE_LIMIT_PCT):
+    """
+    모든 클러스터의 점수를 한 번에 계산한다.
+
+    :param usage: 클러스터별 CPU 사용률(%) (..., C) - 알 수 없으면 NaN
+    :param remaining: 클러스터별 남은 작업 시간(초) (..., C)
+    :param carbon: 클러스터별 예상 탄소 배출량 (..., C) - 알 수 없으면 NaN
+                   (탄소 데이터가 없는 클러스터가 배출량 0으로 뽑히지 않도록 pessimistic_carbon()으로 채운다)
+    :param estimated_time: 작업 예상 시간(초) - 스칼라 또는 (..., 1)
+    :param weights: (a_w, b_w, c_w, d_w)
+    :return: dict
+        score: 점수 (..., C) - 배치 불가 클러스터는 inf
+        valid: 배치 가능 여부 마스크 (..., C)
+        work_nodes, penalty, workspan, carbon: 정규화된 항목별 값 (..., C)
+    """
+    a_w, b_w, c_w, d_w = weights
+    usage = np.asarray(usage, dtype=float)
+    known = ~np.isnan(usage)
+    usage0 = np.where(known, usage, 0.0)
+
+    # 이 클러스터에 배치했을 때의 동작 클러스터 수: 전체 동작 수에서 자기 몫만 바꿔 끼운다. (O(C))
+    active = usage0 >= ACTIVE_USAGE_PCT
+    work_nodes = active.sum(axis=-1, keepdims=True) - active + int(ASSIGNED_USAGE_PCT >= ACTIVE_USAGE_PCT)
+
+    norm_work_nodes = normalize(work_nodes, ACTIVE_NODE_MIN, ACTIVE_NODE_MAX)
+    norm_penalty = normalize(10 ** (4 * (usage0 / 100)), PENALTY_MIN, PENALTY_MAX)
+    norm_workspan = normalize(np.asarray(remaining, dtype=float) + estimated_time, WORKSPAN_MIN, WORKSPAN_MAX)
+    norm_carbon = normalize(pessimistic_carbon(carbon), CARBON_MIN, CARBON_MAX)
+
+    score = a_w * norm_work_nodes + b_w * norm_penalty + c_w * norm_workspan + d_w * norm_carbon
+    valid = known & (usage0 <= usage_limit)
+
+    return {
+        "score": np.where(valid, score, np.inf),
+        "valid": valid,
+        "work_nodes": norm_work_nodes,
+        "penalty": norm_penalty,
+        "workspan": norm_workspan,
+        "carbon": norm_carbon,
+    }
+
+
+def pessimistic_carbon(carbon):
+    """
+    NaN(탄소를 알 수 없는 클러스터)을 같은 행에서 알려진 최대 배출량(CARBON_MAX 이상)보다
+    정규화 범위 한 칸(CARBON_MAX - CARBON_MIN)만큼 나쁜 값으로 채운다.
+    알려진 어떤 클러스터보다 탄소 항이 나쁘며, 모두 모르면 모두 같은 값이라 탄소 항이 순위에 영향 없다.
+    """
+    carbon = np.asarray(carbon, dtype=float)
+    unknown = np.isnan(carbon)
+    if not unknown.any():
+        return carbon
+    worst = np.max(np.where(unknown, -np.inf, carbon), axis=-1, keepdims=True)
+    return np.where(unknown, np.maximum(worst, CARBON_MAX) + (CARBON_MAX - CARBON_MIN), carbon)
+
+
+def best_cluster(score):
+    """가장 낮은 점수의 클러스터 인덱스 (..., ). 배치 가능한 클러스터가 없으면 -1."""
+    score = np.asarray(score)
+    idx = np.argmin(score, axis=-1)
+    return np.where(np.isfinite(np.min(score, axis=-1)), idx, -1)
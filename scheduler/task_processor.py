@@ -4,62 +4,45 @@
 
 
 # Import
-from resource_collector.new_collector import get_resource_usage
-from carbon_collector.carbon_fetch_model import get_carbon_info
+from cluster_probe import probe_clusters, emission_matrix
+from cluster_state import ClusterStateService
+from weights_store import WeightsStore
+from decision_log import DecisionLogWriter
+from time_shift import TimeShiftPlanner
+from reservation_store import ReservationStore
+from profiling import span, traced
+from scoring import score_clusters, best_cluster, USAGE_LIMIT_PCT
+from common import db
+import metrics
+import numpy as np
 import json
 import mysql.connector
 import random
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import csv
+from dataclasses import dataclass
 import math
 import sys
 import os
 import time
+import threading
 import logging
 
 
-# DB Configuration
-db_config = {
-    "host": os.getenv("MYSQL_HOST"),
-    "port": int(os.getenv("MYSQL_PORT")),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": "carbonetes"
-}
-
-# 정규화 기준값
-ACTIVE_NODE_MIN, ACTIVE_NODE_MAX = 1.0, 3.0
-PENALTY_MIN, PENALTY_MAX = 1.0, 246.15
-WORKSPAN_MIN, WORKSPAN_MAX = 1.0, 486.43
-CARBON_MIN, CARBON_MAX = 0.4, 3524.4
-
-
-def normalize(x, min_val, max_val):
-    return (x - min_val) / (max_val - min_val + 1e-9)  # 안정성 확보용 epsilon
-
-
 def update_task_carbon_intensity(task_name, carbon_value):
-    """task_info 테이블의 carbon_intensity 필드를 업데이트"""
-    conn = None
-    cursor = None
+    """task_info 테이블의 carbon_intensity 필드를 업데이트 (탄소를 알 수 없으면(NaN) NULL)"""
+    if carbon_value is not None and math.isnan(carbon_value):
+        carbon_value = None
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
         query = """
             UPDATE task_info
                SET carbon_intensity = %s
              WHERE task_name = %s
         """
-        cursor.execute(query, (carbon_value, task_name))
-        conn.commit()
+        with metrics.stage_duration.labels('db_update').time():
+            db.execute(query, (carbon_value, task_name), retry=True)
     except mysql.connector.Error as err:
         logging.error(f"❌ 탄소 집약도 업데이트 중 오류 발생: {err}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
 
@@ -70,91 +53,202 @@ load_dotenv()
 # kluster_name = ["k3s-1", "k3s-2", "new-k3s-1"]
 # endpoint = []
 
-csv_file = "task_log.csv"
-if not os.path.exists(csv_file):
-    with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            "timestamp", "task_name", "node", "resource_usage_avg",
-            "active_node_count", "penalty", "workspan",
-            "carbon_emission", "score"
-        ])
-
-
-def load_weights():
-    conn = None
-    cursor = None
-    weights = []
-    try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)  # 결과를 딕셔너리 형태로 반환
-        query = "SELECT a_w, b_w, c_w, d_w FROM weights"
-        cursor.execute(query)
-        weights = cursor.fetchall()
-    except mysql.connector.Error as err:
-        # logging.error(f"데이터베이스에서 클러스터 정보를 가져오는 중 오류 발생: {err}")
-        print(err)
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-    weight = weights[0]
-    return (weight['a_w'], weight['b_w'], weight['c_w'], weight['d_w'])
+# 결정 로그: DECISION_LOG_FORMAT=parquet이면 열 단위 파일로 기록 (pyarrow 필요)
+DECISION_LOG_FORMAT = os.getenv("DECISION_LOG_FORMAT", "csv")
+csv_file = "task_log.parquet" if DECISION_LOG_FORMAT == "parquet" else "task_log.csv"
+task_log = DecisionLogWriter(csv_file, fmt=DECISION_LOG_FORMAT, columns=[
+    ("timestamp", "str"), ("task_name", "str"), ("node", "str"), ("resource_usage_avg", "float"),
+    ("active_node_count", "float"), ("penalty", "float"), ("workspan", "float"),
+    ("carbon_emission", "float"), ("score", "float")
+])
+
+
+@dataclass(frozen=True)
+class Reservation:
+    version: int                # 읽은 시점의 예약 버전 (try_reserve 비교용)
+    remaining_time: float       # 남은 작업 시간(초)
+    pending_cpu: float          # 아직 상태 스냅샷에 반영되지 않은 예약 사용률(%p)
 
 
 class Node:
-    def __init__(self, cluster_name, cluster_ip, region):
+    """
+    클러스터 하나의 예약 상태.
+    여러 실행기 스레드가 동시에 배치하므로, 예약은 읽은 버전이 그대로일 때만 반영된다(compare-and-swap).
+    버전이 바뀌었으면 다른 스레드가 먼저 예약한 것이므로 최신 예약 상태로 다시 점수를 계산해야 한다.
+    """
+
+    def __init__(self, cluster_name, cluster_ip, region, store=None):
         self.cluster_name = cluster_name
         self.cluster_ip = cluster_ip
         self.region = region
         self.expected_finish_at = None
+        self.version = 0
+        self.store = store      # 예약이 바뀔 때마다 기록할 ReservationStore (없으면 메모리에만)
+        self._pending = []      # [(예약 시각, 사용률 증가분)]
+        self._lock = threading.Lock()
 
     def get_remaining_time(self):
-        if self.expected_finish_at is None:
+        expected_finish_at = self.expected_finish_at
+        if expected_finish_at is None:
             return 0
-        remaining = (self.expected_finish_at - datetime.now()).total_seconds()
+        remaining = (expected_finish_at - datetime.now()).total_seconds()
         return max(0, remaining)
 
-    def assign_task(self, task_duration):
-        now = datetime.now()
-        remaining = self.get_remaining_time()
-        self.expected_finish_at = now + \
-            timedelta(seconds=remaining + task_duration)
-        print(f"✅ {self.cluster_name} - 종료 예정: {self.expected_finish_at}")
+    def reservation(self, since=None) -> Reservation:
+        """
+        현재 예약 상태를 한 번에 읽는다.
+        :param since: 상태 스냅샷의 수집 시각 - 이후에 들어온 예약만 사용률 증가분으로 더한다.
+        """
+        with self._lock:
+            if since is not None:
+                self._pending = [(at, pct) for at, pct in self._pending if at > since]
+            pending_cpu = sum(pct for _, pct in self._pending)
+            return Reservation(self.version, self.get_remaining_time(), pending_cpu)
+
+    def try_reserve(self, expected_version, task_duration, cpu_pct=0.0) -> bool:
+        """예약 버전이 expected_version일 때만 작업을 예약한다. 성공하면 True."""
+        with self._lock:
+            if self.version != expected_version:
+                return False
+            now = datetime.now()
+            remaining = self.get_remaining_time()
+            self.expected_finish_at = now + \
+                timedelta(seconds=remaining + task_duration)
+            self._pending.append((time.time(), cpu_pct))
+            self.version += 1
+            if self.store is not None:
+                self.store.record(self.cluster_name, self.expected_finish_at)
+        logging.info(f"✅ {self.cluster_name} - 종료 예정: {self.expected_finish_at}")
+        return True
+
+    def release(self, task_duration, cpu_pct=0.0):
+        """try_reserve / assign_task로 잡았지만 전달하지 못한 예약을 되돌린다."""
+        with self._lock:
+            if self.expected_finish_at is not None:
+                self.expected_finish_at -= timedelta(seconds=task_duration)
+                if self.expected_finish_at <= datetime.now():
+                    self.expected_finish_at = None
+            for i in range(len(self._pending) - 1, -1, -1):
+                if self._pending[i][1] == cpu_pct:
+                    del self._pending[i]
+                    break
+            self.version += 1
+            if self.store is not None:
+                self.store.record(self.cluster_name, self.expected_finish_at)
+        logging.info(f"{self.cluster_name} - 전달하지 못한 예약 해제 ({task_duration}초)")
+
+    def assign_task(self, task_duration, cpu_pct=0.0):
+        """버전과 상관없이 예약한다."""
+        while not self.try_reserve(self.version, task_duration, cpu_pct):
+            pass
+
+    def restore(self, expected_finish_at):
+        """재시작 시 복구한 예상 종료 시각을 반영한다. (이미 더 늦게 끝나는 예약이 있으면 그대로 둔다)"""
+        with self._lock:
+            if self.expected_finish_at is None or expected_finish_at > self.expected_finish_at:
+                self.expected_finish_at = expected_finish_at
+                self.version += 1
 
 
 def get_cluster_info_from_db():
-    conn = None
-    cursor = None
     clusters_data = []
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)  # 결과를 딕셔너리 형태로 반환
         query = "SELECT cluster_name, cluster_ip, region FROM cluster"
-        cursor.execute(query)
-        clusters_data = cursor.fetchall()
+        clusters_data = db.fetch_all(query)
     except mysql.connector.Error as err:
         logging.error(f"데이터베이스에서 클러스터 정보를 가져오는 중 오류 발생: {err}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
     return clusters_data
 
 
+# 클러스터별 예약 상태는 파일에 기록해 두고 재시작 시 restore_reservations()로 되살린다.
+reservation_store = ReservationStore()
+
 clusters_from_db = get_cluster_info_from_db()
 nodes = {c['cluster_name']: Node(
-    c['cluster_name'], c['cluster_ip'], c['region']) for c in clusters_from_db}
+    c['cluster_name'], c['cluster_ip'], c['region'], reservation_store) for c in clusters_from_db}
+
+# 클러스터 리소스 상태 수집기 / 가중치 캐시 (main_scheduler에서 start)
+cluster_state = ClusterStateService(nodes)
+weights_cache = WeightsStore()
+# 시작 기한이 있는 작업의 (클러스터, 시작 슬롯) 탐색기
+time_shift = TimeShiftPlanner(nodes)
 
 # a_w, b_w, c_w, d_w = 1, 1, 1, 1
 
 
 
 
+def write_score_log(task_name, node_names, usage, result):
+    """score_clusters() 결과를 클러스터별 한 줄씩 결정 로그에 넣는다. (파일 기록은 백그라운드에서)"""
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    rows = []
+    for idx, node_name in enumerate(node_names):
+        if np.isnan(usage[idx]):
+            rows.append([timestamp, task_name, node_name, "-", "-", "-", "-", "-", "미배치 (프로브 실패)"])
+        elif usage[idx] > USAGE_LIMIT_PCT:
+            rows.append([timestamp, task_name, node_name, round(usage[idx], 2),
+                         "-", "-", "-", "-", "미배치 (리소스 초과)"])
+        else:
+            rows.append([
+                timestamp,
+                task_name,
+                node_name,
+                round(usage[idx], 2),
+                round(result["work_nodes"][idx], 4),
+                round(result["penalty"][idx], 4),
+                round(result["workspan"][idx], 4),
+                round(result["carbon"][idx], 6),
+                round(result["score"][idx], 4)
+            ])
+    task_log.write_many(rows)
+
+
+# 배치된 클러스터의 사용률 증가 가정치(%p) - 다음 상태 스냅샷이 수집될 때까지 점수 계산에 더한다.
+PROJECTED_CPU_INCREMENT_PCT = float(os.getenv("PROJECTED_CPU_INCREMENT_PCT", 20))
+
+
+def reserve_best_node(task_name, estimated_time, processed_nodes_data, snapshot, weights, carbon=None):
+    """
+    최신 예약 상태로 점수를 계산하고 가장 좋은 클러스터를 예약한다.
+    점수 계산 중에 다른 스레드가 같은 클러스터를 먼저 예약했으면 예약 상태를 다시 읽어 재계산한다.
+
+    :param carbon: 클러스터별 배출량 배열 (없으면 processed_nodes_data의 carbon 사용)
+    :return: 예약한 클러스터의 인덱스, 배치 가능한 클러스터가 없으면 -1
+    """
+    node_objs = [d["node_obj"] for d in processed_nodes_data]
+    node_names = [node_obj.cluster_name for node_obj in node_objs]
+    base_usage = np.array([np.nan if d["usage"] is None else d["usage"] for d in processed_nodes_data], dtype=float)
+    if carbon is None:
+        carbon = np.array([d["carbon"] for d in processed_nodes_data], dtype=float)
+    scraped_at = [snapshot.clusters[name].scraped_at if name in snapshot.clusters else None for name in node_names]
+
+    while True:
+        reservations = [node_obj.reservation(since) for node_obj, since in zip(node_objs, scraped_at)]
+        usage = np.minimum(100.0, base_usage + np.array([r.pending_cpu for r in reservations]))
+        remaining = np.array([r.remaining_time for r in reservations], dtype=float)
+
+        with metrics.stage_duration.labels('scoring').time(), span("scoring"):
+            result = score_clusters(usage, remaining, carbon, estimated_time, weights)
+        best_idx = int(best_cluster(result["score"]))
+        if best_idx < 0:
+            with span("score_log"):
+                write_score_log(task_name, node_names, usage, result)
+            return -1
+
+        with span("try_reserve"):
+            reserved = node_objs[best_idx].try_reserve(reservations[best_idx].version, estimated_time,
+                                                       PROJECTED_CPU_INCREMENT_PCT)
+        if reserved:
+            # 예약 충돌로 다시 계산한 점수는 남기지 않고, 실제로 결정한 점수만 한 번 기록한다.
+            with span("score_log"):
+                write_score_log(task_name, node_names, usage, result)
+            return best_idx
+        metrics.reservation_conflicts.inc()
+        logging.info(f"{node_names[best_idx]} 예약 충돌 - 최신 예약 상태로 다시 계산")
+
+
 def process_task(task_name, estimated_time):
-    (a_w, b_w, c_w, d_w) = load_weights()
+    (a_w, b_w, c_w, d_w) = weights_cache.current()
     logging.info(f"처리 시작 - 작업 이름: {task_name}, 예상 시간: {estimated_time}초, {a_w}, {b_w}, {c_w}, {d_w}")
 
     if not nodes:
@@ -163,115 +257,140 @@ def process_task(task_name, estimated_time):
         return None
 
     try:
-        while True:
-            result_score = []
-            processed_nodes_data = []
-
-            for node_name, node_obj in nodes.items():
-                endpoint = node_obj.cluster_ip
-                cpu, ram = get_resource_usage(f'{endpoint}:9100')
-                retry = 0
-                while (cpu < 0 or ram < 0) and retry < 3:
-                    cpu, ram = get_resource_usage(f'{endpoint}:9100')
-                    retry += 1
-                usage = cpu
-                carbon_info = get_carbon_info(
-                    estimated_time, country_code=node_obj.region)
-                carbon_emission = carbon_info.get("integratedEmission", 0)
-                remaining = node_obj.get_remaining_time()
-
-                processed_nodes_data.append({
-                    "node_obj": node_obj,
-                    "usage": usage,
-                    "carbon": carbon_emission,
-                    "remaining_time": remaining
-                })
-
-            for idx, data in enumerate(processed_nodes_data):
-                node_obj = data["node_obj"]
-                usage = data["usage"]
-                carbon = data["carbon"]
-                remaining = data["remaining_time"]
-
-                if usage > 60:
-                    with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        writer.writerow([
-                            time.strftime(
-                                "%Y-%m-%d %H:%M:%S"), task_name, node_obj.cluster_name,
-                            round(usage, 2), "-", "-", "-", "-", "미배치 (리소스 초과)"
-                        ])
-                    result_score.append(999999)
-                    continue
-
-                # 가상 시나리오로 클러스터 분산도 계산
-                temp_usage = [d["usage"] for d in processed_nodes_data]
-                temp_usage[idx] = 50  # 이 노드에 작업 할당 시 사용률 가정
-                count = sum(1 for u in temp_usage if u >= 8.5)
-
-                # 원래 값들
-                raw_work_nodes = count
-                raw_penalty = 10 ** (4 * (usage / 100))
-                raw_workspan = remaining + estimated_time
-                raw_carbon = carbon
-
-                # 정규화된 값들
-                norm_work_nodes = normalize(
-                    raw_work_nodes, ACTIVE_NODE_MIN, ACTIVE_NODE_MAX)
-                norm_penalty = normalize(raw_penalty, PENALTY_MIN, PENALTY_MAX)
-                norm_workspan = normalize(
-                    raw_workspan, WORKSPAN_MIN, WORKSPAN_MAX)
-                norm_carbon = normalize(raw_carbon, CARBON_MIN, CARBON_MAX)
-
-                # 정규화된 값으로 점수 계산
-                score = (
-                    a_w * norm_work_nodes +
-                    b_w * norm_penalty +
-                    c_w * norm_workspan +
-                    d_w * norm_carbon
-                )
-                result_score.append(score)
-
-                with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow([
-                        time.strftime("%Y-%m-%d %H:%M:%S"),
-                        task_name,
-                        node_obj.cluster_name,
-                        round(usage, 2),
-                        round(norm_work_nodes, 4),
-                        round(norm_penalty, 4),
-                        round(norm_workspan, 4),
-                        round(norm_carbon, 6),
-                        round(score, 4)
-                    ])
-
-            logging.info(f"스코어 목록: {result_score}")
-            result_idx = min(range(len(result_score)),
-                             key=lambda i: result_score[i])
+        # 리소스는 메모리 스냅샷에서, 탄소는 동시 프로빙으로 (시간 초과 클러스터는 마지막 값 사용)
+        snapshot = cluster_state.snapshot()
+        processed_nodes_data = probe_clusters(nodes, estimated_time, snapshot)
+        result_idx = reserve_best_node(task_name, estimated_time, processed_nodes_data, snapshot, (a_w, b_w, c_w, d_w))
 
+        if result_idx >= 0:
             best_node_obj = processed_nodes_data[result_idx]["node_obj"]
-            best_node_name = best_node_obj.cluster_name
-
-            valid_score = {processed_nodes_data[i]["node_obj"].cluster_name: s for i, s in enumerate(
-                result_score) if s != 999999}
-
-            if valid_score:
-                if best_node_name in valid_score:
-                    nodes[best_node_name].assign_task(estimated_time)
-                    selected_carbon = processed_nodes_data[result_idx]["carbon"]
-                    update_task_carbon_intensity(task_name, selected_carbon)
-                    return best_node_name
-                else:
-                    fallback_node_name = min(valid_score, key=valid_score.get)
-                    nodes[fallback_node_name].assign_task(estimated_time)
-                    selected_carbon = processed_nodes_data[list(valid_score.keys()).index(fallback_node_name)]["carbon"]
-                    update_task_carbon_intensity(task_name, selected_carbon)
-                    logging.warning(f"⚠ 대체 노드 사용: {fallback_node_name}")
-                    return fallback_node_name
-            else:
-                logging.warning("⚠ 모든 노드가 미배치 상태입니다. 5초 후 재시도")
-                time.sleep(5)
+            update_task_carbon_intensity(task_name, processed_nodes_data[result_idx]["carbon"])
+            return best_node_obj.cluster_name
+        # 모든 노드가 미배치 상태 - 호출한 쪽에서 보류(deferred_placement) 처리
+        return None
 
     except Exception as e:
-        logging.error(f"❌ 작업 처리 중 오류: {e}")
\ No newline at end of file
+        logging.error(f"❌ 작업 처리 중 오류: {e}")
+
+
+def has_headroom(snapshot):
+    """스냅샷 기준으로 (아직 반영되지 않은 예약까지 더해도) 사용률 제한 아래인 클러스터가 있는지"""
+    for name, node_obj in nodes.items():
+        state = snapshot.clusters.get(name)
+        if state is None or state.cpu is None:
+            continue
+        if state.cpu + node_obj.reservation(state.scraped_at).pending_cpu <= USAGE_LIMIT_PCT:
+            return True
+    return False
+
+
+@metrics.decision_latency.labels('batch').time()
+@traced("process_batch")
+def process_batch(tasks):
+    """
+    여러 작업을 한 번의 클러스터 스냅샷 / 탄소 조회로 배치한다. (greedy)
+    작업을 도착 순서대로 하나씩 예약하므로, 선택된 클러스터의 예상 사용률과 남은 시간이
+    다음 작업의 점수 계산에 반영된다.
+
+    :param tasks: [{"task_name": .., "estimated_time": ..}, ...]
+    :return: [(task, cluster_name 또는 None), ...] - None은 이번 배치에서 자리가 없던 작업
+    """
+    if not nodes:
+        logging.error("초기화된 클러스터 노드가 없습니다.")
+        return [(task, None) for task in tasks]
+
+    weights = weights_cache.current()
+    snapshot = cluster_state.snapshot()
+    with span("probe"):
+        processed_nodes_data = probe_clusters(nodes, 0, snapshot)
+
+    # 작업 x 클러스터 배출량 행렬은 한 번에 계산 (탄소를 알 수 없는 클러스터는 NaN - score_clusters가 가장 나쁜 값으로 봄)
+    with span("carbon_matrix"):
+        carbon = emission_matrix(processed_nodes_data, time.time(),
+                                 [task.get('estimated_time', 0) for task in tasks])
+
+    placements = []
+    carbon_updates = []
+    try:
+        for t, task in enumerate(tasks):
+            task_name = task.get('task_name')
+
+            # 앞선 작업(다른 실행기 스레드 포함)의 예약을 반영한 예상 사용률 / 남은 시간으로 점수 계산
+            with span("reserve"):
+                best_idx = reserve_best_node(task_name, task.get('estimated_time', 0), processed_nodes_data,
+                                             snapshot, weights, carbon=carbon[t])
+            if best_idx < 0:
+                placements.append((task, None))
+                continue
+
+            carbon_value = float(carbon[t, best_idx])
+            carbon_updates.append((None if math.isnan(carbon_value) else carbon_value, task_name))
+            placements.append((task, processed_nodes_data[best_idx]["node_obj"].cluster_name))
+    except Exception:
+        # 배치 결과를 돌려주지 못하므로 이미 잡은 예약은 되돌린다.
+        release_reserved([(task, cluster) for task, cluster in placements if cluster is not None])
+        raise
+
+    if carbon_updates:
+        try:
+            with metrics.stage_duration.labels('db_update').time(), span("db_update"):
+                db.execute_many("""
+                    UPDATE task_info
+                       SET carbon_intensity = %s
+                     WHERE task_name = %s
+                """, carbon_updates, retry=True)
+        except mysql.connector.Error as err:
+            logging.error(f"❌ 탄소 집약도 일괄 업데이트 중 오류 발생: {err}")
+
+    logging.info(f"배치 처리 완료 - {len(tasks)}개 중 {len(carbon_updates)}개 배치")
+    return placements
+
+
+@metrics.decision_latency.labels('time_shift').time()
+@traced("process_time_shifted")
+def process_time_shifted(task):
+    """
+    시작 기한(start_deadline)이 있는 작업을 탄소 예보에 맞춰 (클러스터, 시작 시각)에 배치한다.
+    시작 시각이 지금이면 바로 예약하고, 미래이면 start_reserved()로 그 시각에 예약한다.
+    :return: (cluster_name, start_at) 또는 기한 안에 자리가 없으면 None
+    """
+    task_name = task.get('task_name')
+    snapshot = cluster_state.snapshot()
+    base_usage = []
+    for name, node_obj in nodes.items():
+        state = snapshot.clusters.get(name)
+        if state is None or state.cpu is None:
+            base_usage.append(np.nan)
+        else:
+            base_usage.append(min(100.0, state.cpu + node_obj.reservation(state.scraped_at).pending_cpu))
+
+    with span("plan"):
+        plan = time_shift.plan(task, base_usage, weights_cache.current(), PROJECTED_CPU_INCREMENT_PCT)
+    if plan is None:
+        return None
+    node_obj, start_at, carbon = plan
+    update_task_carbon_intensity(task_name, carbon)
+    if start_at <= time.time():
+        start_reserved(task, node_obj.cluster_name)
+    logging.info(f"시간 이동 배치 - {task_name} -> {node_obj.cluster_name}, 시작: {datetime.fromtimestamp(start_at)}")
+    return node_obj.cluster_name, start_at
+
+
+def restore_reservations():
+    """재시작 직후 실행 중 작업 / 저장된 예약으로 클러스터 예약 상태를 되살리고 기록을 시작한다."""
+    reservation_store.restore(nodes)
+    reservation_store.start()
+
+
+def start_reserved(task, cluster_name):
+    """시간 이동으로 정해진 작업이 시작될 때 클러스터 예약 상태에 반영한다."""
+    nodes[cluster_name].assign_task(task.get('estimated_time', 0), PROJECTED_CPU_INCREMENT_PCT)
+
+
+def release_reserved(placements):
+    """예약까지 했지만 Dispatcher로 넘기지 못한 배치를 되돌린다. placements: [(task, cluster), ...]"""
+    for task, cluster_name in placements:
+        try:
+            nodes[cluster_name].release(task.get('estimated_time', 0), PROJECTED_CPU_INCREMENT_PCT)
+        except Exception as e:
+            logging.error(f"❌ 예약 해제 중 오류 ({cluster_name}): {e}")
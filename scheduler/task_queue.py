@@ -0,0 +1,180 @@
+################################################
+# 스케줄러 작업 큐 (디스크 보존).
+# /schedule로 받은 작업을 SQLite(WAL) 파일에 기록해 두고, Dispatcher 전달이 끝난 작업만 지웁니다.
+# 재시작하면 지워지지 않은 작업(대기 중 + 처리 중이던 작업)을 다시 큐에 넣습니다.
+#
+# 모든 쓰기는 기록 스레드 하나가 모아서 한 트랜잭션으로 커밋하므로(group commit),
+# 요청마다 fsync 하지 않고도 put()이 반환될 때는 디스크에 기록되어 있습니다.
+################################################
+
+from collections import deque
+from queue import Empty
+import metrics
+import threading
+import sqlite3
+import logging
+import json
+import time
+import os
+
+
+TASK_QUEUE_PATH = os.getenv("TASK_QUEUE_PATH", "task_queue.db")
+TASK_QUEUE_FLUSH_MS = float(os.getenv("TASK_QUEUE_FLUSH_MS", 5))         # 커밋을 모으는 최대 대기 시간
+TASK_QUEUE_MAX_BATCH = int(os.getenv("TASK_QUEUE_MAX_BATCH", 1000))      # 한 번에 커밋하는 최대 쓰기 수
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS task_queue (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        task        TEXT NOT NULL,
+        enqueued_at REAL NOT NULL
+    )
+"""
+
+
+class _Write:
+    """기록 스레드에 넘기는 쓰기 요청. done은 커밋이 끝나면 set 된다."""
+    __slots__ = ("kind", "payload", "done", "result", "error")
+
+    def __init__(self, kind, payload):
+        self.kind = kind            # "insert" | "delete"
+        self.payload = payload
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class DurableQueue:
+    """
+    queue.Queue와 같은 put / get / task_done / qsize 인터페이스를 제공한다.
+    get()으로 꺼낸 작업은 ack()를 호출해야 디스크에서 지워진다.
+    꺼낸 작업 dict에는 큐 내부 id가 "queue_id", 큐에 들어온 시각이 "enqueued_at" 키로 들어 있다.
+    """
+
+    def __init__(self, path=TASK_QUEUE_PATH, flush_ms=TASK_QUEUE_FLUSH_MS, max_batch=TASK_QUEUE_MAX_BATCH):
+        self.path = path
+        self.flush_sec = flush_ms / 1000
+        self.max_batch = max_batch
+        self._ready = deque()                   # 꺼내갈 수 있는 작업
+        self._inflight = {}                     # queue_id -> 꺼내갔지만 아직 ack되지 않은 작업
+        self._not_empty = threading.Condition()
+        self._writes = deque()
+        self._has_writes = threading.Condition()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")   # 커밋마다 fsync - 커밋은 기록 스레드가 모아서 한다.
+        self._conn.execute(_SCHEMA)
+        self._replay()
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="task-queue-writer")
+        self._writer.start()
+
+    # --- 재시작 복구 ---
+    def _replay(self):
+        rows = self._conn.execute("SELECT id, task, enqueued_at FROM task_queue ORDER BY id").fetchall()
+        for queue_id, task, enqueued_at in rows:
+            self._ready.append(dict(json.loads(task), queue_id=queue_id, enqueued_at=enqueued_at))
+        if rows:
+            logging.info(f"작업 큐 복구: 처리되지 않은 작업 {len(rows)}개 다시 등록")
+
+    # --- 쓰기 ---
+    def _submit(self, kind, payload, wait=True):
+        write = _Write(kind, payload)
+        with self._has_writes:
+            self._writes.append(write)
+            self._has_writes.notify()
+        if wait:
+            write.done.wait()
+            if write.error is not None:
+                raise write.error
+        return write
+
+    def _write_loop(self):
+        while True:
+            with self._has_writes:
+                self._has_writes.wait_for(lambda: self._writes)
+            # 잠깐 더 모아서 한 번에 커밋
+            time.sleep(self.flush_sec)
+            with self._has_writes:
+                batch = [self._writes.popleft() for _ in range(min(len(self._writes), self.max_batch))]
+            self._commit(batch)
+
+    def _commit(self, batch):
+        now = time.time()
+        try:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            for write in batch:
+                if write.kind == "insert":
+                    ids = []
+                    for task in write.payload:
+                        cursor.execute("INSERT INTO task_queue (task, enqueued_at) VALUES (?, ?)",
+                                       (json.dumps(task, ensure_ascii=False), now))
+                        ids.append(cursor.lastrowid)
+                    write.result = ids
+                else:
+                    cursor.executemany("DELETE FROM task_queue WHERE id = ?", [(i,) for i in write.payload])
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            logging.error(f"❌ 작업 큐 기록 실패: {e}")
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            for write in batch:
+                write.error = e
+                write.done.set()
+            return
+        for write in batch:
+            write.done.set()
+
+    # --- queue.Queue 인터페이스 ---
+    def put(self, task):
+        self.put_many([task])
+
+    def put_many(self, tasks):
+        """여러 작업을 한 트랜잭션으로 기록한 뒤 큐에 넣는다. (전부 들어가거나 전부 실패)"""
+        tasks = [dict(task) for task in tasks]
+        if not tasks:
+            return []
+        ids = self._submit("insert", tasks).result
+        now = time.time()
+        with self._not_empty:
+            for queue_id, task in zip(ids, tasks):
+                self._ready.append(dict(task, queue_id=queue_id, enqueued_at=now))
+            self._not_empty.notify(len(tasks))
+        return ids
+
+    def get(self, block=True, timeout=None):
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._ready, timeout=timeout if block else 0):
+                raise Empty
+            task = self._ready.popleft()
+            self._inflight[task["queue_id"]] = task
+        if "enqueued_at" in task and not task.get("deferred"):
+            metrics.queue_wait.observe(time.time() - task["enqueued_at"])
+        return task
+
+    def requeue(self, tasks):
+        """꺼내갔던 작업을 디스크 기록 없이 큐 앞쪽에 다시 넣는다. (배치 보류가 풀린 작업 등)"""
+        with self._not_empty:
+            for task in reversed(tasks):
+                self._inflight.pop(task.get("queue_id"), None)
+                self._ready.appendleft(task)
+            self._not_empty.notify(len(tasks))
+
+    def ack(self, tasks):
+        """Dispatcher 전달이 끝난 작업을 디스크에서 지운다. (커밋은 기다리지 않음)"""
+        ids = [task["queue_id"] for task in tasks if "queue_id" in task]
+        with self._not_empty:
+            for queue_id in ids:
+                self._inflight.pop(queue_id, None)
+        if ids:
+            self._submit("delete", ids, wait=False)
+
+    def task_done(self):
+        """queue.Queue 호환용. 디스크에서 지우는 것은 ack()가 한다."""
+
+    def qsize(self):
+        return len(self._ready)
+
+    def inflight_size(self):
+        return len(self._inflight)
@@ -0,0 +1,100 @@
+################################################
+# 탄소 데이터가 없는 region 처리 검증 (pytest)
+# 타임라인 조회에 실패한 클러스터가 배출량 0으로 계산되어 배치를 가져가지 않는지 확인합니다.
+# (작업 하나: probe_clusters / 배치: emission_matrix + score_clusters)
+################################################
+
+from types import SimpleNamespace
+import time
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from carbon_collector.carbon_timeline import CarbonTimeline
+from scoring import score_clusters, best_cluster
+import cluster_probe
+
+WEIGHTS = (1.0, 1.0, 1.0, 1.0)
+
+
+class _Node:
+    def __init__(self, cluster_name, region):
+        self.cluster_name = cluster_name
+        self.region = region
+
+    def get_remaining_time(self):
+        return 0
+
+
+def _timeline(region):
+    if region == "XX":
+        raise ValueError(f"{region} 탄소 집약도 데이터가 없습니다.")
+    return CarbonTimeline.constant(region, {"KR": 400.0, "FR": 60.0}[region], time.time() - 3600)
+
+
+def _snapshot(usage):
+    now = time.time()
+    return SimpleNamespace(clusters={name: SimpleNamespace(cpu=cpu, scraped_at=now, age=lambda t: 0.0)
+                                     for name, cpu in usage.items()})
+
+
+@pytest.fixture
+def no_data_region(monkeypatch):
+    monkeypatch.setattr(cluster_probe.timeline_store, "timeline", _timeline)
+    # 이전 테스트의 마지막 값이 남지 않도록
+    monkeypatch.setattr(cluster_probe, "_last_known", {})
+    monkeypatch.setattr(cluster_probe, "_inflight", {})
+
+
+def _probe(nodes, usage, estimated_time=600):
+    return cluster_probe.probe_clusters(nodes, estimated_time, _snapshot(usage))
+
+
+def test_probe_reports_unknown_carbon_as_nan(no_data_region):
+    nodes = {"xx": _Node("xx", "XX"), "kr": _Node("kr", "KR")}
+    data = _probe(nodes, {"xx": 10.0, "kr": 30.0})
+
+    assert np.isnan(data[0]["carbon"]) and np.isnan(data[0]["carbon_intensity"])
+    assert data[1]["carbon"] > 0
+
+
+def test_single_task_does_not_prefer_region_without_data(no_data_region):
+    # 탄소 데이터가 없는 클러스터가 사용률은 더 낮다
+    nodes = {"xx": _Node("xx", "XX"), "kr": _Node("kr", "KR")}
+    data = _probe(nodes, {"xx": 10.0, "kr": 30.0})
+    usage = np.array([d["usage"] for d in data])
+    carbon = np.array([d["carbon"] for d in data])
+
+    for weights in (WEIGHTS, (0.0, 0.0, 0.0, 1.0)):
+        result = score_clusters(usage, np.zeros(2), carbon, 600, weights)
+        assert best_cluster(result["score"]) == 1
+
+
+def test_batch_does_not_prefer_region_without_data(no_data_region):
+    nodes = {"xx": _Node("xx", "XX"), "kr": _Node("kr", "KR"), "fr": _Node("fr", "FR")}
+    data = _probe(nodes, {"xx": 10.0, "kr": 30.0, "fr": 30.0}, estimated_time=0)
+    estimated_times = np.array([60, 600, 3600])
+
+    carbon = cluster_probe.emission_matrix(data, time.time(), estimated_times)
+    assert carbon.shape == (3, 3)
+    assert np.isnan(carbon[:, 0]).all() and (carbon[:, 1:] > 0).all()
+
+    usage = np.array([d["usage"] for d in data])
+    result = score_clusters(usage, np.zeros(3), carbon, estimated_times[:, None], (0.0, 0.0, 0.0, 1.0))
+    assert (best_cluster(result["score"]) == 2).all()      # 가장 깨끗한 FR
+    # 데이터가 없는 region은 알려진 어떤 region보다 탄소 항이 나쁘다
+    assert (result["carbon"][:, 0] > result["carbon"][:, 1:].max(axis=1)).all()
+
+
+def test_batch_without_any_carbon_data_still_places(no_data_region):
+    nodes = {"xx": _Node("xx", "XX"), "yy": _Node("yy", "XX")}
+    data = _probe(nodes, {"xx": 40.0, "yy": 10.0}, estimated_time=0)
+
+    carbon = cluster_probe.emission_matrix(data, time.time(), [60, 600])
+    usage = np.array([d["usage"] for d in data])
+    result = score_clusters(usage, np.zeros(2), carbon, np.array([[60], [600]]), WEIGHTS)
+    # 탄소 항은 모두 같으므로 사용률이 낮은 클러스터
+    assert (best_cluster(result["score"]) == 1).all()
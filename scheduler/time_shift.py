@@ -0,0 +1,181 @@
+################################################
+# 탄소 인지 시간 이동(Time-shifting) 배치 엔진입니다. (test_schedule.py 프로토타입 기반)
+# 시작 기한(start_deadline)이 있는 작업은 "지금 어느 클러스터"가 아니라
+# "어느 클러스터의 어느 시간 슬롯"에 시작할지를 탄소 예보에 대해 탐색합니다.
+#
+# - 시간 축은 TIME_SHIFT_SLOT_SEC 단위 슬롯, 탐색 범위는 TIME_SHIFT_HORIZON_SEC
+# - region별 탄소 타임라인(누적합)으로 모든 시작 슬롯의 구간 배출량을 한 번에 계산
+# - 클러스터 x 슬롯 예약 부하 배열의 슬라이딩 최대값으로 구간 중 최대 사용률을 한 번에 계산
+# - 점수는 실행기와 같은 scoring.score_clusters()로 (시작 슬롯 x 클러스터) 전체를 한 번에 평가
+# 선택된 슬롯이 미래이면 작업은 DelayedRelease에 보관되었다가 시작 시각에 Dispatcher로 넘어갑니다.
+################################################
+
+from carbon_collector.carbon_timeline import timeline_store
+from numpy.lib.stride_tricks import sliding_window_view
+from scoring import score_clusters
+from datetime import datetime
+import numpy as np
+import threading
+import logging
+import heapq
+import math
+import time
+import os
+
+
+TIME_SHIFT_SLOT_SEC = int(os.getenv("TIME_SHIFT_SLOT_SEC", 900))
+TIME_SHIFT_HORIZON_SEC = int(os.getenv("TIME_SHIFT_HORIZON_SEC", 24 * 3600))
+
+
+class SlotLoad:
+    """
+    클러스터 x 슬롯 예약 사용률(%p) 배열. 열 0은 절대 슬롯 번호 base에 해당하며,
+    시간이 지나면 advance()로 지난 슬롯을 버리고 새 슬롯을 0으로 채운다.
+    """
+
+    def __init__(self, n_clusters, n_slots):
+        self.base = 0
+        self.load = np.zeros((n_clusters, n_slots))
+
+    def advance(self, slot):
+        shift = slot - self.base
+        if shift <= 0:
+            return
+        n_slots = self.load.shape[1]
+        if shift >= n_slots:
+            self.load[:] = 0
+        else:
+            self.load[:, :-shift] = self.load[:, shift:]
+            self.load[:, -shift:] = 0
+        self.base = slot
+
+    def add(self, cluster_idx, start, length, pct):
+        self.load[cluster_idx, start:start + length] += pct
+
+    def window_max(self, length):
+        """모든 시작 슬롯에 대해 length 슬롯 구간의 최대 예약 사용률 (C, n_slots - length + 1)"""
+        return sliding_window_view(self.load, length, axis=1).max(axis=-1)
+
+
+class TimeShiftPlanner:
+    """
+    (클러스터, 시작 슬롯) 탐색기. 여러 실행기 스레드가 같이 쓰므로 plan()은 한 번에 하나씩 실행된다.
+    """
+
+    def __init__(self, nodes, slot_sec=TIME_SHIFT_SLOT_SEC, horizon_sec=TIME_SHIFT_HORIZON_SEC):
+        self.nodes = nodes
+        self.node_objs = list(nodes.values())
+        self.slot_sec = slot_sec
+        self.n_slots = max(1, horizon_sec // slot_sec)
+        self.slots = SlotLoad(len(self.node_objs), self.n_slots)
+        self._lock = threading.Lock()
+
+    def _emission(self, starts, estimated_time):
+        """
+        클러스터 x 시작 시각 배출량 (C, len(starts)) - region별 타임라인 누적합 차로 O(1)씩
+        탄소 예보를 가져오지 못한 region의 행은 NaN (score_clusters가 가장 나쁜 값으로 본다)
+        """
+        by_region = {}
+        rows = []
+        for node_obj in self.node_objs:
+            if node_obj.region not in by_region:
+                try:
+                    by_region[node_obj.region] = timeline_store.emission(node_obj.region, starts, estimated_time)
+                except Exception as e:
+                    logging.warning(f"⚠ {node_obj.region} 탄소 예보 없음 - 배출량을 알 수 없는 클러스터로 평가: {e}")
+                    by_region[node_obj.region] = np.full(len(starts), np.nan)
+            rows.append(by_region[node_obj.region])
+        return np.vstack(rows)
+
+    def plan(self, task, base_usage, weights, cpu_pct, now=None):
+        """
+        작업 하나의 (클러스터, 시작 시각)을 정하고 미래 슬롯 부하에 예약한다.
+
+        :param task: {"task_name", "estimated_time", "start_deadline"(epoch 초)}
+        :param base_usage: 클러스터별 현재 사용률(%) (C,) - 알 수 없으면 NaN
+        :param cpu_pct: 배치된 작업 하나가 더하는 사용률 가정치(%p)
+        :return: (node_obj, start_at, carbon) 또는 기한 안에 배치할 수 없으면 None
+        """
+        now = now or time.time()
+        estimated_time = task.get("estimated_time", 0)
+        length = max(1, math.ceil(estimated_time / self.slot_sec))
+        if length > self.n_slots:
+            length = self.n_slots
+
+        with self._lock:
+            now_slot = int(now // self.slot_sec)
+            self.slots.advance(now_slot)
+            first_slot_at = now_slot * self.slot_sec
+
+            # 기한 안에서 시작할 수 있는 슬롯 수
+            last_start = int((task["start_deadline"] - first_slot_at) // self.slot_sec)
+            n_starts = min(self.n_slots - length + 1, max(1, last_start + 1))
+
+            # 모든 (클러스터, 시작 슬롯)의 [시작, 시작 + 작업 시간) 구간 배출량
+            starts = np.maximum(now, first_slot_at + np.arange(n_starts) * self.slot_sec)
+            carbon = np.round(self._emission(starts, estimated_time), 2)
+
+            # 구간 중 최대 사용률 = 현재 사용률 + 이미 계획된 예약의 구간 최대값
+            usage = np.asarray(base_usage, dtype=float)[:, None] + self.slots.window_max(length)[:, :n_starts]
+
+            # 대기 시간: 슬롯 시작 시점에도 남아 있을 기존 작업 시간
+            # (기한 안에서 일부러 미루는 시간은 벌점으로 보지 않는다)
+            delay = np.maximum(0.0, first_slot_at + np.arange(n_starts) * self.slot_sec - now)
+            remaining_now = np.array([node_obj.get_remaining_time() for node_obj in self.node_objs])
+            remaining = np.maximum(0.0, remaining_now[:, None] - delay[None, :])
+
+            # (시작 슬롯, 클러스터) 전체를 한 번에 평가
+            result = score_clusters(usage.T, remaining.T, carbon.T, estimated_time, weights)
+            score = result["score"]
+            if not np.isfinite(score).any():
+                return None
+            start, cluster_idx = np.unravel_index(np.argmin(score), score.shape)
+
+            self.slots.add(cluster_idx, start, length, cpu_pct)
+            start_at = float(starts[start])
+            return self.node_objs[cluster_idx], start_at, float(carbon[cluster_idx, start])
+
+
+class DelayedRelease:
+    """
+    시작 시각이 미래인 배치 결과를 보관하다가 시각이 되면 release(placements)로 넘긴다.
+    placements: [(task, cluster_name), ...]
+    """
+
+    def __init__(self, release):
+        self.release = release
+        self._heap = []             # [(start_at, 순번, task, cluster_name)]
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def hold(self, task, cluster_name, start_at):
+        with self._cond:
+            heapq.heappush(self._heap, (start_at, self._seq, task, cluster_name))
+            self._seq += 1
+            self._cond.notify()
+        logging.info(f"{task.get('task_name')} -> {cluster_name} "
+                     f"{datetime.fromtimestamp(start_at).strftime('%Y-%m-%d %H:%M:%S')} 시작 예정으로 보관")
+
+    def size(self):
+        return len(self._heap)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.time():
+                    self._cond.wait(self._heap[0][0] - time.time() if self._heap else None)
+                due = []
+                while self._heap and self._heap[0][0] <= time.time():
+                    _, _, task, cluster_name = heapq.heappop(self._heap)
+                    due.append((task, cluster_name))
+            try:
+                self.release(due)
+            except Exception as e:
+                logging.error(f"❌ 예약 작업 전달 중 오류: {e}")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="delayed-release")
+        self._thread.start()
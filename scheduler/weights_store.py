@@ -0,0 +1,147 @@
+################################################
+# 스케줄러 가중치(a_w, b_w, c_w, d_w) 저장소입니다.
+# 가중치는 weights_history 테이블에 버전이 붙은 행으로 추가만 되고(INSERT 한 번으로 원자적 발행),
+# 실행기는 현재 버전을 메모리에 들고 있다가 버전이 바뀔 때만 다시 읽습니다.
+################################################
+
+from common import db
+import mysql.connector
+import threading
+import logging
+import os
+
+
+WEIGHTS_POLL_SEC = float(os.getenv("WEIGHTS_POLL_SEC", 10))
+DEFAULT_WEIGHTS = (1.0, 1.0, 1.0, 1.0)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS weights_history (
+        version    BIGINT AUTO_INCREMENT PRIMARY KEY,
+        a_w        DOUBLE NOT NULL,
+        b_w        DOUBLE NOT NULL,
+        c_w        DOUBLE NOT NULL,
+        d_w        DOUBLE NOT NULL,
+        fitness    DOUBLE NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def ensure_schema():
+    """weights_history 테이블을 만들고, 비어 있으면 기존 weights 테이블 값으로 첫 버전을 채운다."""
+    db.execute(_SCHEMA, prepared=False, retry=True)
+    row = db.fetch_one("SELECT COUNT(*) AS cnt FROM weights_history")
+    if row["cnt"] == 0:
+        db.execute("""
+            INSERT INTO weights_history (a_w, b_w, c_w, d_w)
+            SELECT a_w, b_w, c_w, d_w FROM weights LIMIT 1
+        """)
+
+
+def get_latest_version() -> int:
+    """현재 발행된 가중치 버전 (PK 인덱스만 읽는 가벼운 쿼리)"""
+    row = db.fetch_one("SELECT MAX(version) AS version FROM weights_history")
+    return row["version"] or 0
+
+
+def load_latest_weights():
+    """
+    가장 최근 버전의 가중치를 반환한다.
+    :return: (version, {"a_w": .., "b_w": .., "c_w": .., "d_w": ..}) 또는 None
+    """
+    row = db.fetch_one("""
+        SELECT version, a_w, b_w, c_w, d_w
+          FROM weights_history
+         ORDER BY version DESC
+         LIMIT 1
+    """)
+    if not row:
+        return None
+    version = row.pop("version")
+    return version, row
+
+
+def publish_weights(weights: tuple, fitness: float = None) -> int:
+    """
+    새 가중치 세트를 새 버전으로 발행한다.
+    버전 행 INSERT와 기존 weights 테이블 갱신을 한 트랜잭션으로 처리하므로
+    읽는 쪽에서 테이블이 비어 있는 순간이 생기지 않는다.
+    :param weights: (a_w, b_w, c_w, d_w)
+    :return: 발행된 버전
+    """
+    weights = tuple(float(w) for w in weights)
+    with db.transaction("publish_weights") as cursor:
+        cursor.execute(
+            "INSERT INTO weights_history (a_w, b_w, c_w, d_w, fitness) VALUES (%s, %s, %s, %s, %s)",
+            (*weights, fitness))
+        version = cursor.lastrowid
+        # 기존 weights 테이블을 읽는 다른 도구를 위해 같은 값으로 유지
+        # (UPDATE의 rowcount는 바뀐 행 수라 값이 같으면 0이므로, 행이 있는지는 따로 확인한다)
+        cursor.execute("SELECT 1 FROM weights LIMIT 1")
+        exists = cursor.fetchone() is not None
+        if exists:
+            cursor.execute("UPDATE weights SET a_w = %s, b_w = %s, c_w = %s, d_w = %s", weights)
+        else:
+            cursor.execute("INSERT INTO weights (a_w, b_w, c_w, d_w) VALUES (%s, %s, %s, %s)", weights)
+    return version
+
+
+class WeightsStore:
+    """
+    실행기용 가중치 캐시.
+    current()는 메모리 값만 반환하며, 백그라운드 스레드가 버전 번호를 주기적으로 확인하거나
+    notify()로 깨워졌을 때만 DB에서 새 가중치를 읽는다.
+    """
+
+    def __init__(self, poll_sec=WEIGHTS_POLL_SEC):
+        self.poll_sec = poll_sec
+        self._current = (0, None)   # (version, (a_w, b_w, c_w, d_w)) - 참조 교체로 원자적 갱신
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self) -> int:
+        return self._current[0]
+
+    def current(self) -> tuple:
+        weights = self._current[1]
+        if weights is None:
+            logging.warning(f"⚠ 로드된 가중치가 없어 기본값 사용: {DEFAULT_WEIGHTS}")
+            return DEFAULT_WEIGHTS
+        return weights
+
+    def refresh(self) -> bool:
+        """버전이 바뀐 경우에만 가중치를 다시 읽는다. 바뀌었으면 True."""
+        if get_latest_version() == self.version:
+            return False
+        latest = load_latest_weights()
+        if latest is None:
+            return False
+        version, row = latest
+        self._current = (version, (row["a_w"], row["b_w"], row["c_w"], row["d_w"]))
+        logging.info(f"가중치 갱신: 버전 {version}, {self._current[1]}")
+        return True
+
+    def notify(self):
+        """학습기가 새 가중치를 발행했을 때 호출하면 다음 주기를 기다리지 않고 바로 갱신한다."""
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.poll_sec)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except mysql.connector.Error as err:
+                logging.error(f"❌ 가중치 갱신 중 오류 발생: {err}")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        try:
+            ensure_schema()
+            self.refresh()
+        except mysql.connector.Error as err:
+            logging.error(f"❌ 가중치 초기 로드 중 오류 발생: {err}")
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="weights-store")
+        self._thread.start()
@@ -5,11 +5,11 @@ import datetime
 import threading
 import statistics
 import subprocess
-import mysql.connector
 from minio import Minio
 from minio.error import S3Error
 import requests
 from kubernetes import client as k8s_client, config as k8s_config
+from common import db
 
 
 # ==============================
@@ -21,14 +21,6 @@ NODE_NAME = os.getenv("NODE_NAME")
 SAMPLE_SEC = float(os.getenv("METRIC_SAMPLE_SEC", "2"))
 TASK_NAME = os.getenv("TASK_NAME")
 
-MYSQL_CONFIG = {
-    "host": os.getenv("MYSQL_HOST"),
-    "port": int(os.getenv("MYSQL_PORT")),
-    "user": "root",
-    "password": os.getenv("MYSQL_PASSWORD"),
-    "database": os.getenv("MYSQL_DATABASE")
-}
-
 MINIO_HOST = os.getenv("MINIO_HOST")
 MINIO_PORT = os.getenv("MINIO_PORT")
 
@@ -154,27 +146,17 @@ class CPUSampler:
 def save_cpu_median(task_name, median_m):
     if median_m is None:
         return
-    conn = mysql.connector.connect(**MYSQL_CONFIG)
-    cur = conn.cursor()
-    cur.execute("""
+    db.execute("""
         UPDATE task_info  
            SET cpu_m = %s
          WHERE task_name = %s
-    """, (int(median_m), task_name))
-    conn.commit()
-    cur.close()
-    conn.close()
+    """, (int(median_m), task_name), retry=True)
 
 
 def update_task_status_and_completed_at(task_name, status):
-    conn = mysql.connector.connect(**MYSQL_CONFIG)
-    cur = conn.cursor()
-    cur.execute("""
+    db.execute("""
         UPDATE task_info SET status = %s, completed_at = NOW() WHERE task_name = %s
     """, (status, task_name))
-    conn.commit()
-    cur.close()
-    conn.close()
 
 
 # ==============================
@@ -211,6 +193,7 @@ def run_task(download_path):
 # MAIN
 # ==============================
 if __name__ == "__main__":
+    db.configure(pool_size=1)  # 단발성 Job이므로 커넥션 1개
     sampler = CPUSampler(NODE_NAME, POD_NAMESPACE, POD_NAME, interval=SAMPLE_SEC)
     sampler.start()
 